@@ -0,0 +1,153 @@
+"""Timing and peak memory measurement for the benchmarks.
+
+Every benchmark is compared against the stored baseline and fails if it
+is slower or uses more memory than the baseline allows. Run with
+``--save-baseline`` to record new baseline values instead. Times depend on
+the machine, so a baseline is only meaningful where it was recorded.
+"""
+import json
+import os
+import shutil
+import stat
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+# Absolute slack added to every limit, so very fast or small benchmarks do
+# not fail on noise
+TIME_SLACK = 1e-3
+MEMORY_SLACK = 2**16
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baseline instead of comparing.",
+    )
+    group.addoption(
+        "--baseline",
+        default=str(BASELINE),
+        help="The baseline file (default: benchmarks/baseline.json).",
+    )
+    group.addoption(
+        "--time-tolerance",
+        type=float,
+        default=2.0,
+        help="Fail if a benchmark takes longer than this times the baseline.",
+    )
+    group.addoption(
+        "--memory-tolerance",
+        type=float,
+        default=1.5,
+        help="Fail if peak memory is more than this times the baseline.",
+    )
+
+
+def _option(config, name, default):
+    try:
+        return config.getoption(name)
+    except ValueError:
+        # The options only exist when the benchmarks are run directly
+        return default
+
+
+def pytest_configure(config):
+    path = Path(_option(config, "--baseline", BASELINE))
+    config._bench_baseline = json.loads(path.read_text()) if path.exists() else {}
+    config._bench_results = {}
+    config._bench_unrecorded = set()
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    results = getattr(config, "_bench_results", None)
+    if results and _option(config, "--save-baseline", False):
+        baseline = dict(config._bench_baseline)
+        baseline.update(
+            (name, result)
+            for name, result in results.items()
+            if name not in config._bench_unrecorded
+        )
+        path = Path(_option(config, "--baseline", BASELINE))
+        path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = getattr(config, "_bench_results", None)
+    if not results:
+        return
+    terminalreporter.section("benchmarks")
+    width = max(len(name) for name in results)
+    for name, result in sorted(results.items()):
+        note = "  (not recorded)" if name in config._bench_unrecorded else ""
+        terminalreporter.write_line(
+            f"{name:<{width}}  {result['time'] * 1e3:10.2f} ms"
+            f"  {result['memory'] / 2**20:10.2f} MiB{note}"
+        )
+
+
+@pytest.fixture
+def bench(request):
+    """Measure a function's best time and peak memory.
+
+    Returns a function ``bench(func, *args, rounds=3, **kwargs)`` that
+    returns the result of the last call of ``func(*args, **kwargs)``.
+    """
+    config = request.config
+    name = request.node.name
+
+    def run(func, *args, rounds=3, **kwargs):
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            best = min(best, time.perf_counter() - start)
+        # tracemalloc slows allocations, so memory is measured separately
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        config._bench_results[name] = {"time": best, "memory": peak}
+        if name in config._bench_unrecorded:
+            return result
+        base = config._bench_baseline.get(name)
+        if base and not _option(config, "--save-baseline", False):
+            time_limit = base["time"] * _option(config, "--time-tolerance", 2.0)
+            if best > time_limit + TIME_SLACK:
+                pytest.fail(f"{name} took {best:.4f}s, baseline is {base['time']:.4f}s")
+            memory_limit = base["memory"] * _option(config, "--memory-tolerance", 1.5)
+            if peak > memory_limit + MEMORY_SLACK:
+                pytest.fail(
+                    f"{name} peaked at {peak} bytes, baseline is {base['memory']}"
+                )
+        return result
+
+    return run
+
+
+@pytest.fixture
+def espresso(request, tmp_path, monkeypatch):
+    """Make sure an `espresso` executable is on the PATH.
+
+    If espresso is not installed, a stand-in that echoes its input PLA is
+    used, so the benchmark measures everything but espresso itself. Its
+    results are neither compared with nor saved to the baseline.
+    """
+    if shutil.which("espresso"):
+        return
+    request.config._bench_unrecorded.add(request.node.name)
+    stub = tmp_path / "espresso"
+    script = Path(__file__).with_name("espresso_stub.py")
+    stub.write_text(f"#!{sys.executable}\n" + script.read_text())
+    stub.chmod(stub.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
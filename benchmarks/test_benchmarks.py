@@ -0,0 +1,77 @@
+from io import StringIO
+
+import numpy as np
+import pytest
+
+import truthtables as tt
+from truthtables.io import write_pla, write_verilog_case, write_verilog_sop
+from truthtables.truthtable import read_pla
+
+
+def _random_pla(num_inputs, num_outputs, num_cubes, seed=0):
+    rng = np.random.default_rng(seed)
+    input_lines = rng.integers(0, 3, size=(num_cubes, num_inputs), dtype="int8")
+    output_lines = rng.integers(0, 2, size=(num_cubes, num_outputs), dtype="int8")
+    return tt.PLA(input_lines, output_lines, pla_type="fd")
+
+
+@pytest.mark.parametrize("num_outputs", [1, 8])
+@pytest.mark.parametrize("num_inputs", [12, 20])
+def test_random_table(bench, num_inputs, num_outputs):
+    bench(tt.random_table, num_inputs, num_outputs, seed=0)
+
+
+@pytest.mark.parametrize("num_inputs", [12, 16])
+def test_write_pla(bench, num_inputs):
+    table = tt.random_table(num_inputs, 4, seed=0)
+    bench(lambda: write_pla(table, StringIO()))
+
+
+@pytest.mark.parametrize("num_inputs", [12, 16])
+def test_read_pla(bench, tmp_path, num_inputs):
+    path = tmp_path / "table.pla"
+    write_pla(tt.random_table(num_inputs, 4, seed=0), path)
+    bench(read_pla, path)
+
+
+@pytest.mark.parametrize("num_inputs", [10, 14])
+def test_write_verilog_case(bench, num_inputs):
+    table = tt.random_table(num_inputs, 4, seed=0)
+    bench(lambda: write_verilog_case(table, StringIO()))
+
+
+@pytest.mark.parametrize("table_type", ["TruthTable", "PLA"])
+def test_write_verilog_sop(bench, table_type):
+    if table_type == "TruthTable":
+        table = tt.random_table(12, 4, seed=0)
+    else:
+        table = _random_pla(24, 4, 5000)
+    bench(lambda: write_verilog_sop(table, StringIO()))
+
+
+@pytest.mark.parametrize("num_inputs", [16, 22])
+def test_xor(bench, num_inputs):
+    a = tt.random_table(num_inputs, 8, seed=0)
+    b = tt.random_table(num_inputs, 8, seed=1)
+    bench(a.__xor__, b)
+
+
+@pytest.mark.parametrize("num_cubes", [1000, 50000])
+def test_pla_iteration(bench, num_cubes):
+    pla = _random_pla(16, 4, num_cubes)
+    bench(lambda: sum(1 for _ in pla))
+
+
+@pytest.mark.parametrize("num_inputs", [16, 22])
+def test_entropy(bench, num_inputs):
+    table = tt.random_table(num_inputs, 8, seed=0)
+    bench(lambda: table.entropy)
+
+
+@pytest.mark.parametrize("engine", ["native", "espresso"])
+@pytest.mark.parametrize("num_inputs", [6, 10])
+def test_minimize(request, bench, engine, num_inputs):
+    if engine == "espresso":
+        request.getfixturevalue("espresso")
+    table = tt.random_table(num_inputs, 2, seed=0)
+    bench(tt.minimize, table, engine=engine, rounds=1)
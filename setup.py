@@ -13,6 +13,8 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/rbnprdy/truthtables",
     packages=setuptools.find_packages(),
+    install_requires=["numpy"],
+    entry_points={"console_scripts": ["truthtables=truthtables.cli:main"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,57 @@
+from io import StringIO
+
+from truthtables import PLA, TruthTable, random_table, to_file
+from truthtables.bdd import BDD, BDDTable
+from truthtables.io import write_verilog_sop
+
+
+def test_round_trip():
+    for num_inputs in (1, 5, 9):
+        table = random_table(num_inputs, 3, seed=num_inputs)
+        bdd = BDDTable.from_truth_table(table)
+        assert bdd.to_truth_table() == table
+        assert TruthTable.from_pla(bdd.to_pla()) == table
+        for output in table.outputs:
+            assert bdd.satcount(output) == len(table.onset(output))
+        # The unique table makes equal functions share nodes
+        assert BDDTable.from_pla(bdd.to_pla(), bdd.manager).roots == bdd.roots
+
+
+def test_operators():
+    a = random_table(8, 2, seed=1)
+    b = random_table(8, 2, seed=2)
+    bdd_a = BDDTable.from_truth_table(a)
+    bdd_b = BDDTable.from_truth_table(b, bdd_a.manager)
+    assert (bdd_a & bdd_b).to_truth_table() == a & b
+    assert (bdd_a | bdd_b).to_truth_table() == a | b
+    assert (bdd_a ^ bdd_b).to_truth_table() == a ^ b
+    assert (~bdd_a).to_truth_table() == ~a
+
+
+def test_restrict():
+    manager = BDD(3)
+    f = manager.apply("xor", manager.var(0), manager.var(2))
+    assert manager.restrict(f, 0, 0) == manager.var(2)
+    assert manager.restrict(f, 0, 1) == manager.neg(manager.var(2))
+    assert manager.satcount(f) == 4
+
+
+def test_from_pla():
+    for pla_type in ("f", "fd", "fr", "r"):
+        pla = PLA(["1-0", "01-", "-11"], ["10", "01", "1-"], pla_type=pla_type)
+        assert BDDTable.from_pla(pla).to_truth_table() == TruthTable.from_pla(pla)
+
+
+def test_wide_pla():
+    pla = PLA(["1" + "-" * 38 + "0", "-" * 20 + "1" + "-" * 19], ["1", "1"])
+    bdd = BDDTable.from_pla(pla)
+    assert bdd.satcount("o0") == 2**39 + 2**38 - 2**37
+    text = StringIO()
+    write_verilog_sop(bdd, text)
+    assert "assign o0 = " in text.getvalue()
+
+
+def test_to_binary(tmp_path):
+    table = random_table(9, 3, seed=3)
+    to_file(BDDTable.from_truth_table(table), tmp_path / "bdd.ttb")
+    assert TruthTable.from_pla(PLA.from_file(tmp_path / "bdd.ttb")) == table
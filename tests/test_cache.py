@@ -0,0 +1,38 @@
+import truthtables as tt
+from truthtables.cache import MinimizationCache, table_hash
+
+
+def test_table_hash():
+    a = tt.TruthTable(["00", "01", "10", "11"])
+    b = tt.TruthTable(["00", "01", "10", "11"], inputs=["x", "w"], outputs=["y", "z"])
+    assert table_hash(a) == table_hash(b)
+    assert table_hash(a) != table_hash(~a)
+
+    pla = tt.PLA(["0-", "11"], ["10", "01"])
+    assert table_hash(pla) == table_hash(pla[::-1])
+    assert table_hash(pla) != table_hash(pla[:1])
+    assert table_hash(pla) != table_hash(tt.PLA.from_truth_table(a))
+
+
+def test_minimization_cache(tmp_path):
+    cache = MinimizationCache(maxsize=1, directory=tmp_path)
+    a = tt.TruthTable(["00", "00", "11", "11"])
+    b = tt.TruthTable(["00", "00", "11", "11"], inputs=["x", "y"], outputs=["p", "q"])
+
+    result = tt.minimize(a, engine="native", cache=cache)
+    assert cache.stats()["misses"] == 1
+    result_b = tt.minimize(b, engine="native", cache=cache)
+    assert cache.stats()["hits"] == 1
+    assert result_b.input_rows == result.input_rows
+    assert result_b.inputs == ["x", "y"]
+    assert result_b.outputs == ["p", "q"]
+
+    tt.minimize(~a, engine="native", cache=cache)
+    assert cache.stats()["evictions"] == 1
+    assert len(cache) == 1
+
+    # A new cache sharing the directory finds the results on disk
+    other = MinimizationCache(directory=tmp_path)
+    assert tt.minimize(a, engine="native", cache=other).output_rows == ["11"]
+    assert other.stats()["disk_hits"] == 1
+    assert other.stats()["hit_rate"] == 1.0
@@ -0,0 +1,66 @@
+import truthtables as tt
+from truthtables.cli import main
+
+
+def _write_tables(directory):
+    (directory / "sub").mkdir(parents=True)
+    for idx, path in enumerate(["a.pla", "sub/b.pla.gz"]):
+        tt.to_file(tt.random_table(5, 2, seed=idx), directory / path)
+
+
+def test_convert(tmp_path, capsys):
+    src, out = tmp_path / "src", tmp_path / "out"
+    _write_tables(src)
+    assert main(["convert", str(src), "-o", str(out), "-j", "2"]) == 0
+    for name, seed in (("a.ttb", 0), ("sub/b.ttb", 1)):
+        table = tt.TruthTable.from_pla(tt.PLA.from_file(out / name))
+        assert table == tt.random_table(5, 2, seed=seed)
+    assert main(["verify", str(out), "--against", str(src), "-j", "1"]) == 0
+
+    # Outputs newer than their sources are skipped
+    capsys.readouterr()
+    assert main(["convert", str(src), "-o", str(out)]) == 0
+    assert "2 up to date, 0 to process" in capsys.readouterr().err
+    assert main(["convert", str(src), "-o", str(out), "--skip", "hash"]) == 0
+    assert "0 up to date, 2 to process" in capsys.readouterr().err
+    assert main(["convert", str(src), "-o", str(out), "--skip", "hash"]) == 0
+    assert "2 up to date, 0 to process" in capsys.readouterr().err
+
+
+def test_minimize_and_verify(tmp_path, capsys):
+    src, out = tmp_path / "src", tmp_path / "out"
+    _write_tables(src)
+    pattern = str(src / "**" / "*.pla*")
+    args = ["minimize", pattern, "-o", str(out), "--engine", "native", "-j", "1"]
+    assert main(args) == 0
+    # Paths below the part of the pattern without wildcards are kept
+    assert (out / "a.pla").exists() and (out / "sub" / "b.pla").exists()
+    assert main(["verify", str(out), "--against", str(src)]) == 0
+
+    tt.to_file(tt.random_table(5, 2, seed=5), out / "a.pla")
+    capsys.readouterr()
+    assert main(["verify", str(out), "--against", str(src)]) == 1
+    assert "a.pla: differs from" in capsys.readouterr().err
+
+
+def test_output_inside_source(tmp_path):
+    src = tmp_path / "src"
+    _write_tables(src)
+    out = src / "out"
+    for _ in range(2):
+        assert main(["convert", str(src), "-o", str(out), "--skip", "never"]) == 0
+    assert sorted(p.relative_to(out).as_posix() for p in out.rglob("*.ttb")) == [
+        "a.ttb",
+        "sub/b.ttb",
+    ]
+
+
+def test_duplicate_outputs(tmp_path, capsys):
+    src, out = tmp_path / "src", tmp_path / "out"
+    _write_tables(src)
+    tt.to_file(tt.random_table(5, 2, seed=2), src / "a.ttb")
+    assert main(["convert", str(src), "-o", str(out)]) == 1
+    assert f"{src / 'a.pla'} and {src / 'a.ttb'} both write {out / 'a.ttb'}" in (
+        capsys.readouterr().err
+    )
+    assert not out.exists()
@@ -24,3 +24,21 @@ def test_bias():
     for row in table:
         assert len(row) == num_outputs
         assert row == "1" * 6
+
+
+def test_seed(tmp_path):
+    table = random_table(10, 3, seed=1)
+    assert table == random_table(10, 3, seed=1)
+    assert table != random_table(10, 3, seed=2)
+
+    # Streaming to disk in small chunks gives the same table
+    on_disk = random_table(10, 3, seed=1, path=tmp_path / "t.ttb", chunk_rows=128)
+    assert on_disk == table
+    assert on_disk.rows == table.rows
+
+
+def test_output_biases():
+    table = random_table(12, 3, bias=[0, 0.25, 1], seed=0)
+    assert table.onset("o0") == []
+    assert len(table.onset("o2")) == 2**12
+    assert 0.2 < len(table.onset("o1")) / 2**12 < 0.3
@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from truthtables import TruthTable, random_table
+from truthtables.ingest import load_records
+
+
+@pytest.fixture
+def table():
+    return random_table(7, 3, seed=5)
+
+
+def test_dicts_file(tmp_path, table):
+    rows = table.evaluate(np.arange(len(table)))
+    path = tmp_path / "rows.txt"
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(f"{{'o1': {bool(row[1])}, 'o0': {row[0]}, 'o2': {row[2]}}}\n")
+    loaded = TruthTable.from_dicts_file(path)
+    assert loaded == table
+    assert loaded.outputs == ["o0", "o1", "o2"]
+
+    # Lines with different key orders are parsed one at a time
+    with open(path, "a") as f:
+        f.write("{'o2': 0, 'o1': 1, 'o0': 1}\n" * len(table))
+    assert TruthTable.from_dicts_file(path).rows == table.rows + ["110"] * len(table)
+
+
+def test_quoted_keys(tmp_path):
+    path = tmp_path / "rows.txt"
+    path.write_text("{'it\\'s': 1, \"a'b\": 0}\n{'it\\'s': 0, \"a'b\": 1}\n")
+    loaded = TruthTable.from_dicts_file(path)
+    assert loaded.outputs == ["a'b", "it's"]
+    assert loaded.rows == ["01", "10"]
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"a\\"b": 1}\n{"a\\"b": 0}\n')
+    assert load_records(path).outputs == ['a"b']
+
+
+def test_jsonl_by_index(tmp_path, table):
+    rows = table.evaluate(np.arange(len(table)))
+    names = [f"x{i}" for i in range(table.num_inputs)]
+    path = tmp_path / "rows.jsonl.gz"
+    with gzip.open(path, "wt") as f:
+        for idx in np.random.default_rng(0).permutation(len(table)).tolist():
+            record = {
+                n: idx >> (table.num_inputs - 1 - i) & 1 for i, n in enumerate(names)
+            }
+            record.update({o: bool(v) for o, v in zip(table.outputs, rows[idx])})
+            f.write(json.dumps(record) + "\n")
+    loaded = load_records(path, input_columns=names)
+    assert loaded == table
+    assert loaded.inputs == names
+    assert loaded.outputs == table.outputs
+
+
+def test_csv(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_text("b, a\n0,1\n1,1\n1,0\n0,0\n")
+    assert load_records(path).rows == ["01", "11", "10", "00"]
+    path.write_text("a,b\ntrue, 0\n0,TRUE\n")
+    assert load_records(path, outputs=["b", "a"]).rows == ["01", "10"]
+
+    path.write_text("i,o\n0,1\n1,0\n0,1\n")
+    with pytest.raises(ValueError):
+        load_records(path)
+    with pytest.raises(ValueError):
+        load_records(path, input_columns=["i"])
+    with pytest.raises(ValueError):
+        load_records(path, inputs=["a"])
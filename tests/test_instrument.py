@@ -0,0 +1,52 @@
+import pytest
+
+import truthtables as tt
+from truthtables import instrument
+
+
+def test_collect(tmp_path):
+    table = tt.random_table(8, 2, seed=0)
+    path = tmp_path / "out.pla"
+    with instrument.collect() as stats:
+        tt.to_file(table, path)
+        pla = tt.PLA.from_file(path)
+        table ^ table
+        tt.minimize(pla, engine="native")
+    size = path.stat().st_size
+    assert stats["write_pla"]["bytes_written"] == size
+    assert stats["write_pla"]["rows"] == 256
+    # Counters of nested calls are added to the enclosing call
+    assert stats["to_file"]["bytes_written"] == size
+    assert stats["read_pla"]["bytes_read"] == size
+    assert stats["read_pla"]["cubes"] == 256
+    assert stats["TruthTable.xor"]["calls"] == 1
+    assert stats["minimize"]["cubes"] == 256
+    assert all(s["time"] >= 0 for s in stats.values())
+
+    # Nothing is recorded outside of the block
+    tt.to_file(table, path)
+    assert stats["write_pla"]["calls"] == 1
+
+
+def test_hooks():
+    events = []
+
+    @instrument.timed("work")
+    def work(fail=False):
+        with instrument.subprocess_timer():
+            instrument.count(rows=3)
+        if fail:
+            raise ValueError
+
+    work()
+    instrument.add_hook(events.append)
+    try:
+        work()
+        with pytest.raises(ValueError):
+            work(fail=True)
+    finally:
+        instrument.remove_hook(events.append)
+    assert [e["name"] for e in events] == ["work", "work"]
+    assert events[0]["rows"] == 3
+    assert events[0]["subprocess_time"] > 0
+    assert not instrument.enabled()
@@ -1,4 +1,5 @@
 import subprocess
+from io import StringIO
 from itertools import product
 
 import pytest
@@ -36,3 +37,108 @@ def test_to_file(mode, table, tmp_path):
             [{inp: int(inp_str[i]) for i, inp in enumerate(table.inputs)}]
         )[0]
         assert res == {oup: int(row[i]) for i, oup in enumerate(table.outputs)}
+
+
+@pytest.mark.parametrize("suffix", [".pla", ".pla.gz"])
+def test_pla_round_trip(suffix, table, tmp_path):
+    out_file = tmp_path / f"out{suffix}"
+    tt.to_file(table, out_file)
+    pla = tt.PLA.from_file(out_file)
+    if isinstance(table, tt.TruthTable):
+        table = tt.PLA.from_truth_table(table)
+    assert pla.input_rows == table.input_rows
+    assert pla.output_rows == table.output_rows
+    assert pla.inputs == table.inputs
+    assert pla.outputs == table.outputs
+    assert pla.pla_type == table.pla_type
+
+
+def test_case_block():
+    table = tt.TruthTable(["01", "10"])
+    assert tt.io.get_case_block(table) == (
+        "always@(*) begin\n"
+        "\tcase ({ i0 })\n"
+        "\t\t1'b0 : { o0 , o1 } = 2'b01;\n"
+        "\t\t1'b1 : { o0 , o1 } = 2'b10;\n"
+        "\tendcase\nend\n"
+    )
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_binary_round_trip(mmap, table, tmp_path):
+    out_file = tmp_path / "out.ttb"
+    tt.to_file(table, out_file)
+    if isinstance(table, tt.TruthTable):
+        loaded = tt.TruthTable.load(out_file, mmap=mmap)
+        assert loaded == table
+        assert loaded.rows == table.rows
+    else:
+        loaded = tt.PLA.from_file(out_file)
+        assert loaded.input_rows == table.input_rows
+        assert loaded.output_rows == table.output_rows
+        assert loaded.pla_type == table.pla_type
+    assert loaded.inputs == table.inputs
+    assert loaded.outputs == table.outputs
+    assert loaded.name == table.name
+
+
+def test_binary_read_only(tmp_path):
+    table = tt.TruthTable(["01", "10", "11", "00"])
+    other = tt.TruthTable(["11", "11", "01", "10"])
+    out_file = tmp_path / "out.ttb"
+    tt.to_file(table, out_file)
+    data = out_file.read_bytes()
+    loaded = tt.TruthTable.load(out_file)
+    loaded ^= other
+    assert loaded == table ^ other
+    loaded |= other
+    loaded &= other
+    assert loaded == ((table ^ other) | other) & other
+    assert out_file.read_bytes() == data
+    with pytest.raises(ValueError):
+        tt.to_file(table, tmp_path / "out.ttb.gz")
+
+
+def _eval_sop(text, inputs, values):
+    """Evaluate the wires and assigns of a SOP verilog module."""
+    env = dict(zip(inputs, values))
+    results = {}
+    for line in text.splitlines():
+        if line.startswith(("wire ", "assign ")):
+            name, expr = line.split(" ", 1)[1].rstrip(" ;").split(" = ")
+            expr = expr.replace("1'b1", "1").replace("1'b0", "0")
+            env[name] = results[name] = eval(expr, {}, env) & 1
+    return results
+
+
+@pytest.mark.parametrize("pla_type", ["f", "fd", "fr", "r"])
+def test_sop_shared_terms(pla_type):
+    pla = tt.PLA(
+        ["0-0", "001", "10-", "110", "111", "0-0"],
+        ["11", "10", "01", "0-", "11", "10"],
+        pla_type=pla_type,
+    )
+    text = StringIO()
+    tt.io.write_verilog_sop(pla, text)
+    text = text.getvalue()
+    # "0-0" is used by both outputs and appears twice, but is one wire
+    assert text.count("~i0 & ~i2 ;") == 1
+    table = tt.TruthTable.from_pla(pla)
+    for idx, row in enumerate(table):
+        values = [int(c) for c in table.input_str(idx)]
+        res = _eval_sop(text, table.inputs, values)
+        assert [res[o] for o in table.outputs] == [int(c) for c in row]
+
+
+def test_casez_block():
+    pla = tt.PLA(["0-0", "1--", "011"], ["10", "01", "00"], pla_type="fd")
+    assert tt.io.get_case_block(pla) == (
+        "wire [2:0] pla_in = { i0 , i1 , i2 } ;\n"
+        "always@(*) begin\n"
+        "\t{ o0 , o1 } = 2'b00;\n"
+        "\tcasez (pla_in) 3'b0?0 : { o0 , o1 } = { o0 , o1 } | 2'b10; endcase\n"
+        "\tcasez (pla_in) 3'b1?? : { o0 , o1 } = { o0 , o1 } | 2'b01; endcase\n"
+        "end\n"
+    )
+    pla = tt.PLA(["0-0", "1--"], ["10", "01"], pla_type="r")
+    assert "{ o0 , o1 } = { o0 , o1 } & 2'b01" in tt.io.get_case_block(pla)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+import truthtables as tt
+from truthtables import ShardedTruthTable
+
+
+def _parity(bits):
+    return np.stack((bits.sum(axis=1) & 1, bits[:, 0] & bits[:, -1]), axis=1)
+
+
+@pytest.mark.parametrize("shard_bits", [0, 3, 7])
+def test_sharded(tmp_path, shard_bits):
+    table = tt.random_table(9, 3, seed=0)
+    other = tt.random_table(9, 3, seed=1)
+    sharded = ShardedTruthTable.from_table(table, tmp_path / "a", shard_bits)
+    assert sharded.num_shards == 2**shard_bits
+    assert ShardedTruthTable.load(tmp_path / "a").to_truth_table() == table
+    assert list(sharded) == table.rows
+
+    onset = np.concatenate(list(sharded.iter_onset("o1")))
+    assert onset.tolist() == table.onset("o1")
+    assert sharded.entropy() == pytest.approx(table.entropy)
+    assert sharded.output_entropies() == pytest.approx(table.output_entropies)
+
+    other = ShardedTruthTable.from_table(other, tmp_path / "b", shard_bits)
+    xor = sharded.xor(other, tmp_path / "xor")
+    assert xor.to_truth_table() == table ^ other.to_truth_table()
+
+    for idx in (0, 4, 8):
+        cofactor = sharded.cofactor(idx, 1, tmp_path / f"cofactor{idx}")
+        assert cofactor.to_truth_table() == table.cofactor(idx, 1)
+
+    # New shards are never written over the shards being read
+    with pytest.raises(ValueError):
+        sharded.xor(other, tmp_path / "b")
+    for idx in (0, 8):
+        with pytest.raises(ValueError):
+            sharded.cofactor(idx, 1, tmp_path / "b" / ".." / "a")
+    assert ShardedTruthTable.load(tmp_path / "a").to_truth_table() == table
+
+    sharded.to_pla(tmp_path / "out.pla")
+    pla = tt.PLA.from_file(tmp_path / "out.pla")
+    assert tt.TruthTable.from_pla(pla) == table
+
+
+def test_sharded_workers(tmp_path):
+    sharded = ShardedTruthTable.from_function(_parity, 10, tmp_path / "a", 2, workers=2)
+    table = tt.TruthTable.from_function(_parity, 10)
+    assert sharded.to_truth_table() == table
+    assert sharded.count_ones(workers=2).tolist() == table._ones().tolist()
+    assert sharded.entropy(workers=2) == pytest.approx(table.entropy)
@@ -1,3 +1,7 @@
+import os
+
+import pytest
+
 import truthtables as tt
 
 
@@ -6,3 +10,85 @@ def test_minimize():
     table_min = tt.minimize(table)
     assert table_min.input_rows == ["1-"]
     assert table_min.output_rows == ["11"]
+
+
+@pytest.mark.parametrize("exact", [True, False])
+def test_minimize_native(exact):
+    table = tt.TruthTable(["00", "00", "11", "11"])
+    table_min = tt.minimize(table, engine="native", exact=exact)
+    assert table_min.input_rows == ["1-"]
+    assert table_min.output_rows == ["11"]
+
+    for num_inputs in [3, 6]:
+        table = tt.random_table(num_inputs, 3)
+        table_min = tt.minimize(table, engine="native", exact=exact)
+        assert tt.TruthTable.from_pla(table_min) == table
+
+
+def test_minimize_native_dcs(table):
+    table_min = tt.minimize(table, engine="native")
+    if isinstance(table, tt.PLA):
+        # Only the rows that are not don't cares need to match
+        _, dcs = table._evaluate_sets(range(2**table.num_inputs))
+        expected = tt.TruthTable.from_pla(table).evaluate(range(8))
+        result = tt.TruthTable.from_pla(table_min).evaluate(range(8))
+        assert ((expected == result) | dcs).all()
+    else:
+        assert tt.TruthTable.from_pla(table_min) == table
+
+
+def test_minimize_unknown_engine():
+    with pytest.raises(ValueError):
+        tt.minimize(tt.TruthTable(["0", "1"]), engine="abc")
+
+
+@pytest.fixture
+def espresso_stub(tmp_path, monkeypatch):
+    """Put an "espresso" on the PATH that echoes its input back."""
+    stub = tmp_path / "espresso"
+    stub.write_text(
+        '#!/bin/sh\nif [ -n "$STUB_SLEEP" ]; then sleep "$STUB_SLEEP"; fi\ncat\n'
+    )
+    stub.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    return stub
+
+
+def test_minimize_pipes(espresso_stub, table):
+    result = tt.minimize(table)
+    if isinstance(table, tt.TruthTable):
+        table = tt.PLA.from_truth_table(table)
+    assert result.input_rows == table.input_rows
+    assert result.output_rows == table.output_rows
+    assert result.inputs == table.inputs
+
+
+def test_minimize_compact(espresso_stub):
+    pla = tt.PLA(["1-0", "1-0", "110", "0--"], ["10", "10", "10", "01"])
+    # The echoing stub shows which cubes were passed to espresso
+    assert tt.minimize(pla).input_rows == pla.input_rows
+    assert tt.minimize(pla, compact=True).input_rows == ["1-0", "0--"]
+
+
+def test_minimize_timeout(espresso_stub, monkeypatch):
+    monkeypatch.setenv("STUB_SLEEP", "5")
+    with pytest.raises(TimeoutError):
+        tt.minimize(tt.TruthTable(["0", "1"]), timeout=0.2)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_minimize_many(workers):
+    tables = [tt.random_table(4, 2) for _ in range(6)]
+    results = dict(tt.minimize_many(tables, workers=workers, engine="native"))
+    assert sorted(results) == list(range(6))
+    for idx, table in enumerate(tables):
+        assert tt.TruthTable.from_pla(results[idx]) == table
+
+
+def test_minimize_many_exceptions(espresso_stub, monkeypatch):
+    monkeypatch.setenv("STUB_SLEEP", "5")
+    tables = [tt.TruthTable(["0", "1"])]
+    results = list(
+        tt.minimize_many(tables, workers=2, timeout=0.2, return_exceptions=True)
+    )
+    assert isinstance(results[0][1], TimeoutError)
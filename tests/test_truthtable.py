@@ -1,8 +1,10 @@
 import math
 
 import numpy as np
+import pytest
 
-from truthtables import TruthTable, PLA
+from truthtables import TruthTable, PLA, random_table, to_file, truthtable
+from truthtables.truthtable import PLAParsingError, iter_pla, read_pla_info
 
 
 def test_basic_truthtable():
@@ -42,9 +44,402 @@ def test_pla():
     assert table.onset("o0") == [0, 2]
 
 
+def test_pla_add():
+    a = PLA(["1-"], ["10"], pla_type="fd", inputs=["a", "b"])
+    b = PLA(["-1"], ["01"], pla_type="fd")
+    total = a + b
+    assert total.pla_type == "fd"
+    assert total.inputs == ["a", "b"]
+    assert total.input_rows == ["1-", "-1"]
+    assert TruthTable.from_pla(total).rows == ["00", "01", "10", "11"]
+    with pytest.raises(ValueError):
+        a + PLA(["-1"], ["01"], pla_type="fr")
+
+
 def test_conversion():
     input_rows = ["0-0", "001", "10-", "110", "111"]
     output_rows = ["11", "10", "01", "0~", "11"]
     pla = PLA(input_rows, output_rows)
     table = TruthTable.from_pla(pla)
     assert table.rows == ["11", "10", "11", "00", "01", "01", "00", "11"]
+
+
+def test_packed_truthtable():
+    rng = np.random.default_rng(0)
+    bits = rng.integers(0, 2, size=(2**9, 3))
+    rows = ["".join(map(str, row)) for row in bits]
+    table = TruthTable(rows)
+    assert table.planes.shape == (3, 8)
+    assert table.planes.dtype == np.uint64
+    assert len(table) == 2**9
+    assert list(table) == rows
+    assert table[-1] == rows[-1]
+    assert table[5:77] == rows[5:77]
+    assert table[::7] == rows[::7]
+    assert table.onset("o1") == np.flatnonzero(bits[:, 1]).tolist()
+
+    same = TruthTable.from_planes(table.planes, inputs=table.inputs)
+    assert same.rows == rows
+
+
+def test_truthtable_operators():
+    a = TruthTable(["00", "01", "10", "11"])
+    b = TruthTable(["01", "01", "11", "00"])
+    assert (a & b).rows == ["00", "01", "10", "00"]
+    assert (a | b).rows == ["01", "01", "11", "11"]
+    assert (a ^ b).rows == ["01", "00", "01", "11"]
+    assert (~a).rows == ["11", "10", "01", "00"]
+    assert ~~a == a
+    assert a != b
+
+    c = TruthTable(a.rows)
+    c ^= b
+    assert c == a ^ b
+    c |= a
+    assert c == (a ^ b) | a
+    c &= b
+    assert c == ((a ^ b) | a) & b
+
+    assert a.select(["o1"]).rows == ["0", "1", "0", "1"]
+    assert a.select([1, 0]).outputs == ["o1", "o0"]
+    assert a.select(np.array([1, 0])).outputs == ["o1", "o0"]
+    d = a.select(["o0"]).concat(b.select(["o1"]))
+    assert d.rows == ["01", "01", "11", "10"]
+
+    # Results of tables without inputs keep their shape
+    const = TruthTable(["10"]) ^ TruthTable(["11"])
+    assert const.num_inputs == 0
+    assert const.rows == ["01"]
+
+
+def test_pla_lines():
+    input_rows = ["0-0", "001", "10-", "110", "111"]
+    output_rows = ["11", "10", "01", "0~", "11"]
+    table = PLA(input_rows, output_rows)
+    assert table.input_lines.dtype == np.int8
+    assert table.input_lines.tolist()[0] == [0, 2, 0]
+    assert table.output_lines.tolist()[3] == [0, 3]
+    assert str(table) == "\n".join(f"{i} {o}" for i, o in zip(input_rows, output_rows))
+    assert list(table) == list(zip(input_rows, output_rows))
+    assert table[-1] == (input_rows[-1], output_rows[-1])
+
+    sliced = table[1:3]
+    assert np.shares_memory(sliced.input_lines, table.input_lines)
+    assert sliced.input_rows == input_rows[1:3]
+    assert sliced.outputs == table.outputs
+
+    doubled = table + table
+    assert doubled.num_products == 10
+    assert doubled.output_rows == output_rows * 2
+    assert PLA(table.input_lines, table.output_lines).input_rows == input_rows
+
+
+PLA_FILE = """# Example
+.i 3
+.o 2
+.ilb a b c
+.ob x y
+.p 5
+.type fr
+0-0 11
+001 10
+10- 01
+110 0~
+111 11
+.e
+"""
+
+
+def test_read_pla(tmp_path):
+    path = tmp_path / "in.pla"
+    path.write_text(PLA_FILE)
+    pla = PLA.from_file(path)
+    assert pla.inputs == ["a", "b", "c"]
+    assert pla.outputs == ["x", "y"]
+    assert pla.pla_type == "fr"
+    assert pla.input_rows == ["0-0", "001", "10-", "110", "111"]
+    assert pla.output_rows == ["11", "10", "01", "0~", "11"]
+    assert read_pla_info(path) == (3, 2, 5, "fr")
+
+    batches = list(iter_pla(path, batch_size=2))
+    assert [b.num_products for b in batches] == [2, 2, 1]
+    assert sum(batches[1:], batches[0]).output_rows == pla.output_rows
+
+    path.write_text(PLA_FILE.replace("110 0~", "110 0~1"))
+    with pytest.raises(PLAParsingError, match="outputs at line 10"):
+        PLA.from_file(path)
+    path.write_text(PLA_FILE.replace(".p 5", ".p 4"))
+    with pytest.raises(PLAParsingError, match="number of products"):
+        PLA.from_file(path)
+
+    # Comments are not required to be ASCII
+    path.write_bytes(b"# caf\xc3\xa9 \xe9\n" + PLA_FILE.encode())
+    assert PLA.from_file(path).input_rows == pla.input_rows
+
+
+@pytest.mark.parametrize(
+    "pla_type, rows",
+    [
+        ("f", ["10", "10", "00", "00"]),
+        ("fd", ["10", "10", "00", "00"]),
+        ("fr", ["10", "10", "00", "00"]),
+        ("r", ["11", "10", "10", "11"]),
+        ("dr", ["11", "10", "00", "11"]),
+    ],
+)
+def test_conversion_types(pla_type, rows):
+    pla = PLA(["0-", "01", "10"], ["1~", "10", "-0"], pla_type=pla_type)
+    table = TruthTable.from_pla(pla)
+    assert table.rows == rows
+
+
+def test_conversion_large():
+    rng = np.random.default_rng(0)
+    input_lines = rng.choice([0, 1, 2], size=(50, 9), p=[0.3, 0.3, 0.4])
+    output_lines = rng.integers(0, 2, size=(50, 2))
+    pla = PLA(input_lines, output_lines, pla_type="f")
+    table = TruthTable.from_pla(pla)
+    for idx, row in enumerate(table):
+        inp = np.array([int(c) for c in table.input_str(idx)])
+        match = ((input_lines == 2) | (input_lines == inp)).all(axis=1)
+        expected = (output_lines[match] == 1).any(axis=0).astype(int)
+        assert row == "".join(map(str, expected))
+
+
+def test_conversion_wide_cubes():
+    # Cubes with many don't cares in the word inputs are or'ed into a view
+    rng = np.random.default_rng(1)
+    input_lines = rng.choice([0, 1, 2], size=(40, 20), p=[0.05, 0.05, 0.9])
+    output_lines = rng.integers(0, 3, size=(40, 2))
+    pla = PLA(input_lines, output_lines, pla_type="fd")
+    idxs = rng.integers(0, 2**20, size=2000)
+    assert np.array_equal(TruthTable.from_pla(pla).evaluate(idxs), pla.evaluate(idxs))
+
+
+def test_evaluate(table):
+    full = TruthTable.from_pla(table) if isinstance(table, PLA) else table
+    expected = np.array([[int(c) for c in row] for row in full], dtype=np.uint8)
+    idxs = np.arange(len(full))
+    bits = np.array([[int(c) for c in full.input_str(i)] for i in idxs])
+    assert np.array_equal(table.evaluate(idxs), expected)
+    assert np.array_equal(table.evaluate(bits), expected)
+    assert np.array_equal(table.evaluate(idxs[::-1]), expected[::-1])
+    with pytest.raises(ValueError):
+        table.evaluate(np.zeros((2, table.num_inputs + 1)))
+
+
+def test_from_function(tmp_path):
+    calls = []
+
+    def adder(bits):
+        calls.append(len(bits))
+        a = bits[:, :4] @ [8, 4, 2, 1]
+        b = bits[:, 4:] @ [8, 4, 2, 1]
+        return ((a + b)[:, None] >> np.arange(4, -1, -1)) & 1
+
+    table = TruthTable.from_function(adder, 8, chunk_rows=64)
+    assert table.num_outputs == 5
+    assert not calls[1:]
+    assert table[0x93] == "01100"
+    assert calls[1:] == [64]
+
+    expected = TruthTable(table.rows)
+    assert table == expected
+    assert table.onset("o0") == expected.onset("o0")
+    assert np.array_equal(
+        table.evaluate(np.arange(256)), expected.evaluate(np.arange(256))
+    )
+    to_file(table, tmp_path / "adder.pla")
+    assert TruthTable.from_pla(PLA.from_file(tmp_path / "adder.pla")) == expected
+
+    cached = TruthTable.from_function(adder, 8, 5, chunk_rows=64, cache=True)
+    calls.clear()
+    cached.rows
+    cached.rows
+    assert calls == [64] * 4
+
+
+def test_entropy():
+    # o0 = i0, o1 = i0 & i1, o2 = 1
+    table = TruthTable(["001", "001", "101", "111"])
+    assert table.output_entropies == [1, pytest.approx(0.811278), 0]
+    assert table.entropy == 1.5
+    assert table.conditional_entropy("o0", "i0") == 0
+    assert table.conditional_entropy("o1", ["i0", "i1"]) == 0
+    assert table.conditional_entropy("o1", "i0") == 0.5
+    assert table.mutual_information("o0", "i0") == 1
+    assert table.mutual_information(["o0", "o1"], "i1") == 0.5
+    assert table.mutual_information("o0", "i1") == 0
+
+    pla = PLA.from_truth_table(table)
+    assert pla.entropy == table.entropy
+    assert pla.output_entropies == table.output_entropies
+    assert pla.conditional_entropy("o1", "i0") == 0.5
+    assert pla.mutual_information("o0", "i0") == 1
+
+
+def test_entropy_counts(monkeypatch):
+    table = random_table(12, 6, seed=4)
+    packed = (
+        table.entropy,
+        table.conditional_entropy(["o0", "o3"], ["i1", "i7"]),
+        table.mutual_information(["o1", "o2"], [0, 5, 11]),
+    )
+    # Count the joint values as rows instead of packed codes
+    monkeypatch.setattr(truthtable, "_BINCOUNT_BITS", 0)
+    assert packed == pytest.approx(
+        (
+            table.entropy,
+            table.conditional_entropy(["o0", "o3"], ["i1", "i7"]),
+            table.mutual_information(["o1", "o2"], [0, 5, 11]),
+        )
+    )
+
+
+def test_dependencies():
+    def func(bits):
+        # o0 = majority(i0, i2, i7), o1 = i1 & ~i8, o2 = i3 ^ i5
+        majority = bits[:, [0, 2, 7]].sum(axis=1) >= 2
+        return np.stack(
+            [majority, bits[:, 1] & ~bits[:, 8], bits[:, 3] ^ bits[:, 5]], axis=1
+        )
+
+    table = TruthTable.from_function(func, 9, 3)
+    assert table.support("o0") == ["i0", "i2", "i7"]
+    assert table.support() == ["i0", "i1", "i2", "i3", "i5", "i7", "i8"]
+    unateness = table.unateness("o1")
+    assert unateness["i1"] == "positive"
+    assert unateness["i8"] == "negative"
+    assert unateness["i0"] == "independent"
+    assert table.unateness("o2")["i5"] == "binate"
+    pairs = table.symmetric_pairs("o0")
+    assert {("i0", "i2"), ("i0", "i7"), ("i2", "i7"), ("i1", "i3")} <= set(pairs)
+    assert ("i0", "i1") not in pairs
+    assert table.symmetric("o2", "i3", "i5")
+    assert not table.symmetric("o1", "i1", "i8")
+
+    pla = PLA(["1-0", "01-"], ["10", "01"], pla_type="fd")
+    assert pla.support("o0") == ["i0", "i2"]
+    assert pla.unateness("o0") == {
+        "i0": "positive",
+        "i1": "independent",
+        "i2": "negative",
+    }
+    majority = PLA(["11-", "1-1", "-11", "100"], ["1", "1", "1", "-"], pla_type="fd")
+    assert majority.symmetric_pairs("o0") == [("i1", "i2")]
+    assert not majority.symmetric("o0", "i0", "i1")
+    assert PLA(majority.input_rows[:3], ["1"] * 3).symmetric("o0", 0, 1)
+    # Minterm cubes make the check exact
+    assert PLA.from_truth_table(table).symmetric_pairs("o0") == pairs
+
+
+@pytest.mark.parametrize("num_inputs", [3, 8])
+def test_cofactor(num_inputs):
+    table = TruthTable.from_function(
+        lambda bits: np.stack([bits[:, 0] & bits[:, -1], bits.sum(axis=1) % 2], 1),
+        num_inputs,
+    )
+    table = TruthTable.from_planes(table.planes, num_inputs=num_inputs)
+    rows = table.evaluate(np.arange(len(table)))
+    for idx in range(num_inputs):
+        bit = 1 << (num_inputs - 1 - idx)
+        zeros = np.flatnonzero(np.arange(len(table)) & bit == 0)
+        for value in (0, 1):
+            cofactor = table.cofactor(idx, value)
+            assert cofactor.inputs == table.inputs[:idx] + table.inputs[idx + 1 :]
+            assert (
+                cofactor.rows
+                == TruthTable.from_planes(
+                    np.ascontiguousarray(cofactor.planes), inputs=cofactor.inputs
+                ).rows
+            )
+            expected = rows[zeros + value * bit]
+            assert np.array_equal(cofactor.evaluate(np.arange(len(zeros))), expected)
+            restricted = table.restrict(table.inputs[idx], value)
+            assert restricted.cofactor(idx, 0) == cofactor
+            assert restricted.cofactor(idx, 1) == cofactor
+
+    order = list(range(num_inputs))[::-1]
+    reversed_table = table.permute_inputs(order)
+    assert reversed_table.inputs == table.inputs[::-1]
+    assert reversed_table.permute_inputs(order) == table
+
+    pla = PLA.from_truth_table(table)
+    assert TruthTable.from_pla(pla.cofactor(0, 1)) == table.cofactor(0, 1)
+    assert TruthTable.from_pla(pla.permute_inputs(order)) == reversed_table
+
+
+def test_view_evaluate(monkeypatch):
+    table = random_table(12, 2, seed=5)
+    view = table.cofactor(1, 1)
+    expected = TruthTable.from_planes(view.planes, num_inputs=11)
+    rows = np.random.default_rng(0).integers(0, len(view), 100)
+    # Views look up words without copying their planes
+    monkeypatch.setattr(
+        truthtable.TruthTableView, "planes", property(lambda self: pytest.fail())
+    )
+    assert (view.evaluate(rows) == expected.evaluate(rows)).all()
+
+
+def test_view_inplace():
+    table = TruthTable.from_function(lambda bits: bits[:, [0, 5]] ^ bits[:, 8:], 9)
+    table = TruthTable.from_planes(table.planes, num_inputs=9)
+    original = table.rows
+    high, low = table.cofactor(0, 1), table.cofactor(0, 0)
+    assert not np.shares_memory(high.planes, table.planes)
+    expected = high ^ low
+    high ^= low
+    assert high == expected
+    high |= low
+    high &= low
+    assert high == low
+    permuted = table.permute_inputs(list(range(9))[::-1])
+    permuted ^= permuted
+    assert not permuted.planes.any()
+    assert table.rows == original
+
+
+def test_drop_inputs():
+    table = TruthTable.from_function(lambda bits: bits[:, 2] ^ bits[:, 7], 9, 1)
+    dropped = table.drop_inputs()
+    assert dropped.inputs == ["i2", "i7"]
+    assert dropped.rows == ["0", "1", "1", "0"]
+    assert table.drop_inputs(["i0"]).num_inputs == 8
+    with pytest.raises(ValueError):
+        table.drop_inputs(["i2"])
+    pla = PLA(["1-0-", "01--"], ["10", "01"], pla_type="fd")
+    assert pla.drop_inputs().input_rows == ["1-0", "01-"]
+
+
+@pytest.mark.parametrize("pla_type", ["f", "fd", "fr", "r"])
+def test_pla_compact(pla_type):
+    pla = PLA(
+        ["1-0", "1-0", "1-0", "110", "0--", "01-", "-11"],
+        ["10", "10", "01", "10", "10", "10", "01"],
+        pla_type=pla_type,
+    )
+    assert pla.deduplicate().input_rows == ["1-0", "1-0", "110", "0--", "01-", "-11"]
+    merged = pla.merge()
+    if pla_type == "fr":
+        # "10" and "01" put both outputs in both the on and off sets
+        assert merged.input_rows == pla.input_rows
+    else:
+        assert merged.input_rows == ["1-0", "110", "0--", "01-", "-11"]
+        assert merged.output_rows[0] == ("00" if pla_type == "r" else "11")
+    compact = pla.compact()
+    if pla_type in ("f", "fd"):
+        # "110" and "01-" are covered by "1-0" and "0--"
+        assert compact.input_rows == ["1-0", "0--", "-11"]
+    assert TruthTable.from_pla(compact) == TruthTable.from_pla(pla)
+
+    assert "0--" in pla
+    assert ("-11", "01") in pla
+    assert ("-11", "10") not in pla
+    assert pla.find(["01-", "111", "1-0"]).tolist() == [5, -1, 0]
+    # The index is built once and rebuilt when the lines are replaced
+    index = pla._sorted_keys(False)
+    assert "111" not in pla
+    assert pla._sorted_keys(False) is index
+    pla.input_lines = pla.input_lines[::-1]
+    assert pla._sorted_keys(False) is not index
+    assert pla.find(["01-"]).tolist() == [len(pla) - 6]
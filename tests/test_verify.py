@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from truthtables import PLA, TruthTable, equivalent, minimize, random_table
+from truthtables.bdd import BDDTable
+
+
+@pytest.mark.parametrize("pla_type", ["f", "fd", "fr", "fdr", "r"])
+def test_equivalent_pla(pla_type):
+    rng = np.random.default_rng(1)
+    input_lines = rng.choice([0, 1, 2], size=(30, 9), p=[0.3, 0.3, 0.4])
+    output_lines = rng.choice([0, 1, 2], size=(30, 3))
+    pla = PLA(
+        input_lines.astype(np.int8), output_lines.astype(np.int8), pla_type=pla_type
+    )
+    table = TruthTable.from_pla(pla)
+    assert equivalent(pla, table, chunk_rows=64)
+    assert equivalent(table, pla)
+
+    # Changing a don't care row keeps the tables equivalent
+    _, dcset = pla._evaluate_sets(np.arange(len(table)))
+    flipped = table.evaluate(np.arange(len(table))) ^ dcset
+    assert equivalent(pla, TruthTable.from_function(lambda b: flipped, 9, 3))
+
+    row, output = np.argwhere(~dcset)[-1]
+    flipped[row, output] ^= 1
+    other = TruthTable.from_function(lambda b: flipped, 9, 3)
+    assert equivalent(pla, other, return_counterexample=True, chunk_rows=64) == (
+        False,
+        (row, f"o{output}"),
+    )
+
+
+def test_equivalent_minimized():
+    table = random_table(8, 3, seed=4)
+    result = minimize(table, engine="native")
+    assert equivalent(result, table)
+    assert equivalent(BDDTable.from_truth_table(table), result)
+    assert not equivalent(result, ~table)
+    with pytest.raises(ValueError):
+        equivalent(result, random_table(7, 3))
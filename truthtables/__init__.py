@@ -1,4 +1,7 @@
 from truthtables.truthtable import TruthTable, PLA
+from truthtables.bdd import BDDTable
 from truthtables.io import to_file
 from truthtables.generators import random_table
-from truthtables.transforms import minimize
+from truthtables.transforms import minimize, minimize_many
+from truthtables.verify import equivalent
+from truthtables.sharded import ShardedTruthTable
@@ -0,0 +1,5 @@
+import sys
+
+from truthtables.cli import main
+
+sys.exit(main())
@@ -0,0 +1,104 @@
+"""Helpers for working with bit-packed truth table columns.
+
+Outputs are stored as bit-planes: one row of uint64 words per output where
+bit ``r % 64`` of word ``r // 64`` holds the value of the output at row ``r``.
+Padding bits past the last row are always kept at zero.
+"""
+import numpy as np
+
+WORD_BITS = 64
+WORD_DTYPE = np.dtype(np.uint64)
+
+
+def num_words(num_rows):
+    """Number of words needed to hold `num_rows` bits."""
+    return -(-num_rows // WORD_BITS)
+
+
+def tail_mask(num_rows):
+    """Mask of the valid bits in the last word of a plane."""
+    rem = num_rows % WORD_BITS
+    if rem == 0:
+        return np.uint64(0xFFFFFFFFFFFFFFFF)
+    return np.uint64((1 << rem) - 1)
+
+
+def pack_bits(bits):
+    """Pack a (rows, outputs) array of 0/1 values into bit-planes.
+
+    Parameters
+    ----------
+    bits: numpy.ndarray
+            2D array with one row per truth table row and one column
+            per output.
+
+    Returns
+    -------
+    numpy.ndarray
+            Array of shape (outputs, words) and dtype uint64.
+    """
+    bits = np.asarray(bits, dtype=np.uint8)
+    num_rows, num_outputs = bits.shape
+    words = num_words(num_rows)
+    packed = np.packbits(bits.T, axis=1, bitorder="little")
+    buf = np.zeros((num_outputs, words * 8), dtype=np.uint8)
+    buf[:, : packed.shape[1]] = packed
+    return buf.view("<u8").astype(WORD_DTYPE, copy=False)
+
+
+def unpack_planes(planes, num_rows=None):
+    """Unpack bit-planes into a (rows, outputs) array of 0/1 values.
+
+    Parameters
+    ----------
+    planes: numpy.ndarray
+            Array of shape (outputs, words) and dtype uint64.
+    num_rows: int
+            Number of rows to unpack. Defaults to every bit in `planes`.
+
+    Returns
+    -------
+    numpy.ndarray
+            Array of shape (rows, outputs) and dtype uint8.
+    """
+    planes = np.ascontiguousarray(planes, dtype="<u8")
+    if num_rows is None:
+        num_rows = planes.shape[1] * WORD_BITS
+    bits = np.unpackbits(planes.view(np.uint8), axis=1, bitorder="little")
+    return bits[:, :num_rows].T
+
+
+def popcount(words):
+    """Count the set bits in each element of a uint64 array."""
+    words = np.asarray(words, dtype=WORD_DTYPE)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    counts = _BYTE_POPCOUNT[as_bytes].reshape(words.shape + (8,))
+    return counts.sum(axis=-1, dtype=np.uint8)
+
+
+_BYTE_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def input_bits(start, stop, num_inputs):
+    """Input values for rows ``start..stop`` as a (rows, inputs) uint8 array.
+
+    The first input is the most significant bit of the row index.
+    """
+    return row_bits(np.arange(start, stop, dtype=np.uint64), num_inputs)
+
+
+def row_bits(rows, num_inputs):
+    """Input values for an array of row indices as a (rows, inputs) array."""
+    rows = np.asarray(rows, dtype=np.uint64)
+    shifts = np.arange(num_inputs - 1, -1, -1, dtype=np.uint64)
+    return ((rows[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def bits_to_strs(bits):
+    """Convert a (rows, cols) array of small ints into strings via ASCII."""
+    bits = np.ascontiguousarray(bits, dtype=np.uint8)
+    width = bits.shape[1]
+    s = (bits + ord("0")).tobytes().decode("ascii")
+    return [s[i : i + width] for i in range(0, len(s), width)]
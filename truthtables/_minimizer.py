@@ -0,0 +1,355 @@
+"""In-process two-level logic minimization.
+
+Cubes are represented as ``(care, value)`` pairs of ints where bit ``k``
+corresponds to bit ``k`` of a row index, so the first input of a table is
+bit ``num_inputs - 1``. A row ``r`` is in a cube if ``r & care == value``.
+
+Each output is minimized on its own, either with a heuristic
+expand/irredundant/reduce loop in the style of espresso or, for small
+numbers of inputs, exactly by generating every prime implicant and solving
+the covering problem. Cubes are then shared between outputs wherever that
+is allowed.
+"""
+
+import time
+
+import numpy as np
+
+from truthtables.truthtable import DC, PLA, TruthTable, _pla_planes
+from truthtables._bits import unpack_planes
+
+# Tables with at most this many inputs are minimized exactly by default
+EXACT_MAX_INPUTS = 8
+
+# Maximum number of reduce/expand/irredundant passes of the heuristic loop
+MAX_PASSES = 8
+
+# Maximum number of nodes explored while solving a covering problem exactly
+MAX_COVER_NODES = 20000
+
+
+def minimize_native(table, exact=None, deadline=None):
+    """Minimize a truth table without calling espresso.
+
+    Parameters
+    ----------
+    table: TruthTable or PLA
+            The table to minimize. Don't cares of a PLA are respected.
+    exact: bool
+            If True, find a minimum cover for each output from all of its
+            prime implicants. If False, use the heuristic loop. Defaults to
+            exact minimization for tables with at most `EXACT_MAX_INPUTS`
+            inputs.
+    deadline: float
+            If given, a `time.monotonic` value after which a `TimeoutError`
+            is raised.
+
+    Returns
+    -------
+    PLA
+            The minimized table, with type "fd".
+    """
+    num_inputs = table.num_inputs
+    if isinstance(table, TruthTable):
+        on_planes = table.planes
+        dc_planes = np.zeros_like(on_planes)
+    else:
+        on_planes, dc_planes = _pla_planes(table)
+    onsets = unpack_planes(on_planes, 2**num_inputs).T.astype(bool)
+    dcsets = unpack_planes(dc_planes, 2**num_inputs).T.astype(bool)
+    if exact is None:
+        exact = num_inputs <= EXACT_MAX_INPUTS
+
+    allowed = onsets | dcsets
+    required = onsets & ~dcsets
+    covers = []
+    for output in range(table.num_outputs):
+        if exact:
+            cover = _exact_cover(
+                required[output], allowed[output], num_inputs, deadline
+            )
+        else:
+            cover = _heuristic_cover(
+                required[output], allowed[output], num_inputs, deadline
+            )
+        covers.append(cover)
+    cubes = _share_outputs(covers, required, allowed, num_inputs)
+
+    input_lines = np.full((len(cubes), num_inputs), DC, dtype=np.int8)
+    output_lines = np.zeros((len(cubes), table.num_outputs), dtype=np.int8)
+    for idx, ((care, value), outputs) in enumerate(cubes):
+        for col in range(num_inputs):
+            bit = 1 << (num_inputs - 1 - col)
+            if care & bit:
+                input_lines[idx, col] = 1 if value & bit else 0
+        output_lines[idx, sorted(outputs)] = 1
+    return PLA(
+        input_lines,
+        output_lines,
+        name=table.name,
+        inputs=table.inputs,
+        outputs=table.outputs,
+        pla_type="fd",
+    )
+
+
+def _check_deadline(deadline):
+    if deadline is not None and time.monotonic() > deadline:
+        raise TimeoutError("Minimization did not finish before the deadline")
+
+
+def _cube_rows(cube, num_inputs):
+    """Every row index in a cube."""
+    care, value = cube
+    rows = np.array([value], dtype=np.int64)
+    for bit in range(num_inputs):
+        if not care >> bit & 1:
+            rows = np.concatenate((rows, rows + (1 << bit)))
+    return rows
+
+
+def _num_literals(cube):
+    return bin(cube[0]).count("1")
+
+
+def _cost(cover):
+    return len(cover), sum(_num_literals(c) for c in cover)
+
+
+def _expand(cube, allowed, gain_rows, num_inputs):
+    """Greedily remove literals from a cube while it stays inside `allowed`.
+
+    At each step the literal whose removal adds the most `gain_rows` is
+    removed.
+    """
+    care, value = cube
+    while True:
+        best = None
+        best_gain = -1
+        for bit in range(num_inputs):
+            mask = 1 << bit
+            if not care & mask:
+                continue
+            # Removing the literal adds the rows of the opposite half-cube
+            rows = _cube_rows((care, value ^ mask), num_inputs)
+            if not allowed[rows].all():
+                continue
+            gain = int(gain_rows[rows].sum())
+            if gain > best_gain:
+                best = mask
+                best_gain = gain
+        if best is None:
+            return care, value
+        care &= ~best
+        value &= ~best
+
+
+def _coverage(cover, num_rows, num_inputs):
+    counts = np.zeros(num_rows, dtype=np.int64)
+    for cube in cover:
+        counts[_cube_rows(cube, num_inputs)] += 1
+    return counts
+
+
+def _irredundant(cover, required, num_inputs):
+    """Remove cubes whose required rows are all covered by other cubes.
+
+    Cubes with the most literals are considered for removal first.
+    """
+    counts = _coverage(cover, len(required), num_inputs)
+    kept = []
+    for cube in sorted(cover, key=_num_literals, reverse=True):
+        rows = _cube_rows(cube, num_inputs)
+        rows = rows[required[rows]]
+        if (counts[rows] > 1).all():
+            counts[_cube_rows(cube, num_inputs)] -= 1
+        else:
+            kept.append(cube)
+    return kept
+
+
+def _reduce(cover, required, num_inputs):
+    """Shrink each cube to the smallest cube containing its unique rows."""
+    counts = _coverage(cover, len(required), num_inputs)
+    full = (1 << num_inputs) - 1
+    reduced = []
+    for cube in sorted(cover, key=_num_literals):
+        rows = _cube_rows(cube, num_inputs)
+        counts[rows] -= 1
+        unique = rows[required[rows] & (counts[rows] == 0)]
+        if not len(unique):
+            continue
+        ones = int(np.bitwise_and.reduce(unique))
+        anys = int(np.bitwise_or.reduce(unique))
+        care = ~(ones ^ anys) & full
+        cube = (care, ones & care)
+        counts[_cube_rows(cube, num_inputs)] += 1
+        reduced.append(cube)
+    return reduced
+
+
+def _heuristic_cover(required, allowed, num_inputs, deadline=None):
+    full = (1 << num_inputs) - 1
+    cover = []
+    uncovered = required.copy()
+    for row in np.flatnonzero(required).tolist():
+        if not uncovered[row]:
+            continue
+        _check_deadline(deadline)
+        cube = _expand((full, row), allowed, uncovered, num_inputs)
+        uncovered[_cube_rows(cube, num_inputs)] = False
+        cover.append(cube)
+    cover = _irredundant(cover, required, num_inputs)
+
+    best = cover
+    for _ in range(MAX_PASSES):
+        _check_deadline(deadline)
+        cover = _reduce(cover, required, num_inputs)
+        cover = [_expand(c, allowed, required, num_inputs) for c in cover]
+        cover = _irredundant(list(set(cover)), required, num_inputs)
+        if _cost(cover) >= _cost(best):
+            break
+        best = cover
+    return best
+
+
+def _primes(allowed, num_inputs, deadline=None):
+    """All prime implicants of a function by iterated merging (Quine-McCluskey)."""
+    full = (1 << num_inputs) - 1
+    current = {(full, row) for row in np.flatnonzero(allowed).tolist()}
+    primes = []
+    while current:
+        _check_deadline(deadline)
+        merged = set()
+        larger = set()
+        for care, value in current:
+            for bit in range(num_inputs):
+                mask = 1 << bit
+                if care & mask and (care, value ^ mask) in current:
+                    larger.add((care & ~mask, value & ~mask))
+                    merged.add((care, value))
+        primes.extend(current - merged)
+        current = larger
+    return primes
+
+
+def _exact_cover(required, allowed, num_inputs, deadline=None):
+    rows = np.flatnonzero(required)
+    if not len(rows):
+        return []
+    row_bit = {row: 1 << idx for idx, row in enumerate(rows.tolist())}
+    candidates = []
+    for prime in _primes(allowed, num_inputs, deadline):
+        covered = 0
+        for row in _cube_rows(prime, num_inputs).tolist():
+            covered |= row_bit.get(row, 0)
+        if covered:
+            candidates.append((prime, covered))
+    chosen = _solve_cover(candidates, (1 << len(rows)) - 1, deadline)
+    return [candidates[idx][0] for idx in chosen]
+
+
+def _solve_cover(candidates, target, deadline=None):
+    """Pick the cheapest set of candidates whose bitsets cover `target`.
+
+    A greedy solution is improved by branch and bound until
+    `MAX_COVER_NODES` nodes have been explored.
+    """
+    costs = [(1, _num_literals(cube)) for cube, _ in candidates]
+    covering = {}
+    for idx, (_, covered) in enumerate(candidates):
+        bits = covered
+        while bits:
+            low = bits & -bits
+            covering.setdefault(low, []).append(idx)
+            bits ^= low
+
+    # Greedy starting point
+    remaining = target
+    best = []
+    while remaining:
+        idx = max(
+            range(len(candidates)),
+            key=lambda i: (bin(candidates[i][1] & remaining).count("1"), -costs[i][1]),
+        )
+        best.append(idx)
+        remaining &= ~candidates[idx][1]
+
+    def total(chosen):
+        return len(chosen), sum(costs[i][1] for i in chosen)
+
+    best_cost = total(best)
+    nodes = 0
+
+    def search(remaining, chosen):
+        nonlocal best, best_cost, nodes
+        nodes += 1
+        if nodes > MAX_COVER_NODES:
+            return
+        if nodes % 1000 == 0:
+            _check_deadline(deadline)
+        if not remaining:
+            cost = total(chosen)
+            if cost < best_cost:
+                best, best_cost = list(chosen), cost
+            return
+        if len(chosen) + 1 > best_cost[0]:
+            return
+        # Branch on the row with the fewest candidates covering it
+        bits = remaining
+        row = None
+        while bits:
+            low = bits & -bits
+            if row is None or len(covering[low]) < len(covering[row]):
+                row = low
+            bits ^= low
+        options = sorted(
+            covering[row],
+            key=lambda i: -bin(candidates[i][1] & remaining).count("1"),
+        )
+        for idx in options:
+            chosen.append(idx)
+            search(remaining & ~candidates[idx][1], chosen)
+            chosen.pop()
+
+    search(target, [])
+    return best
+
+
+def _share_outputs(covers, required, allowed, num_inputs):
+    """Combine per-output covers into multi-output cubes.
+
+    Each cube is added to every output it is an implicant of, then cubes
+    that became redundant for an output are removed from it, preferring to
+    keep cubes that are used by many outputs.
+
+    Returns
+    -------
+    list of ((int, int), set of int)
+            The cubes and the outputs they are used by.
+    """
+    cubes = {}
+    for output, cover in enumerate(covers):
+        for cube in cover:
+            cubes.setdefault(cube, set()).add(output)
+    for cube, outputs in cubes.items():
+        rows = _cube_rows(cube, num_inputs)
+        for output in range(len(covers)):
+            if output not in outputs and allowed[output][rows].all():
+                outputs.add(output)
+
+    for output in range(len(covers)):
+        users = [cube for cube, outputs in cubes.items() if output in outputs]
+        users.sort(key=lambda c: (len(cubes[c]), -_num_literals(c)))
+        counts = _coverage(users, len(required[output]), num_inputs)
+        for cube in users:
+            rows = _cube_rows(cube, num_inputs)
+            needed = rows[required[output][rows]]
+            if (counts[needed] > 1).all():
+                counts[rows] -= 1
+                cubes[cube].discard(output)
+
+    return sorted(
+        ((cube, outputs) for cube, outputs in cubes.items() if outputs),
+        key=lambda item: (-item[0][0], item[0][1]),
+    )
@@ -0,0 +1,476 @@
+"""Reduced ordered binary decision diagrams"""
+
+import numpy as np
+
+from truthtables.truthtable import (
+    DC,
+    PLA,
+    TruthTable,
+    _as_input_bits,
+    _cube_covers,
+)
+from truthtables._bits import WORD_BITS, num_words, pack_bits
+
+# Number of rows evaluated at a time when expanding a BDD into a table
+CHUNK_ROWS = 2**16
+
+
+class BDD:
+    """Manager for the nodes of reduced ordered BDDs over `num_vars` variables.
+
+    Nodes are ints. `FALSE` (0) and `TRUE` (1) are the terminals, and
+    variable 0 is at the top of the order. A unique table guarantees that
+    every function has exactly one node, so two functions are equal if and
+    only if their nodes are equal. Results of `ite` are kept in a
+    direct-mapped computed table where new results evict old ones.
+
+    Parameters
+    ----------
+    num_vars: int
+            The number of variables.
+    cache_size: int
+            The number of entries in the computed table.
+    """
+
+    FALSE = 0
+    TRUE = 1
+
+    def __init__(self, num_vars, cache_size=2**16):
+        self.num_vars = num_vars
+        # Terminals are at level num_vars, below every variable
+        self._var = [num_vars, num_vars]
+        self._low = [0, 1]
+        self._high = [0, 1]
+        self._unique = {}
+        self.cache_size = cache_size
+        self._computed = [None] * cache_size
+        self._node_arrays = None
+
+    def __len__(self):
+        return len(self._var)
+
+    def node(self, var, low, high):
+        """Get the node for "if var then high else low"."""
+        if low == high:
+            return low
+        key = (var, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            node = len(self._var)
+            self._var.append(var)
+            self._low.append(low)
+            self._high.append(high)
+            self._unique[key] = node
+        return node
+
+    def var(self, var):
+        """Get the node for a single variable."""
+        return self.node(var, self.FALSE, self.TRUE)
+
+    def level(self, u):
+        """The variable tested at a node, or `num_vars` for terminals."""
+        return self._var[u]
+
+    def low(self, u):
+        return self._low[u]
+
+    def high(self, u):
+        return self._high[u]
+
+    def ite(self, f, g, h):
+        """If-then-else: the function "(f & g) | (~f & h)"."""
+        if f == self.TRUE:
+            return g
+        if f == self.FALSE:
+            return h
+        if g == h:
+            return g
+        if g == self.TRUE and h == self.FALSE:
+            return f
+
+        key = (f, g, h)
+        slot = hash(key) % self.cache_size
+        entry = self._computed[slot]
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        var = min(self._var[f], self._var[g], self._var[h])
+        f0, f1 = self._cofactors(f, var)
+        g0, g1 = self._cofactors(g, var)
+        h0, h1 = self._cofactors(h, var)
+        result = self.node(var, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self._computed[slot] = (key, result)
+        return result
+
+    def _cofactors(self, u, var):
+        if self._var[u] == var:
+            return self._low[u], self._high[u]
+        return u, u
+
+    def neg(self, u):
+        return self.ite(u, self.FALSE, self.TRUE)
+
+    def apply(self, op, u, v):
+        """Combine two functions with a binary operator.
+
+        Parameters
+        ----------
+        op: str
+                One of "and", "or", "xor", "xnor", "nand", "nor" or "imp".
+        u: int
+        v: int
+
+        Returns
+        -------
+        int
+        """
+        if op == "and":
+            return self.ite(u, v, self.FALSE)
+        if op == "or":
+            return self.ite(u, self.TRUE, v)
+        if op == "xor":
+            return self.ite(u, self.neg(v), v)
+        if op == "xnor":
+            return self.ite(u, v, self.neg(v))
+        if op == "nand":
+            return self.neg(self.ite(u, v, self.FALSE))
+        if op == "nor":
+            return self.neg(self.ite(u, self.TRUE, v))
+        if op == "imp":
+            return self.ite(u, v, self.TRUE)
+        raise ValueError(f"Unknown operator: '{op}'")
+
+    def restrict(self, u, var, value):
+        """Fix a variable to a constant."""
+        memo = {}
+
+        def visit(u):
+            if self._var[u] > var:
+                return u
+            if u in memo:
+                return memo[u]
+            if self._var[u] == var:
+                result = self._high[u] if value else self._low[u]
+            else:
+                result = self.node(
+                    self._var[u], visit(self._low[u]), visit(self._high[u])
+                )
+            memo[u] = result
+            return result
+
+        return visit(u)
+
+    def satcount(self, u):
+        """The number of assignments to all variables that make `u` true."""
+        memo = {self.FALSE: 0, self.TRUE: 1}
+
+        def count(u):
+            # Assignments of the variables from the level of u downwards
+            if u not in memo:
+                var = self._var[u]
+                low, high = self._low[u], self._high[u]
+                memo[u] = count(low) * 2 ** (self._var[low] - var - 1) + count(
+                    high
+                ) * 2 ** (self._var[high] - var - 1)
+            return memo[u]
+
+        return count(u) * 2 ** self._var[u]
+
+    def size(self, u):
+        """The number of nodes reachable from `u`, including terminals."""
+        seen = set()
+        stack = [u]
+        while stack:
+            u = stack.pop()
+            if u in seen:
+                continue
+            seen.add(u)
+            if u > self.TRUE:
+                stack.extend((self._low[u], self._high[u]))
+        return len(seen)
+
+    def cubes(self, u):
+        """Yield the paths to `TRUE` as dicts of variable to value.
+
+        The cubes are disjoint and together cover the onset of `u`.
+        """
+        path = {}
+
+        def visit(u):
+            if u == self.TRUE:
+                yield dict(path)
+            elif u != self.FALSE:
+                var = self._var[u]
+                for value, child in ((0, self._low[u]), (1, self._high[u])):
+                    path[var] = value
+                    yield from visit(child)
+                del path[var]
+
+        yield from visit(u)
+
+    def _arrays(self):
+        """The node lists as arrays, rebuilt only after nodes are added."""
+        if self._node_arrays is None or len(self._node_arrays[0]) != len(self):
+            self._node_arrays = (
+                np.array(self._var),
+                np.array(self._low),
+                np.array(self._high),
+            )
+        return self._node_arrays
+
+    def evaluate(self, u, inputs):
+        """Evaluate a function for a (vectors, vars) array of 0/1 values."""
+        var, low, high = self._arrays()
+        current = np.full(len(inputs), u, dtype=np.int64)
+        rows = np.arange(len(inputs)) if var[u] < self.num_vars else np.arange(0)
+        while len(rows):
+            nodes = current[rows]
+            bits = inputs[rows, var[nodes]].astype(bool)
+            current[rows] = np.where(bits, high[nodes], low[nodes])
+            rows = rows[var[current[rows]] < self.num_vars]
+        return current == self.TRUE
+
+
+class BDDTable:
+    """A multi-output function represented as one BDD root per output.
+
+    Parameters
+    ----------
+    manager: BDD
+            The manager owning the nodes. Variable i is input i.
+    roots: list of int
+            The node of each output.
+    inputs: list of str
+    outputs: list of str
+    name: str
+    """
+
+    def __init__(self, manager, roots, inputs=None, outputs=None, name="ckt"):
+        self.manager = manager
+        self.roots = list(roots)
+        if inputs:
+            if len(inputs) != manager.num_vars:
+                raise ValueError("Number of inputs must equal number of variables")
+            self.inputs = inputs
+        else:
+            self.inputs = [f"i{i}" for i in range(manager.num_vars)]
+        if outputs:
+            if len(outputs) != len(self.roots):
+                raise ValueError("Number of outputs must equal number of roots")
+            self.outputs = outputs
+        else:
+            self.outputs = [f"o{i}" for i in range(len(self.roots))]
+        self.name = name
+
+    @staticmethod
+    def from_truth_table(table, manager=None):
+        """Build BDDs from a TruthTable.
+
+        The last (up to) six inputs are handled a whole plane word at a time,
+        and the remaining levels are reduced with one vectorized pass each.
+        """
+        num_inputs = table.num_inputs
+        manager = manager or BDD(num_inputs)
+        num_low = min(num_inputs, 6)
+        word_nodes = {}
+
+        def word_node(word, var, width):
+            # Node for the `width` rows in the low bits of `word`
+            if width == 1:
+                return word & 1
+            key = (word, var)
+            if key not in word_nodes:
+                half = width // 2
+                low = word_node(word & ((1 << half) - 1), var + 1, half)
+                high = word_node(word >> half, var + 1, half)
+                word_nodes[key] = manager.node(var, low, high)
+            return word_nodes[key]
+
+        roots = []
+        for output in range(table.num_outputs):
+            words = []
+            for start in range(0, num_words(len(table)), CHUNK_ROWS // WORD_BITS):
+                chunk = table._words(start, start + CHUNK_ROWS // WORD_BITS)
+                words.append(chunk[output])
+            words = np.concatenate(words)
+            uniques, inverse = np.unique(words, return_inverse=True)
+            nodes = np.array(
+                [
+                    word_node(int(w), num_inputs - num_low, 2**num_low)
+                    for w in uniques
+                ],
+                dtype=np.int64,
+            )
+            level = nodes[inverse.ravel()]
+            for var in range(num_inputs - num_low - 1, -1, -1):
+                # Encode each (low, high) pair as one int to find unique pairs
+                pairs = level.reshape(-1, 2)
+                base = len(manager)
+                keys, inverse = np.unique(
+                    pairs[:, 0] * base + pairs[:, 1], return_inverse=True
+                )
+                nodes = np.array(
+                    [
+                        manager.node(var, *map(int, divmod(key, base)))
+                        for key in keys.tolist()
+                    ],
+                    dtype=np.int64,
+                )
+                level = nodes[inverse.ravel()]
+            roots.append(int(level[0]))
+        return BDDTable(
+            manager,
+            roots,
+            inputs=table.inputs,
+            outputs=table.outputs,
+            name=table.name,
+        )
+
+    @staticmethod
+    def from_pla(pla, manager=None):
+        """Build BDDs from the cubes of a PLA.
+
+        Outputs follow `TruthTable.from_pla`, so don't cares become 0.
+        """
+        manager = manager or BDD(pla.num_inputs)
+        on, off, dc = _cube_covers(pla)
+
+        def cover(covers, output):
+            result = manager.FALSE
+            for line in pla.input_lines[covers[:, output]]:
+                cube = manager.TRUE
+                for var in range(pla.num_inputs - 1, -1, -1):
+                    if line[var] == 1:
+                        cube = manager.node(var, manager.FALSE, cube)
+                    elif line[var] == 0:
+                        cube = manager.node(var, cube, manager.FALSE)
+                result = manager.apply("or", result, cube)
+            return result
+
+        roots = []
+        for output in range(pla.num_outputs):
+            dc_root = cover(dc, output)
+            if "f" in pla.pla_type:
+                roots.append(cover(on, output))
+            else:
+                off_root = manager.apply("or", cover(off, output), dc_root)
+                roots.append(manager.neg(off_root))
+        return BDDTable(
+            manager,
+            roots,
+            inputs=pla.inputs,
+            outputs=pla.outputs,
+            name=pla.name,
+        )
+
+    @property
+    def num_inputs(self):
+        return len(self.inputs)
+
+    @property
+    def num_outputs(self):
+        return len(self.outputs)
+
+    def __len__(self):
+        return 2**self.num_inputs
+
+    def _with_roots(self, roots):
+        return BDDTable(
+            self.manager,
+            roots,
+            inputs=self.inputs,
+            outputs=self.outputs,
+            name=self.name,
+        )
+
+    def _apply(self, op, other):
+        if other.manager is not self.manager:
+            raise ValueError("BDDTables must share a manager")
+        if self.num_outputs != other.num_outputs:
+            raise ValueError("BDDTables must have same number of outputs")
+        return self._with_roots(
+            [self.manager.apply(op, u, v) for u, v in zip(self.roots, other.roots)]
+        )
+
+    def __and__(self, other):
+        return self._apply("and", other)
+
+    def __or__(self, other):
+        return self._apply("or", other)
+
+    def __xor__(self, other):
+        return self._apply("xor", other)
+
+    def __invert__(self):
+        return self._with_roots([self.manager.neg(u) for u in self.roots])
+
+    def restrict(self, input, value):
+        """Fix an input to a constant. The input is kept but unused."""
+        var = self.inputs.index(input)
+        return self._with_roots(
+            [self.manager.restrict(u, var, value) for u in self.roots]
+        )
+
+    def satcount(self, output):
+        """The number of rows for which an output is 1."""
+        return self.manager.satcount(self.roots[self.outputs.index(output)])
+
+    def evaluate(self, inputs):
+        """Compute the outputs for many input vectors at once.
+
+        See `TruthTable.evaluate`.
+        """
+        bits = _as_input_bits(inputs, self.num_inputs)
+        result = np.empty((len(bits), self.num_outputs), dtype=np.uint8)
+        for output, root in enumerate(self.roots):
+            result[:, output] = self.manager.evaluate(root, bits)
+        return result
+
+    def to_truth_table(self):
+        """Expand into a TruthTable, evaluating the rows in chunks."""
+        planes = np.zeros((self.num_outputs, num_words(len(self))), dtype=np.uint64)
+        for start in range(0, len(self), CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, len(self))
+            bits = self.evaluate(np.arange(start, stop))
+            words = pack_bits(bits)
+            first = start // WORD_BITS
+            planes[:, first : first + words.shape[1]] = words
+        return TruthTable.from_planes(
+            planes,
+            num_inputs=self.num_inputs,
+            inputs=self.inputs,
+            outputs=self.outputs,
+            name=self.name,
+        )
+
+    def to_pla(self):
+        """Convert to a PLA with one cube per path to `TRUE`.
+
+        Paths that are shared between outputs become a single cube.
+
+        Returns
+        -------
+        PLA
+                A PLA of type "fd" whose cubes are disjoint for each output.
+        """
+        cubes = {}
+        for output, root in enumerate(self.roots):
+            for path in self.manager.cubes(root):
+                line = [DC] * self.num_inputs
+                for var, value in path.items():
+                    line[var] = value
+                cubes.setdefault(tuple(line), set()).add(output)
+        input_lines = np.array(list(cubes), dtype=np.int8).reshape(
+            len(cubes), self.num_inputs
+        )
+        output_lines = np.zeros((len(cubes), self.num_outputs), dtype=np.int8)
+        for idx, outputs in enumerate(cubes.values()):
+            output_lines[idx, sorted(outputs)] = 1
+        return PLA(
+            input_lines,
+            output_lines,
+            name=self.name,
+            inputs=self.inputs,
+            outputs=self.outputs,
+            pla_type="fd",
+        )
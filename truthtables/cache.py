@@ -0,0 +1,156 @@
+"""Content-addressed caching of minimization results"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from truthtables.truthtable import PLA, TruthTable, read_binary
+from truthtables.io import write_binary
+from truthtables._bits import num_words
+
+
+def table_hash(table):
+    """Hash the contents of a table.
+
+    Names are not part of the hash, so tables that only differ in their
+    input, output or module names hash the same. The cubes of a PLA are
+    sorted first, so the order of the cubes does not matter either.
+
+    Parameters
+    ----------
+    table: TruthTable or PLA
+
+    Returns
+    -------
+    str
+            The hex digest of the hash.
+    """
+    h = hashlib.sha256()
+    if isinstance(table, TruthTable):
+        h.update(f"truthtable {table.num_inputs} {table.num_outputs}\n".encode())
+        chunk_words = 2**14
+        for start in range(0, num_words(len(table)), chunk_words):
+            words = table._words(start, start + chunk_words)
+            h.update(np.ascontiguousarray(words, dtype="<u8").tobytes())
+    elif isinstance(table, PLA):
+        h.update(
+            f"pla {table.pla_type} {table.num_inputs} {table.num_outputs}\n".encode()
+        )
+        lines = np.concatenate((table.input_lines, table.output_lines), axis=1)
+        order = np.lexsort(lines.T[::-1])
+        h.update(np.ascontiguousarray(lines[order], dtype=np.int8).tobytes())
+    else:
+        raise TypeError(f"Cannot hash object of type '{type(table).__name__}'")
+    return h.hexdigest()
+
+
+class MinimizationCache:
+    """Cache of minimized tables with an in-memory LRU and optional disk tier.
+
+    Parameters
+    ----------
+    maxsize: int
+            The maximum number of results kept in memory.
+    directory: str or pathlib.Path
+            If given, results are also stored in this directory as binary
+            table files, so they can be shared between runs and processes.
+    """
+
+    def __init__(self, maxsize=1024, directory=None):
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(table, **options):
+        """The cache key for minimizing `table` with `options`."""
+        opts = ",".join(f"{k}={options[k]}" for k in sorted(options))
+        digest = hashlib.sha256(opts.encode()).hexdigest()[:16]
+        return f"{table_hash(table)}-{digest}"
+
+    def get(self, key):
+        """Look up a result, returning None if it is not cached."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        path = self._path(key)
+        if path and path.exists():
+            result = read_binary(path, mmap=False)
+            with self._lock:
+                self.disk_hits += 1
+                self._store(key, result)
+            return result
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, result):
+        """Add a result to the cache."""
+        result = PLA(
+            result.input_lines.copy(),
+            result.output_lines.copy(),
+            name=result.name,
+            inputs=result.inputs,
+            outputs=result.outputs,
+            pla_type=result.pla_type,
+        )
+        with self._lock:
+            self._store(key, result)
+        path = self._path(key)
+        if path and not path.exists():
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            write_binary(result, tmp_path)
+            os.replace(tmp_path, path)
+
+    def _store(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key):
+        return self.directory / f"{key}.ttb" if self.directory else None
+
+    def clear(self):
+        """Remove every in-memory entry and reset the statistics.
+
+        Files in the disk tier are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Hit/miss statistics of the cache.
+
+        Returns
+        -------
+        dict
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,333 @@
+"""Command line interface for converting, minimizing and verifying tables"""
+
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from truthtables.io import to_file
+from truthtables.transforms import minimize
+from truthtables.truthtable import PLA, is_binary_file, read_binary
+from truthtables.verify import equivalent
+
+# Suffixes of the files picked up from directories, and written for each format
+SOURCE_SUFFIXES = (".pla", ".pla.gz", ".ttb")
+FORMAT_SUFFIXES = {"pla": ".pla", "verilog": ".v", "binary": ".ttb"}
+
+# Records the source hashes of outputs when skipping by content hash
+MANIFEST = ".truthtables-manifest.json"
+
+
+def main(argv=None):
+    """Run the `truthtables` command.
+
+    Returns
+    -------
+    int
+            The exit status: 0 if every file succeeded, 1 otherwise.
+    """
+    args = _parser().parse_args(argv)
+    # Files written by earlier runs are not sources
+    output = getattr(args, "output", None)
+    sources = _find_sources(args.sources, exclude=output)
+    if not sources:
+        print("No input files found", file=sys.stderr)
+        return 1
+    if args.command == "verify":
+        jobs = [(src, _reference(src, rel, args), None) for src, rel in sources]
+        options = {}
+    else:
+        out_dir = Path(output)
+        suffix = FORMAT_SUFFIXES[args.to]
+        jobs = [
+            (src, None, out_dir / _with_suffix(rel, suffix)) for src, rel in sources
+        ]
+        writers = {}
+        for src, _, dst in jobs:
+            if dst in writers:
+                print(f"{writers[dst]} and {src} both write {dst}", file=sys.stderr)
+                return 1
+            writers[dst] = src
+        options = {"to": args.to, "mode": args.mode, "compact": args.compact}
+        if args.command == "minimize":
+            options.update(engine=args.engine, timeout=args.timeout)
+    return _run(args, jobs, options)
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="truthtables",
+        description="Convert, minimize and verify truth table files.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(sub):
+        sub.add_argument(
+            "sources",
+            nargs="+",
+            help="Files, directories (searched recursively) or glob patterns.",
+        )
+        sub.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (default: number of CPUs).",
+        )
+        sub.add_argument(
+            "-q", "--quiet", action="store_true", help="Only report failures."
+        )
+
+    def add_output(sub, default_to):
+        sub.add_argument("-o", "--output", required=True, help="Directory to write to.")
+        sub.add_argument(
+            "--to",
+            choices=sorted(FORMAT_SUFFIXES),
+            default=default_to,
+            help=f"Output format (default: {default_to}).",
+        )
+        sub.add_argument(
+            "--mode",
+            choices=["case", "sop"],
+            default="case",
+            help="How verilog files represent the table (default: case).",
+        )
+        sub.add_argument(
+            "--compact",
+            action="store_true",
+            help="Remove repeated and contained cubes of PLAs before "
+            "minimizing and writing.",
+        )
+        sub.add_argument(
+            "--skip",
+            choices=["mtime", "hash", "never"],
+            default="mtime",
+            help="When to skip up to date outputs: if newer than the source "
+            "(default), if the source's content hash is unchanged, or never.",
+        )
+
+    convert = commands.add_parser("convert", help="Convert between formats.")
+    add_common(convert)
+    add_output(convert, "binary")
+
+    mini = commands.add_parser("minimize", help="Minimize and write the tables.")
+    add_common(mini)
+    add_output(mini, "pla")
+    mini.add_argument(
+        "--engine",
+        choices=["espresso", "native"],
+        default="espresso",
+        help="The minimizer (default: espresso).",
+    )
+    mini.add_argument("--timeout", type=float, help="Seconds allowed per table.")
+
+    verify = commands.add_parser(
+        "verify", help="Check that tables define the same functions."
+    )
+    add_common(verify)
+    verify.add_argument(
+        "--against",
+        required=True,
+        help="Directory of reference tables with the same relative paths. "
+        "A reference may have any of the source suffixes.",
+    )
+    return parser
+
+
+def _find_sources(patterns, exclude=None):
+    """Expand files, directories and glob patterns.
+
+    Parameters
+    ----------
+    patterns: list of str
+    exclude: str
+            If given, files inside this directory are left out.
+
+    Returns
+    -------
+    list of tuple of (pathlib.Path, pathlib.Path)
+            Each source and its path relative to the directory it was found
+            in, which is kept for its output.
+    """
+    sources = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            for src in sorted(path.rglob("*")):
+                if src.is_file() and src.name.endswith(SOURCE_SUFFIXES):
+                    sources.setdefault(src, src.relative_to(path))
+        elif path.is_file():
+            sources.setdefault(path, Path(path.name))
+        else:
+            root = Path(
+                *itertools.takewhile(lambda p: not glob.has_magic(p), path.parts)
+            )
+            for match in sorted(glob.glob(pattern, recursive=True)):
+                if Path(match).is_file():
+                    sources.setdefault(Path(match), Path(match).relative_to(root))
+    if exclude is not None:
+        exclude = Path(exclude).resolve()
+        sources = {
+            src: rel
+            for src, rel in sources.items()
+            if exclude not in src.resolve().parents
+        }
+    return list(sources.items())
+
+
+def _stem(path):
+    """A path without its table suffix."""
+    name = path.name
+    for suffix in SOURCE_SUFFIXES:
+        if name.endswith(suffix):
+            return path.with_name(name[: -len(suffix)])
+    return path.with_suffix("")
+
+
+def _with_suffix(path, suffix):
+    return _stem(path).with_name(_stem(path).name + suffix)
+
+
+def _reference(src, rel, args):
+    """The table in the --against directory that `src` is compared to."""
+    stem = Path(args.against) / _stem(rel)
+    for suffix in SOURCE_SUFFIXES:
+        ref = stem.with_name(stem.name + suffix)
+        if ref.exists():
+            return ref
+    return stem.with_name(stem.name + SOURCE_SUFFIXES[0])
+
+
+def _read_table(path):
+    """Read a TruthTable or PLA from a PLA or binary table file."""
+    if is_binary_file(path):
+        return read_binary(path)
+    return PLA.from_file(path)
+
+
+def _source_hash(path, options):
+    """Hash a source file together with the options that produce an output."""
+    h = hashlib.sha256(json.dumps(options, sort_keys=True).encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2**20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _up_to_date(src, dst, skip, manifest, digest):
+    if skip == "never" or not dst.exists():
+        return False
+    if skip == "mtime":
+        return dst.stat().st_mtime >= src.stat().st_mtime
+    return manifest.get(str(dst)) == digest
+
+
+def _run(args, jobs, options):
+    """Run the jobs in a worker pool and report progress on stderr."""
+    skip = getattr(args, "skip", "never")
+    manifest_path = Path(args.output) / MANIFEST if skip == "hash" else None
+    manifest = {}
+    if manifest_path and manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+
+    todo = []
+    digests = {}
+    for src, ref, dst in jobs:
+        if skip == "hash":
+            digests[dst] = _source_hash(src, options)
+        if dst is not None and _up_to_date(src, dst, skip, manifest, digests.get(dst)):
+            continue
+        todo.append((args.command, src, ref, dst, options))
+
+    total = len(todo)
+    if not args.quiet:
+        print(f"{len(jobs) - total} up to date, {total} to process", file=sys.stderr)
+    failed = 0
+    for done, (job, error, elapsed) in enumerate(_execute(todo, args.jobs), 1):
+        _, src, _, dst, _ = job
+        if error is None and dst is not None and skip == "hash":
+            manifest[str(dst)] = digests[dst]
+        if error is not None:
+            failed += 1
+            print(f"[{done}/{total}] {src}: {error}", file=sys.stderr)
+        elif not args.quiet:
+            target = f" -> {dst}" if dst is not None else ": equivalent"
+            print(f"[{done}/{total}] {src}{target} ({elapsed:.2f}s)", file=sys.stderr)
+
+    if manifest_path and todo:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    if failed and not args.quiet:
+        print(f"{failed} of {total} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _execute(jobs, workers):
+    """Yield (job, error, seconds) for every job as it finishes."""
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield (job, *_process(*job))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        jobs = iter(jobs)
+        exhausted = False
+        while True:
+            # Keep a bounded number of jobs in flight
+            while not exhausted and len(pending) < 4 * workers:
+                try:
+                    job = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(_process, *job)] = job
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield (pending.pop(future), *future.result())
+
+
+def _process(command, src, ref, dst, options):
+    """Run one job in a worker.
+
+    Returns
+    -------
+    tuple of (str, float)
+            An error message, or None on success, and the seconds taken.
+    """
+    start = time.perf_counter()
+    try:
+        error = _process_table(command, src, ref, dst, options)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return error, time.perf_counter() - start
+
+
+def _process_table(command, src, ref, dst, options):
+    table = _read_table(src)
+    if command == "verify":
+        if not ref.exists():
+            return f"no reference table {ref}"
+        same, diff = equivalent(table, _read_table(ref), return_counterexample=True)
+        if not same:
+            return f"differs from {ref} at row {diff[0]}, output {diff[1]}"
+        return None
+    if command == "minimize":
+        table = minimize(
+            table,
+            engine=options["engine"],
+            timeout=options["timeout"],
+            compact=options["compact"],
+        )
+    if options["compact"] and isinstance(table, PLA):
+        table = table.compact()
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    to_file(table, dst, fmt=options["to"], mode=options["mode"])
+    return None
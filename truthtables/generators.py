@@ -1,10 +1,14 @@
 """Functions for generating truth tables"""
-import random
+import numpy as np
 
 from truthtables import TruthTable
+from truthtables.io import _create_binary
+from truthtables._bits import WORD_BITS, WORD_DTYPE, num_words, tail_mask
 
 
-def random_table(num_inputs, num_outputs, bias=0.5):
+def random_table(
+    num_inputs, num_outputs, bias=0.5, seed=None, path=None, chunk_rows=2**20
+):
     """Generate a random table.
 
     Parameters
@@ -13,22 +17,85 @@ def random_table(num_inputs, num_outputs, bias=0.5):
             The number of inputs.
     num_outputs: int
             The number of outputs.
-    bias: float
+    bias: float or list of float
             The bias for the random number generator.
             A bias of 0.5 (default) generates 0s and 1s with equal
-            probability. A bias of 1 generates all 1s.
+            probability. A bias of 1 generates all 1s. A list gives a
+            separate bias for each output.
+    seed: int or numpy.random.Generator
+            Seed for the random number generator. The same seed always
+            generates the same table, whether or not `path` is given.
+    path: str or pathlib.Path
+            If given, the table is written straight to this binary table
+            file one chunk at a time, and the returned table is memory
+            mapped from it. Use this for tables that do not fit in memory.
+    chunk_rows: int
+            The number of rows generated at a time.
 
     Returns
     -------
     TruthTable
             The random table.
     """
-    rows = []
-    val = 0
-    for _ in range(2**num_inputs):
-        val = 0
-        for _ in range(num_outputs):
-            x = [0, 1][random.random() < bias]
-            val = (val << 1) | x
-        rows.append(bin(val)[2:].zfill(num_outputs))
-    return TruthTable(rows)
+    biases = np.broadcast_to(np.asarray(bias, dtype=float), (num_outputs,))
+    if ((biases < 0) | (biases > 1)).any():
+        raise ValueError("bias must be between 0 and 1")
+    # One stream per output, so the bits do not depend on the chunk size
+    streams = _spawn(seed, num_outputs)
+    num_rows = 2**num_inputs
+    shape = (num_outputs, num_words(num_rows))
+    inputs = [f"i{i}" for i in range(num_inputs)]
+    outputs = [f"o{i}" for i in range(num_outputs)]
+
+    if path:
+        header = {
+            "kind": "truthtable",
+            "name": "ckt",
+            "inputs": inputs,
+            "outputs": outputs,
+            "num_inputs": num_inputs,
+            "num_outputs": num_outputs,
+        }
+        planes = _create_binary(path, header, shape)
+    else:
+        planes = np.empty(shape, dtype=WORD_DTYPE)
+
+    chunk_words = max(1, chunk_rows // WORD_BITS)
+    for start in range(0, shape[1], chunk_words):
+        stop = min(start + chunk_words, shape[1])
+        for output, (rng, p) in enumerate(zip(streams, biases)):
+            planes[output, start:stop] = _random_words(rng, stop - start, p)
+    planes[:, -1] &= tail_mask(num_rows)
+
+    if path:
+        planes.flush()
+        return TruthTable.load(path)
+    return TruthTable.from_planes(
+        planes, num_inputs=num_inputs, inputs=inputs, outputs=outputs
+    )
+
+
+def _spawn(seed, count):
+    """Independent generators derived from a seed or a generator."""
+    if isinstance(seed, np.random.Generator):
+        bit_generator = seed.bit_generator
+        # The public name only exists in numpy >= 1.25
+        seed_seq = getattr(bit_generator, "seed_seq", None)
+        if seed_seq is None:
+            seed_seq = bit_generator._seed_seq
+        return [
+            np.random.Generator(type(bit_generator)(s)) for s in seed_seq.spawn(count)
+        ]
+    return [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(count)]
+
+
+def _random_words(rng, count, p):
+    """Draw `count` words of independent bits that are 1 with probability p."""
+    if p == 0:
+        return np.zeros(count, dtype=WORD_DTYPE)
+    if p == 1:
+        return np.full(count, 0xFFFFFFFFFFFFFFFF, dtype=WORD_DTYPE)
+    if p == 0.5:
+        return rng.integers(0, 2**64, size=count, dtype=np.uint64)
+    bits = rng.random(count * WORD_BITS) < p
+    return np.packbits(bits, bitorder="little").view("<u8").astype(WORD_DTYPE)
@@ -0,0 +1,307 @@
+"""Bulk loading of truth tables from files of records"""
+
+import ast
+import csv
+import io
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+
+from truthtables.instrument import count, timed
+from truthtables.truthtable import CHUNK_BYTES, TruthTable, _open_binary
+from truthtables._bits import WORD_BITS, WORD_DTYPE, num_words, pack_bits, popcount
+
+# Keys and values of the records on a chunk of "dicts" or "jsonl" lines
+_KEY_RE = re.compile(rb"""["']([^"']*)["']\s*:""")
+_VALUE_RE = re.compile(rb""":\s*(True|False|true|false|1|0)\s*(?=[,}])""")
+_TRUE_VALUES = (b"1", b"True", b"true")
+_BOOLEANS = ((b"True", b"1"), (b"true", b"1"), (b"False", b"0"), (b"false", b"0"))
+
+
+@timed("load_records")
+def load_records(
+    path, outputs=None, input_columns=None, inputs=None, fmt=None, name="ckt"
+):
+    """Load a TruthTable from a file with one record per row.
+
+    The file is parsed a chunk of lines at a time straight into packed
+    bit-planes.
+
+    Parameters
+    ----------
+    path: str or pathlib.Path
+            The file to read. Files ending in ".gz" are decompressed.
+    outputs: list of str
+            The columns holding the outputs. Defaults to every column that
+            is not in `input_columns`, sorted for "dicts" and "jsonl" files
+            and in file order for "csv" files.
+    input_columns: list of str
+            If given, the columns holding the input values of each record,
+            with the first column as the most significant bit. Records are
+            placed at the row given by their inputs, so they may be in any
+            order, but every row must appear exactly once. Otherwise, the
+            records are the rows of the table in order.
+    inputs: list of str
+            Names of the inputs. Defaults to `input_columns`.
+    fmt: str
+            "dicts" (Python dict literals, one per line), "jsonl" (JSON
+            objects, one per line) or "csv" (with a header line). If not
+            given, inferred from the suffix before any ".gz": ".csv" is
+            "csv", ".jsonl" and ".json" are "jsonl", anything else "dicts".
+    name: str
+
+    Returns
+    -------
+    TruthTable
+    """
+    fmt = fmt or _infer_format(path)
+    if fmt not in ("dicts", "jsonl", "csv"):
+        raise ValueError(f"Unknown fmt: '{fmt}'")
+    inputs = inputs or (list(input_columns) if input_columns else None)
+    num_inputs = len(inputs) if inputs else None
+
+    with _open_binary(path) as f:
+        chunks = _iter_csv(f) if fmt == "csv" else _iter_dicts(f, fmt)
+        try:
+            columns, bits = next(chunks)
+        except StopIteration:
+            raise ValueError(f"'{path}' contains no records") from None
+        if not outputs:
+            outputs = [c for c in columns if c not in (input_columns or ())]
+            if fmt != "csv":
+                outputs.sort()
+
+        if input_columns:
+            builder = _IndexedRows(len(input_columns), len(outputs))
+            select = (list(input_columns), outputs)
+        else:
+            builder = _OrderedRows(num_inputs, len(outputs))
+            select = ([], outputs)
+        while True:
+            builder.add(*(_columns(bits, columns, names) for names in select))
+            try:
+                columns, bits = next(chunks)
+            except StopIteration:
+                break
+        count(bytes_read=f.tell())
+
+    planes, num_inputs = builder.finish()
+    count(rows=2**num_inputs)
+    return TruthTable.from_planes(
+        planes, num_inputs=num_inputs, inputs=inputs, outputs=outputs, name=name
+    )
+
+
+def _infer_format(path):
+    path = Path(path)
+    suffix = path.suffix
+    if suffix == ".gz":
+        suffix = Path(path.stem).suffix
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".jsonl", ".json"):
+        return "jsonl"
+    return "dicts"
+
+
+def _columns(bits, columns, names):
+    """Select named columns from a (records, columns) array."""
+    try:
+        return bits[:, [columns.index(n) for n in names]]
+    except ValueError as e:
+        raise ValueError(f"Column missing from records: {e}") from None
+
+
+def _iter_lines(f):
+    """Yield lists of the non-empty lines of a binary file, a chunk at a time."""
+    for lines in iter(lambda: f.readlines(CHUNK_BYTES), []):
+        lines = [line for line in lines if line.strip()]
+        if lines:
+            if not lines[-1].endswith(b"\n"):
+                lines[-1] += b"\n"
+            yield lines
+
+
+def _iter_dicts(f, fmt):
+    """Yield (columns, bits) for chunks of dict literal or JSON lines."""
+    for lines in _iter_lines(f):
+        parsed = _parse_dicts_fast(lines, fmt)
+        if parsed is None:
+            parsed = _parse_dicts_slow(lines, fmt)
+        yield parsed
+
+
+def _parse_dicts_fast(lines, fmt):
+    """Parse records that all have the same keys in the same order.
+
+    Returns None if the chunk does not have that form.
+    """
+    columns = _KEY_RE.findall(lines[0])
+    # The regex cannot read keys with quotes in them
+    parse = json.loads if fmt == "jsonl" else ast.literal_eval
+    try:
+        keys = list(parse(lines[0].decode()))
+    except (ValueError, SyntaxError, TypeError):
+        return None
+    if keys != [c.decode() for c in columns]:
+        return None
+    data = b"".join(lines)
+    bits = _parse_fixed_width(lines, data, len(columns))
+    if bits is None and (b"rue" in data or b"alse" in data):
+        # Booleans make the lines differ in width, so spell them as 0/1
+        for word, char in _BOOLEANS:
+            data = data.replace(word, char)
+        bits = _parse_fixed_width(data.splitlines(True), data, len(columns))
+    if bits is not None:
+        return [c.decode() for c in columns], bits
+    keys = _KEY_RE.findall(data)
+    values = _VALUE_RE.findall(data)
+    shape = (len(lines), len(columns))
+    if len(keys) != shape[0] * shape[1] or len(values) != len(keys):
+        return None
+    keys = np.array(keys).reshape(shape)
+    if not (keys == keys[0]).all():
+        return None
+    values = np.array(values).reshape(shape)
+    bits = np.isin(values, _TRUE_VALUES).astype(np.uint8)
+    return [c.decode() for c in columns], bits
+
+
+def _parse_fixed_width(lines, data, num_columns):
+    """Parse lines that only differ in their single character 0/1 values.
+
+    Returns None if the lines do not have that form.
+    """
+    width = len(lines[0])
+    if len(data) != width * len(lines):
+        return None
+    spans = [m.span(1) for m in _VALUE_RE.finditer(lines[0])]
+    if len(spans) != num_columns or any(stop - start != 1 for start, stop in spans):
+        return None
+    chars = np.frombuffer(data, dtype=np.uint8).reshape(len(lines), width)
+    is_value = np.zeros(width, dtype=bool)
+    is_value[[start for start, _ in spans]] = True
+    template = chars[0, ~is_value]
+    if not (chars[:, ~is_value] == template).all():
+        return None
+    bits = chars[:, is_value] - ord("0")
+    if (bits > 1).any():
+        return None
+    return bits
+
+
+def _parse_dicts_slow(lines, fmt):
+    """Parse records one line at a time."""
+    parse = json.loads if fmt == "jsonl" else ast.literal_eval
+    records = [parse(line.decode()) for line in lines]
+    columns = list(records[0])
+    bits = np.empty((len(records), len(columns)), dtype=np.uint8)
+    for idx, record in enumerate(records):
+        try:
+            bits[idx] = [_bit(record[c]) for c in columns]
+        except KeyError as e:
+            raise ValueError(f"Record {record} is missing key {e}") from None
+    return columns, bits
+
+
+def _bit(value):
+    if value in (0, 1):
+        return int(value)
+    if value in ("0", "1"):
+        return int(value)
+    raise ValueError(f"Value must be 0 or 1, got {value!r}")
+
+
+def _iter_csv(f):
+    """Yield (columns, bits) for chunks of CSV lines after the header."""
+    header = f.readline().decode()
+    columns = next(csv.reader([header]))
+    columns = [c.strip() for c in columns]
+    for lines in _iter_lines(f):
+        # Fast path: every value is a single 0 or 1
+        tokens = b"".join(lines).replace(b",", b" ").split()
+        data = b"".join(tokens)
+        if len(tokens) == len(data) == len(lines) * len(columns):
+            bits = np.frombuffer(data, dtype=np.uint8) - ord("0")
+            if not (bits > 1).any():
+                yield columns, bits.reshape(len(lines), len(columns))
+                continue
+        text = io.StringIO(b"".join(lines).decode())
+        rows = [[_csv_bit(v) for v in row] for row in csv.reader(text)]
+        if any(len(row) != len(columns) for row in rows):
+            raise ValueError(f"Every CSV row must have {len(columns)} values")
+        yield columns, np.array(rows, dtype=np.uint8).reshape(-1, len(columns))
+
+
+def _csv_bit(value):
+    value = value.strip()
+    if value.lower() in ("1", "true"):
+        return 1
+    if value.lower() in ("0", "false"):
+        return 0
+    raise ValueError(f"Value must be 0 or 1, got {value!r}")
+
+
+class _OrderedRows:
+    """Pack records that are the rows of a table in order."""
+
+    def __init__(self, num_inputs, num_outputs):
+        self.max_rows = None if num_inputs is None else 2**num_inputs
+        self.num_rows = 0
+        self.words = []
+        self.pending = np.empty((0, num_outputs), dtype=np.uint8)
+
+    def add(self, _, outputs):
+        self.num_rows += len(outputs)
+        if self.max_rows is not None and self.num_rows > self.max_rows:
+            raise ValueError(f"More than {self.max_rows} rows")
+        bits = np.concatenate((self.pending, outputs))
+        # Pack whole words and keep the rest for the next chunk
+        full = len(bits) - len(bits) % WORD_BITS
+        if full:
+            self.words.append(pack_bits(bits[:full]))
+        self.pending = bits[full:]
+
+    def finish(self):
+        num_inputs = self.num_rows.bit_length() - 1
+        if self.num_rows != 2**num_inputs:
+            raise ValueError("Number of rows must be a power of 2")
+        if self.max_rows is not None and self.num_rows != self.max_rows:
+            raise ValueError(f"Expected {self.max_rows} rows, got {self.num_rows}")
+        if len(self.pending):
+            self.words.append(pack_bits(self.pending))
+        return np.concatenate(self.words, axis=1), num_inputs
+
+
+class _IndexedRows:
+    """Place records at the rows given by their input values."""
+
+    def __init__(self, num_inputs, num_outputs):
+        self.num_inputs = num_inputs
+        self.num_rows = 0
+        self.planes = np.zeros((num_outputs, num_words(2**num_inputs)), WORD_DTYPE)
+        self.seen = np.zeros(num_words(2**num_inputs), dtype=WORD_DTYPE)
+        self.weights = np.uint64(1) << np.arange(
+            num_inputs - 1, -1, -1, dtype=np.uint64
+        )
+
+    def add(self, inputs, outputs):
+        self.num_rows += len(inputs)
+        if self.num_rows > 2**self.num_inputs:
+            raise ValueError(f"More than {2**self.num_inputs} rows")
+        rows = (inputs.astype(np.uint64) * self.weights).sum(axis=1, dtype=np.uint64)
+        words = (rows >> np.uint64(6)).astype(np.intp)
+        bits = np.uint64(1) << (rows & np.uint64(63))
+        np.bitwise_or.at(self.seen, words, bits)
+        for plane, values in zip(self.planes, outputs.T):
+            np.bitwise_or.at(plane, words[values == 1], bits[values == 1])
+
+    def finish(self):
+        placed = int(popcount(self.seen).sum(dtype=np.int64))
+        if placed < self.num_rows:
+            raise ValueError(f"{self.num_rows - placed} rows appear more than once")
+        if placed < 2**self.num_inputs:
+            raise ValueError(f"{2**self.num_inputs - placed} rows are missing")
+        return self.planes, self.num_inputs
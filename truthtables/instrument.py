@@ -0,0 +1,137 @@
+"""Opt-in instrumentation of reading, writing and transforming tables"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+COUNTERS = ("bytes_read", "bytes_written", "rows", "cubes", "subprocess_time")
+
+_hooks = []
+_hooks_lock = threading.Lock()
+_local = threading.local()
+
+
+def add_hook(hook):
+    """Call `hook(event)` after every instrumented call.
+
+    Instrumented calls are only measured while a hook is registered. Each
+    event is a dict with the "name" of the call, such as "read_pla" or
+    "minimize", its wall "time" in seconds, and the counters:
+
+    - "bytes_read", "bytes_written": bytes read from or written to files
+    - "rows", "cubes": table rows and PLA cubes processed
+    - "subprocess_time": wall time spent waiting for subprocesses
+
+    Counters of nested calls are added to every enclosing call, so a call
+    to `to_file` includes the bytes written by the writer it calls. Calls
+    made in other processes, such as the workers of `minimize_many`, are
+    not seen.
+
+    Returns
+    -------
+    callable
+            The hook, so this can be used as a decorator.
+    """
+    with _hooks_lock:
+        _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    """Stop calling a hook added with `add_hook`."""
+    with _hooks_lock:
+        _hooks.remove(hook)
+
+
+def enabled():
+    """Whether any hook is registered."""
+    return bool(_hooks)
+
+
+@contextmanager
+def collect():
+    """Collect statistics of the instrumented calls made inside the block.
+
+    Yields
+    ------
+    dict
+            Maps each call name to a dict with its number of "calls" and
+            the totals of "time" and every counter. It is filled in as the
+            calls finish.
+
+    Examples
+    --------
+    >>> with collect() as stats:
+    ...     table = PLA.from_file("ckt.pla")
+    >>> stats["read_pla"]["bytes_read"]
+    """
+    stats = {}
+    lock = threading.Lock()
+
+    def record(event):
+        with lock:
+            totals = stats.setdefault(
+                event["name"], dict.fromkeys(("calls", "time") + COUNTERS, 0)
+            )
+            totals["calls"] += 1
+            for key in ("time",) + COUNTERS:
+                totals[key] += event[key]
+
+    add_hook(record)
+    try:
+        yield stats
+    finally:
+        remove_hook(record)
+
+
+def timed(name):
+    """Decorate a function so that its calls are instrumented as `name`."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return func(*args, **kwargs)
+            event = dict.fromkeys(COUNTERS, 0)
+            event["name"] = name
+            stack = _stack()
+            stack.append(event)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                event["time"] = time.perf_counter() - start
+                stack.pop()
+                for hook in list(_hooks):
+                    hook(event)
+
+        return wrapper
+
+    return decorator
+
+
+def count(**amounts):
+    """Add to the counters of the instrumented calls in progress."""
+    if not _hooks:
+        return
+    for event in _stack():
+        for key, amount in amounts.items():
+            event[key] += amount
+
+
+@contextmanager
+def subprocess_timer():
+    """Count the wall time of the block as subprocess time."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        count(subprocess_time=time.perf_counter() - start)
+
+
+def _stack():
+    """The events of the calls in progress in this thread."""
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
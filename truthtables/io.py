@@ -1,36 +1,67 @@
 """Functions for reading/writing truth tables"""
 
+import gzip
+import re
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
+import numpy as np
+
 from truthtables import TruthTable, PLA
+from truthtables.bdd import BDDTable
+from truthtables.instrument import count, enabled, timed
+from truthtables._bits import (
+    WORD_BITS,
+    input_bits,
+    num_words,
+    row_bits,
+    unpack_planes,
+)
+from truthtables.truthtable import (
+    _cube_covers,
+    _cube_text,
+    _line_keys,
+    pack_binary_header,
+)
+
+# Number of rows or cubes formatted at a time by the writers
+CHUNK_ROWS = 2**14
 
 
+@timed("to_file")
 def to_file(table, filename, fmt=None, mode="case"):
     """Write a truthtable to a file.
 
     Parameters
     ----------
-    table: TruthTable or PLA
+    table: TruthTable, PLA or BDDTable
     filename: str or Pathlib.path
+            If the name ends in ".gz" the file is gzip compressed and the
+            format is inferred from the extension before ".gz". Binary
+            tables are memory mapped, so they can not be compressed.
     fmt: str
             If defined, describes what file type to write.
-            Either "verilog" or "pla". If not defined,
-            inferred from extension of `filename`
+            Either "verilog", "pla" or "binary". If not defined,
+            inferred from extension of `filename` (".v", ".pla" or
+            ".ttb")
     mode: str
             If writing a veirlog file, describes how to represent the
             truth table. Either "case" or "sop"
     """
     filename = Path(filename)
     if not fmt:
-        if filename.suffix == ".v":
+        suffix = filename.suffix
+        if suffix == ".gz":
+            suffix = Path(filename.stem).suffix
+        if suffix == ".v":
             fmt = "verilog"
-        elif filename.suffix == ".pla":
+        elif suffix == ".pla":
             fmt = "pla"
+        elif suffix == ".ttb":
+            fmt = "binary"
         else:
-            raise ValueError(
-                f"Unable to infer fmt from filename suffix: '{filename.suffix}'"
-            )
+            raise ValueError(f"Unable to infer fmt from filename suffix: '{suffix}'")
 
     if fmt == "verilog":
         if mode == "case":
@@ -41,46 +72,284 @@ def to_file(table, filename, fmt=None, mode="case"):
             raise ValueError(f"Unknown mode: '{mode}'")
     elif fmt == "pla":
         write_pla(table, filename)
+    elif fmt == "binary":
+        if filename.suffix == ".gz":
+            raise ValueError("Binary tables can not be gzip compressed")
+        write_binary(table, filename)
     else:
         raise ValueError(f"Unknown fmt: '{fmt}'")
 
 
+@contextmanager
+def _open_text(filename):
+    """Open `filename` for writing text, gzip compressed if it ends in ".gz".
+
+    File objects are passed through without being closed. While
+    instrumentation is enabled, the characters written are counted.
+    """
+    if hasattr(filename, "write"):
+        yield _CountingWriter(filename) if enabled() else filename
+    elif Path(filename).suffix == ".gz":
+        with gzip.open(filename, "wt") as f:
+            yield _CountingWriter(f) if enabled() else f
+    else:
+        with open(filename, "w") as f:
+            yield _CountingWriter(f) if enabled() else f
+
+
+def _count_table(table):
+    """Count the rows or cubes of a table being written."""
+    if isinstance(table, TruthTable):
+        count(rows=len(table))
+    else:
+        count(cubes=table.num_products)
+
+
+class _CountingWriter:
+    """Count the characters written to a text file as bytes written."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, s):
+        count(bytes_written=len(s))
+        return self.f.write(s)
+
+
+def _join_columns(parts, num_rows):
+    """Build text lines column by column.
+
+    Parameters
+    ----------
+    parts: list of bytes or numpy.ndarray
+            Either bytes that are repeated on every line, or (rows, width)
+            arrays of ASCII codes.
+    num_rows: int
+
+    Returns
+    -------
+    str
+            The concatenated lines.
+    """
+    widths = [len(p) if isinstance(p, bytes) else p.shape[1] for p in parts]
+    text = np.empty((num_rows, sum(widths)), dtype=np.uint8)
+    col = 0
+    for part, width in zip(parts, widths):
+        if isinstance(part, bytes):
+            part = np.frombuffer(part, dtype=np.uint8)
+        text[:, col : col + width] = part
+        col += width
+    return text.tobytes().decode("ascii")
+
+
+def _product_strs(lines, inputs, group_size=6):
+    """Format cubes as products of inputs.
+
+    Parameters
+    ----------
+    lines: numpy.ndarray
+            (cubes, inputs) array of 0, 1 or 2 (DC) values.
+    inputs: list of str
+    group_size: int
+            Products are assembled from precomputed strings for groups of
+            this many inputs.
+
+    Returns
+    -------
+    list of str
+    """
+    lines = np.asarray(lines)
+    groups = []
+    for start in range(0, len(inputs), group_size):
+        names = inputs[start : start + group_size]
+        weights = 3 ** np.arange(len(names) - 1, -1, -1)
+        codes = lines[:, start : start + len(names)].astype(np.int64) @ weights
+        groups.append((_group_strs(tuple(names)), codes))
+    products = []
+    for idx in range(len(lines)):
+        terms = [strs[codes[idx]] for strs, codes in groups]
+        products.append(" & ".join(t for t in terms if t) or "1'b1")
+    return products
+
+
+_GROUP_STRS = {}
+
+
+def _group_strs(names):
+    """Every possible product of `names` indexed by the cube's base 3 code."""
+    if names not in _GROUP_STRS:
+        strs = [""]
+        for name in names:
+            strs = [
+                " & ".join(t for t in (s, lit) if t)
+                for s in strs
+                for lit in ("~" + name, name, "")
+            ]
+        _GROUP_STRS[names] = strs
+    return _GROUP_STRS[names]
+
+
+def _term_name(base, names):
+    """A name for numbered wires that cannot clash with `names`."""
+    while any(re.fullmatch(re.escape(base) + r"\d*", n) for n in names):
+        base += "_"
+    return base
+
+
+def _write_wires(f, prefix, ids, lines, inputs):
+    """Declare one wire per cube, named by `prefix` and its id."""
+    products = _product_strs(lines, inputs)
+    f.write(
+        "".join(f"wire {prefix}{i} = {p} ;\n" for i, p in zip(ids.tolist(), products))
+    )
+
+
+def _pla_terms(table):
+    """The distinct product terms of a PLA and the outputs that use them.
+
+    For types without an explicit onset, the terms are those of the offset
+    and dc-set, and the outputs are their complement.
+
+    Returns
+    -------
+    tuple of (numpy.ndarray, numpy.ndarray, bool)
+            The (terms, inputs) lines of the terms in order of first
+            appearance, a (terms, outputs) boolean array of which outputs
+            use each term, and whether the outputs are negated.
+    """
+    on, off, dc = _cube_covers(table)
+    negate = "f" not in table.pla_type
+    covers = off | dc if negate else on
+    used = np.flatnonzero(covers.any(axis=1))
+    keys = _line_keys(table.input_lines[used])
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    term_ids = np.argsort(order)[inverse.ravel()]
+    term_outputs = np.zeros((len(first), table.num_outputs), dtype=bool)
+    np.logical_or.at(term_outputs, term_ids, covers[used])
+    return table.input_lines[used[first[order]]], term_outputs, negate
+
+
+@timed("write_verilog_sop")
 def write_verilog_sop(table, filename):
-    """Write a truth table to a verilog file using SOP assignemnts."""
-    with open(filename, "w") as f:
+    """Write a truth table to a verilog file using SOP assignemnts.
+
+    Each distinct product term is declared once as a wire, and every
+    output is assigned the OR of the wires of its terms.
+    """
+    if isinstance(table, BDDTable):
+        table = table.to_pla()
+    _count_table(table)
+    prefix = _term_name("p", table.inputs + table.outputs)
+    with _open_text(filename) as f:
         f.write(_get_header(table.inputs, table.outputs, table.name))
+        if isinstance(table, TruthTable):
+            _write_minterm_sop(table, f, prefix)
+        else:
+            _write_cube_sop(table, f, prefix)
+        f.write("\nendmodule\n")
 
-        for output in table.outputs:
-            products = []
-            for line_idx in table.onset(output):
-                products.append("( " + table.input_product(line_idx) + " )")
-            if products:
-                sums = " | ".join(products)
-                f.write("assign " + output + " = " + sums + " ;\n")
 
-        f.write("\nendmodule\n")
+def _write_minterm_sop(table, f, prefix):
+    # Every row in the onset of any output is a term, named by its index
+    chunk_words = num_words(CHUNK_ROWS)
+    for first in range(0, num_words(len(table)), chunk_words):
+        words = table._words(first, first + chunk_words)
+        used = np.bitwise_or.reduce(words, axis=0, keepdims=True)
+        rows = np.flatnonzero(unpack_planes(used)[:, 0]) + first * WORD_BITS
+        _write_wires(f, prefix, rows, row_bits(rows, table.num_inputs), table.inputs)
+    f.write("\n")
+    for idx, output in enumerate(table.outputs):
+        f.write(f"assign {output} = ")
+        sep = ""
+        for onset in table._onset_chunks(idx, CHUNK_ROWS):
+            if len(onset):
+                f.write(sep + " | ".join(prefix + str(r) for r in onset.tolist()))
+                sep = " | "
+        f.write(" ;\n" if sep else "1'b0 ;\n")
+
+
+def _write_cube_sop(table, f, prefix):
+    term_lines, term_outputs, negate = _pla_terms(table)
+    for start in range(0, len(term_lines), CHUNK_ROWS):
+        lines = term_lines[start : start + CHUNK_ROWS]
+        ids = np.arange(start, start + len(lines))
+        _write_wires(f, prefix, ids, lines, table.inputs)
+    f.write("\n")
+    for idx, output in enumerate(table.outputs):
+        terms = np.flatnonzero(term_outputs[:, idx]).tolist()
+        expr = " | ".join(prefix + str(t) for t in terms) or "1'b0"
+        if negate:
+            expr = f"~( {expr} )"
+        f.write(f"assign {output} = {expr} ;\n")
 
 
 def get_case_block(table: TruthTable):
-    s = "always@(*) begin\n"
+    return "".join(_iter_case_block(table))
+
+
+# ASCII codes of casez patterns for input values 0, 1 and DC
+_CASEZ_CHARS = np.frombuffer(b"01?", dtype=np.uint8)
+
+
+def _iter_case_block(table: TruthTable):
+    """Yield the text of a case block in chunks."""
     outputs = " , ".join(table.outputs)
-    if isinstance(table, TruthTable):
-        s += f"\tcase ({{ {' , '.join(table.inputs)} }})\n"
-        for idx, oup_line in enumerate(table):
-            inp_line = bin(idx)[2:].zfill(table.num_inputs)
-            s += f"\t\t{table.num_inputs}'b{inp_line} : "
-            s += f"{{ {outputs} }} = {table.num_outputs}'b{oup_line};\n"
-    elif isinstance(table, PLA):
-        raise NotImplementedError
-    s += "\tendcase\nend\n"
-    return s
+    if isinstance(table, PLA):
+        yield from _iter_casez_block(table, outputs)
+        return
+    yield "always@(*) begin\n"
+    yield f"\tcase ({{ {' , '.join(table.inputs)} }})\n"
+    prefix = f"\t\t{table.num_inputs}'b".encode()
+    middle = f" : {{ {outputs} }} = {table.num_outputs}'b".encode()
+    for start, stop in table._chunks(CHUNK_ROWS):
+        inp_chars = input_bits(start, stop, table.num_inputs) + ord("0")
+        oup_chars = table._bits(start, stop) + ord("0")
+        parts = [prefix, inp_chars, middle, oup_chars, b";\n"]
+        yield _join_columns(parts, stop - start)
+    yield "\tendcase\nend\n"
+
+
+def _iter_casez_block(table, outputs):
+    """Yield the text of one casez statement per cube of a PLA.
+
+    Cubes can overlap, so instead of a single case statement, which only
+    takes the first matching item, every cube ORs its onset into the
+    outputs. Types without an explicit onset start from all 1s and every
+    cube of the offset or dc-set clears its outputs instead.
+    """
+    bus = _term_name("pla_in", table.inputs + table.outputs)
+    on, off, dc = _cube_covers(table)
+    negate = "f" not in table.pla_type
+    covers = off | dc if negate else on
+    used = np.flatnonzero(covers.any(axis=1))
+    num_inputs, num_outputs = table.num_inputs, table.num_outputs
+
+    yield f"wire [{max(num_inputs, 1) - 1}:0] {bus} = {{ {' , '.join(table.inputs)} }} ;\n"
+    yield "always@(*) begin\n"
+    yield f"\t{{ {outputs} }} = {num_outputs}'b{('1' if negate else '0') * num_outputs};\n"
+    prefix = f"\tcasez ({bus}) {num_inputs}'b".encode()
+    op = "&" if negate else "|"
+    middle = f" : {{ {outputs} }} = {{ {outputs} }} {op} {num_outputs}'b".encode()
+    for start in range(0, len(used), CHUNK_ROWS):
+        cubes = used[start : start + CHUNK_ROWS]
+        inp_chars = _CASEZ_CHARS[table.input_lines[cubes]]
+        oup_chars = (covers[cubes] != negate).astype(np.uint8) + ord("0")
+        parts = [prefix, inp_chars, middle, oup_chars, b"; endcase\n"]
+        yield _join_columns(parts, len(cubes))
+    yield "end\n"
 
 
+@timed("write_verilog_case")
 def write_verilog_case(table: TruthTable, filename):
     """Write a truth table to a verilog file using a case statement."""
-    with open(filename, "w") as f:
+    if isinstance(table, BDDTable):
+        table = table.to_truth_table()
+    _count_table(table)
+    with _open_text(filename) as f:
         f.write(_get_header(table.inputs, table.outputs, table.name, reg=True))
-        f.write(get_case_block(table))
+        for block in _iter_case_block(table):
+            f.write(block)
         f.write("\nendmodule")
 
 
@@ -95,18 +364,104 @@ def _get_header(inputs, outputs, name, reg=False):
     return s
 
 
-def write_pla(table, path):
-    """Writes a truth table to a pla file."""
+def _iter_pla_body(table):
+    """Yield the cube lines of a table in chunks."""
     if isinstance(table, TruthTable):
-        table = PLA.from_truth_table(table)
-    with open(path, "w") as f:
-        f.write(f"# Written by truthtables on {datetime.now()}\n")
-        f.write(f".i {table.num_inputs}\n")
-        f.write(f".o {table.num_outputs}\n")
-        f.write(f".ilb {' '.join(table.inputs)}\n")
-        f.write(f".ob {' '.join(table.outputs)}\n")
-        f.write(f".type {table.pla_type}\n")
-        f.write(f".p {table.num_products}\n")
-        f.write(str(table))
-        f.write("\n")
+        for start, stop in table._chunks(CHUNK_ROWS):
+            inp_lines = input_bits(start, stop, table.num_inputs)
+            yield _cube_text(inp_lines, table._bits(start, stop)).decode("ascii")
+    else:
+        for start in range(0, table.num_products, CHUNK_ROWS):
+            inp_lines = table.input_lines[start : start + CHUNK_ROWS]
+            oup_lines = table.output_lines[start : start + CHUNK_ROWS]
+            yield _cube_text(inp_lines, oup_lines).decode("ascii")
+
+
+@timed("write_pla")
+def write_pla(table, path, compact=False):
+    """Writes a truth table to a pla file.
+
+    Parameters
+    ----------
+    table: TruthTable, PLA or BDDTable
+    path: str or pathlib.Path or file object
+    compact: bool
+            If True, cubes of a PLA that are repeated or contained in
+            another cube are merged or left out (see `PLA.compact`).
+    """
+    if isinstance(table, BDDTable):
+        table = table.to_pla()
+    if compact and isinstance(table, PLA):
+        table = table.compact()
+    _count_table(table)
+    if isinstance(table, TruthTable):
+        pla_type = "fr"
+        num_products = len(table)
+    else:
+        pla_type = table.pla_type
+        num_products = table.num_products
+    with _open_text(path) as f:
+        _write_pla_header(f, table, pla_type, num_products)
+        for block in _iter_pla_body(table):
+            f.write(block)
         f.write(".end")
+
+
+def _write_pla_header(f, table, pla_type, num_products):
+    f.write(f"# Written by truthtables on {datetime.now()}\n")
+    f.write(f".i {table.num_inputs}\n")
+    f.write(f".o {table.num_outputs}\n")
+    f.write(f".ilb {' '.join(table.inputs)}\n")
+    f.write(f".ob {' '.join(table.outputs)}\n")
+    f.write(f".type {pla_type}\n")
+    f.write(f".p {num_products}\n")
+
+
+@timed("write_binary")
+def write_binary(table, path):
+    """Write a truth table to a binary table file.
+
+    TruthTables are stored as their packed bit-planes and PLAs as their
+    int8 line matrices, so the file can be memory mapped when it is read
+    back with `TruthTable.load` or `PLA.from_file`. BDDTables are stored
+    as the PLA of their paths (see `BDDTable.to_pla`).
+    """
+    if isinstance(table, BDDTable):
+        table = table.to_pla()
+    _count_table(table)
+    header = {
+        "name": table.name,
+        "inputs": table.inputs,
+        "outputs": table.outputs,
+        "num_inputs": table.num_inputs,
+        "num_outputs": table.num_outputs,
+    }
+    if isinstance(table, TruthTable):
+        header["kind"] = "truthtable"
+        shape = (table.num_outputs, num_words(len(table)))
+        planes = _create_binary(path, header, shape)
+        chunk_words = CHUNK_ROWS // WORD_BITS
+        for start in range(0, planes.shape[1], chunk_words):
+            planes[:, start : start + chunk_words] = table._words(
+                start, start + chunk_words
+            )
+        planes.flush()
+    else:
+        header["kind"] = "pla"
+        header["num_products"] = table.num_products
+        header["pla_type"] = table.pla_type
+        with open(path, "wb") as f:
+            f.write(pack_binary_header(header))
+            f.write(np.ascontiguousarray(table.input_lines, dtype=np.int8).tobytes())
+            f.write(np.ascontiguousarray(table.output_lines, dtype=np.int8).tobytes())
+    count(bytes_written=Path(path).stat().st_size)
+
+
+def _create_binary(path, header, shape):
+    """Create a binary TruthTable file and memory map its planes for writing."""
+    header_bytes = pack_binary_header(header)
+    with open(path, "wb") as f:
+        f.write(header_bytes)
+    return np.memmap(
+        path, dtype="<u8", mode="r+", offset=len(header_bytes), shape=shape
+    )
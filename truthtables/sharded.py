@@ -0,0 +1,439 @@
+"""Truth tables split into on-disk shards for tables larger than memory"""
+
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from truthtables.instrument import count, timed
+from truthtables.io import (
+    CHUNK_ROWS,
+    _create_binary,
+    _cube_text,
+    _open_text,
+    _write_pla_header,
+    write_binary,
+)
+from truthtables.truthtable import TruthTable, _entropy, _name_indices, _row_counts
+from truthtables._bits import WORD_BITS, bits_to_strs, input_bits, num_words, pack_bits
+
+MANIFEST = "manifest.json"
+
+
+class ShardedTruthTable:
+    """A truth table stored as one binary table file per shard.
+
+    The input space is split on the values of the first `shard_bits`
+    inputs. Shard `s` holds the rows whose leading inputs spell `s`, as a
+    TruthTable over the remaining inputs, and is memory mapped when it is
+    used, so only one shard at a time needs to fit in memory. Operations
+    that produce a new table write its shards to a new directory.
+
+    Parameters
+    ----------
+    directory: str or pathlib.Path
+            A directory written by `from_table` or `from_function`.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        manifest = json.loads((self.directory / MANIFEST).read_text())
+        if manifest.get("kind") != "sharded":
+            raise ValueError(f"'{directory}' does not contain a sharded table")
+        self.name = manifest["name"]
+        self.inputs = manifest["inputs"]
+        self.outputs = manifest["outputs"]
+        self.num_inputs = len(self.inputs)
+        self.num_outputs = len(self.outputs)
+        self.shard_bits = manifest["shard_bits"]
+        self.shard_paths = [self.directory / p for p in manifest["shards"]]
+
+    @staticmethod
+    def load(directory):
+        """Open a sharded table directory."""
+        return ShardedTruthTable(directory)
+
+    @staticmethod
+    def from_table(table, directory, shard_bits):
+        """Split a TruthTable into shards.
+
+        Parameters
+        ----------
+        table: TruthTable
+                The table to split. Lazy and memory mapped tables are read a
+                chunk at a time.
+        directory: str or pathlib.Path
+                The directory to write the shards to. Created if needed.
+        shard_bits: int
+                The number of leading inputs that select a shard.
+
+        Returns
+        -------
+        ShardedTruthTable
+        """
+        paths = _create(directory, table.inputs, table.outputs, table.name, shard_bits)
+        num_rows = 2 ** (table.num_inputs - shard_bits)
+        header = _shard_header(table.inputs, table.outputs, table.name, shard_bits)
+        for idx, path in enumerate(paths):
+            start = idx * num_rows
+            if num_rows < WORD_BITS:
+                words = lambda s, e: pack_bits(table._bits(start, start + num_rows))
+            else:
+                first = start // WORD_BITS
+                words = lambda s, e: table._words(first + s, first + e)
+            _write_words(path, header, num_rows, words)
+        return ShardedTruthTable(directory)
+
+    @staticmethod
+    def from_function(
+        func,
+        num_inputs,
+        directory,
+        shard_bits,
+        num_outputs=None,
+        inputs=None,
+        outputs=None,
+        name="ckt",
+        workers=1,
+    ):
+        """Compute the shards of a table from a function.
+
+        Each shard is computed and written a chunk at a time, so the table
+        is never held in memory.
+
+        Parameters
+        ----------
+        func: callable
+                See `TruthTable.from_function`. With more than one worker it
+                must be picklable, such as a module level function.
+        num_inputs: int
+        directory: str or pathlib.Path
+        shard_bits: int
+        num_outputs: int
+                Can be omitted if `outputs` is given. Otherwise `func` is
+                called on the first row to find it.
+        inputs: list of str
+        outputs: list of str
+        name: str
+        workers: int
+                The number of processes computing shards. See `map_shards`.
+
+        Returns
+        -------
+        ShardedTruthTable
+        """
+        inputs = inputs or [f"i{i}" for i in range(num_inputs)]
+        if not outputs:
+            if num_outputs is None:
+                first = np.asarray(func(np.zeros((1, num_inputs), dtype=np.uint8)))
+                num_outputs = 1 if first.ndim == 1 else first.shape[1]
+            outputs = [f"o{i}" for i in range(num_outputs)]
+        paths = _create(directory, inputs, outputs, name, shard_bits)
+        header = _shard_header(inputs, outputs, name, shard_bits)
+        jobs = [
+            (func, idx, shard_bits, num_inputs, header, path)
+            for idx, path in enumerate(paths)
+        ]
+        list(_map(_function_shard, jobs, workers))
+        return ShardedTruthTable(directory)
+
+    def __len__(self):
+        return 2**self.num_inputs
+
+    @property
+    def num_shards(self):
+        return len(self.shard_paths)
+
+    @property
+    def shard_rows(self):
+        """The number of rows in each shard."""
+        return 2 ** (self.num_inputs - self.shard_bits)
+
+    def shard(self, idx):
+        """Memory map one shard as a TruthTable over the trailing inputs."""
+        return TruthTable.load(self.shard_paths[idx])
+
+    def iter_shards(self):
+        """Yield (first row, TruthTable) for every shard in order."""
+        for idx in range(self.num_shards):
+            yield idx * self.shard_rows, self.shard(idx)
+
+    def iter_chunks(self, chunk_rows=CHUNK_ROWS):
+        """Yield (start, (rows, outputs) array of output bits) in row order."""
+        for first, shard in self.iter_shards():
+            for start, stop in shard._chunks(chunk_rows):
+                yield first + start, shard._bits(start, stop)
+
+    def __iter__(self):
+        for _, bits in self.iter_chunks():
+            yield from bits_to_strs(bits)
+
+    def map_shards(self, func, *args, workers=1):
+        """Call `func(shard_path, *args)` for every shard.
+
+        Parameters
+        ----------
+        func: callable
+                A picklable (module level) function.
+        workers: int
+                The number of worker processes. With one worker, shards are
+                processed in this process. None uses the number of CPUs.
+
+        Returns
+        -------
+        iterator
+                The results, in shard order.
+        """
+        jobs = [(str(path), *args) for path in self.shard_paths]
+        return _map(func, jobs, workers)
+
+    def iter_onset(self, output, workers=1):
+        """Yield arrays of the onset row indices of an output, shard by shard."""
+        (output_idx,) = _name_indices(output, self.outputs)
+        onsets = self.map_shards(_shard_onset, output_idx, workers=workers)
+        for idx, onset in enumerate(onsets):
+            yield onset + np.uint64(idx * self.shard_rows)
+
+    def count_ones(self, workers=1):
+        """The number of rows where each output is 1."""
+        counts = self.map_shards(_shard_ones, workers=workers)
+        return sum(counts, np.zeros(self.num_outputs, dtype=np.int64))
+
+    def entropy(self, workers=1):
+        """Entropy in bits of the output rows over all input rows.
+
+        See `TruthTable.entropy`.
+        """
+        if self.num_outputs == 1:
+            return self.output_entropies(workers)[0]
+        counts = {}
+        for shard_counts in self.map_shards(_shard_joint_counts, workers=workers):
+            for key, n in shard_counts.items():
+                counts[key] = counts.get(key, 0) + n
+        return _entropy(list(counts.values()))
+
+    def output_entropies(self, workers=1):
+        """Entropy in bits of each output."""
+        ones = self.count_ones(workers)
+        return [_entropy([len(self) - n, n]) for n in ones.tolist()]
+
+    def xor(self, other, directory, workers=1):
+        """Xor two sharded tables with the same shape into a new directory.
+
+        The directory can not be that of either table.
+        """
+        if (self.num_inputs, self.num_outputs, self.shard_bits) != (
+            other.num_inputs,
+            other.num_outputs,
+            other.shard_bits,
+        ):
+            raise ValueError("Sharded tables must have the same shape and shards")
+        paths = _create(
+            directory,
+            self.inputs,
+            self.outputs,
+            self.name,
+            self.shard_bits,
+            sources=(self, other),
+        )
+        header = _shard_header(self.inputs, self.outputs, self.name, self.shard_bits)
+        jobs = [
+            (str(a), str(b), str(path), header)
+            for a, b, path in zip(self.shard_paths, other.shard_paths, paths)
+        ]
+        list(_map(_xor_shards, jobs, workers))
+        return ShardedTruthTable(directory)
+
+    def cofactor(self, input, value, directory, workers=1):
+        """The Shannon cofactor with an input fixed to a value.
+
+        The input is removed. For an input that selects shards, the matching
+        shards are linked (or copied) into the new directory. Otherwise
+        every shard is cofactored. See `TruthTable.cofactor`. The directory
+        can not be that of this table.
+
+        Returns
+        -------
+        ShardedTruthTable
+        """
+        (idx,) = _name_indices(input, self.inputs)
+        inputs = self.inputs[:idx] + self.inputs[idx + 1 :]
+        if idx < self.shard_bits:
+            shard_bits = self.shard_bits - 1
+            paths = _create(
+                directory, inputs, self.outputs, self.name, shard_bits, (self,)
+            )
+            low_bits = shard_bits - idx
+            for new_idx, path in enumerate(paths):
+                high = new_idx >> low_bits
+                low = new_idx & ((1 << low_bits) - 1)
+                old_idx = (((high << 1) | value) << low_bits) | low
+                _link(self.shard_paths[old_idx], path)
+            return ShardedTruthTable(directory)
+
+        paths = _create(
+            directory, inputs, self.outputs, self.name, self.shard_bits, (self,)
+        )
+        jobs = [
+            (str(old), self.inputs[idx], value, str(path))
+            for old, path in zip(self.shard_paths, paths)
+        ]
+        list(_map(_cofactor_shard, jobs, workers))
+        return ShardedTruthTable(directory)
+
+    def to_truth_table(self):
+        """Load every shard into one TruthTable in memory."""
+        shards = [shard for _, shard in self.iter_shards()]
+        if self.shard_rows < WORD_BITS:
+            bits = np.concatenate([shard._bits(0, len(shard)) for shard in shards])
+            planes = pack_bits(bits)
+        else:
+            planes = np.concatenate([shard.planes for shard in shards], axis=1)
+        return TruthTable.from_planes(
+            planes,
+            num_inputs=self.num_inputs,
+            inputs=self.inputs,
+            outputs=self.outputs,
+            name=self.name,
+        )
+
+    @timed("ShardedTruthTable.to_pla")
+    def to_pla(self, path):
+        """Write the table to a PLA file, one chunk of one shard at a time."""
+        count(rows=len(self))
+        with _open_text(path) as f:
+            _write_pla_header(f, self, "fr", len(self))
+            for start, bits in self.iter_chunks():
+                stop = start + len(bits)
+                inp_lines = input_bits(start, stop, self.num_inputs)
+                f.write(_cube_text(inp_lines, bits).decode("ascii"))
+            f.write(".end")
+
+
+def _create(directory, inputs, outputs, name, shard_bits, sources=()):
+    """Write the manifest of a new sharded table and return its shard paths.
+
+    `sources` are the sharded tables the new shards are computed from,
+    whose directories can not be written to while their shards are read.
+    """
+    if not 0 <= shard_bits <= len(inputs):
+        raise ValueError(f"shard_bits must be between 0 and {len(inputs)}")
+    directory = Path(directory)
+    for source in sources:
+        if directory.resolve() == source.directory.resolve():
+            raise ValueError(
+                f"Can not write to '{directory}', which holds the shards being read"
+            )
+    directory.mkdir(parents=True, exist_ok=True)
+    width = len(str(2**shard_bits - 1))
+    shards = [f"shard_{idx:0{width}d}.ttb" for idx in range(2**shard_bits)]
+    manifest = {
+        "kind": "sharded",
+        "name": name,
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        "shard_bits": shard_bits,
+        "shards": shards,
+    }
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return [directory / shard for shard in shards]
+
+
+def _shard_header(inputs, outputs, name, shard_bits):
+    """The binary table header shared by every shard."""
+    return {
+        "kind": "truthtable",
+        "name": name,
+        "inputs": list(inputs[shard_bits:]),
+        "outputs": list(outputs),
+        "num_inputs": len(inputs) - shard_bits,
+        "num_outputs": len(outputs),
+    }
+
+
+def _write_words(path, header, num_rows, words):
+    """Write a shard from `words(start, stop)`, a chunk of plane words at a time."""
+    shape = (header["num_outputs"], num_words(num_rows))
+    planes = _create_binary(path, header, shape)
+    chunk_words = num_words(CHUNK_ROWS)
+    for start in range(0, shape[1], chunk_words):
+        stop = min(start + chunk_words, shape[1])
+        planes[:, start:stop] = words(start, stop)
+    planes.flush()
+
+
+def _map(func, jobs, workers):
+    """Run `func(*job)` for every job, in a process pool if `workers` > 1."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        return (func(*job) for job in jobs)
+    return _pool_map(func, jobs, workers)
+
+
+def _pool_map(func, jobs, workers):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(func, *zip(*jobs))
+
+
+def _link(source, destination):
+    """Hard link a shard file, or copy it where links are not possible."""
+    if destination.exists():
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def _function_shard(func, idx, shard_bits, num_inputs, header, path):
+    prefix = np.array(
+        [(idx >> (shard_bits - 1 - b)) & 1 for b in range(shard_bits)],
+        dtype=np.uint8,
+    )
+
+    def shard_func(bits):
+        leading = np.broadcast_to(prefix, (len(bits), shard_bits))
+        return func(np.hstack((leading, bits)))
+
+    table = TruthTable.from_function(
+        shard_func,
+        num_inputs - shard_bits,
+        inputs=header["inputs"],
+        outputs=header["outputs"],
+        name=header["name"],
+    )
+    write_binary(table, path)
+
+
+def _shard_onset(path, output_idx):
+    shard = TruthTable.load(path)
+    return np.concatenate(
+        [o.astype(np.uint64) for o in shard._onset_chunks(output_idx)]
+    )
+
+
+def _shard_ones(path):
+    return TruthTable.load(path)._ones()
+
+
+def _shard_joint_counts(path):
+    shard = TruthTable.load(path)
+    counts = {}
+    for start, stop in shard._chunks():
+        keys, chunk_counts = _row_counts(shard._bits(start, stop), 2)
+        for key, n in zip(keys, chunk_counts.tolist()):
+            counts[key] = counts.get(key, 0) + n
+    return counts
+
+
+def _xor_shards(path_a, path_b, path, header):
+    a = TruthTable.load(path_a)
+    b = TruthTable.load(path_b)
+    _write_words(path, header, len(a), lambda s, e: a._words(s, e) ^ b._words(s, e))
+
+
+def _cofactor_shard(path, input, value, new_path):
+    write_binary(TruthTable.load(path).cofactor(input, value), new_path)
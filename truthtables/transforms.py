@@ -1,35 +1,217 @@
-from tempfile import TemporaryDirectory
-from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO, StringIO
+import os
 import subprocess
+import time
 
-from truthtables import PLA, to_file
+from truthtables import PLA
+from truthtables.instrument import count, subprocess_timer, timed
+from truthtables.io import write_pla
+from truthtables.truthtable import _pla_from_header, _read_pla_stream
+from truthtables._minimizer import minimize_native
 
 
-def minimize(table):
-    """Use espresso to minimize a truth table.
+@timed("minimize")
+def minimize(
+    table, engine="espresso", exact=None, cache=None, timeout=None, compact=False
+):
+    """Minimize a truth table.
 
     Parameters
     ----------
     table: TruthTable or PLA
             The table to minimize.
+    engine: str
+            Either "espresso" (default), which calls the espresso binary, or
+            "native", which minimizes in-process without spawning a
+            subprocess.
+    exact: bool
+            Only used by the "native" engine. If True, find a minimum cover
+            of every output from its prime implicants. If False, use a
+            heuristic expand/irredundant/reduce loop. Defaults to exact
+            minimization for tables with few inputs.
+    cache: truthtables.cache.MinimizationCache
+            If given, results are looked up in and added to this cache. Hits
+            are returned with the names of `table`.
+    timeout: float
+            If given, the number of seconds after which a `TimeoutError` is
+            raised.
+    compact: bool
+            If True, repeated and contained cubes of a PLA are removed
+            before minimizing (see `PLA.compact`). Removing contained cubes
+            takes time quadratic in the number of cubes.
 
     Returns
     -------
     PLA
             The minimized table.
     """
-    with TemporaryDirectory(prefix="truthtables_minimize") as d:
-        d = Path(d)
-        input_file = d / "in.pla"
-        output_file = d / "out.pla"
-        to_file(table, input_file)
-        with open(output_file, "w+") as f:
-            try:
-                subprocess.run(["espresso", str(input_file)], stdout=f, check=True)
-            except subprocess.CalledProcessError as e:
-                f.seek(0)
-                raise ValueError(
-                    f"Calling espresso failed. Espresso output:\n\n{f.read()}"
-                ) from e
-        table_out = PLA.from_file(output_file)
-    return table_out
+    if engine not in ("espresso", "native"):
+        raise ValueError(f"Unknown engine: '{engine}'")
+    if isinstance(table, PLA):
+        count(cubes=table.num_products)
+    else:
+        count(rows=len(table))
+    if cache is None:
+        return _minimize(table, engine, exact, timeout, compact)
+
+    key = _cache_key(cache, table, engine, exact)
+    result = cache.get(key)
+    if result is None:
+        result = _minimize(table, engine, exact, timeout, compact)
+        cache.put(key, result)
+    return _relabel(result, table)
+
+
+def minimize_many(
+    tables,
+    workers=None,
+    engine="espresso",
+    exact=None,
+    cache=None,
+    timeout=None,
+    return_exceptions=False,
+    compact=False,
+):
+    """Minimize many truth tables in parallel.
+
+    Parameters
+    ----------
+    tables: iterable of TruthTable or PLA
+            The tables to minimize. Tables are only taken from the iterable
+            as workers become available.
+    workers: int
+            The number of worker processes. Defaults to the number of CPUs.
+            With one worker, tables are minimized in this process.
+    engine: str
+            See `minimize`.
+    exact: bool
+            See `minimize`.
+    cache: truthtables.cache.MinimizationCache
+            If given, used in this process to skip tables that were already
+            minimized.
+    timeout: float
+            The number of seconds each table may take.
+    return_exceptions: bool
+            If True, exceptions (such as `TimeoutError`) are yielded in place
+            of the result instead of being raised.
+    compact: bool
+            See `minimize`.
+
+    Yields
+    ------
+    tuple of (int, PLA)
+            The index of a table in `tables` and its minimized table, in the
+            order that the minimizations complete.
+    """
+    if engine not in ("espresso", "native"):
+        raise ValueError(f"Unknown engine: '{engine}'")
+    workers = workers or os.cpu_count() or 1
+
+    def finish(idx, table, key, job):
+        try:
+            result = job()
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            return idx, e
+        if cache is not None:
+            cache.put(key, result)
+            result = _relabel(result, table)
+        return idx, result
+
+    def lookup(idx, table):
+        if cache is None:
+            return None, None
+        key = _cache_key(cache, table, engine, exact)
+        result = cache.get(key)
+        return key, result if result is None else _relabel(result, table)
+
+    if workers == 1:
+        for idx, table in enumerate(tables):
+            key, result = lookup(idx, table)
+            if result is not None:
+                yield idx, result
+                continue
+            yield finish(
+                idx,
+                table,
+                key,
+                lambda: _minimize(table, engine, exact, timeout, compact),
+            )
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        tables = enumerate(tables)
+        exhausted = False
+        while True:
+            # Keep a bounded number of jobs in flight
+            while not exhausted and len(pending) < 4 * workers:
+                try:
+                    idx, table = next(tables)
+                except StopIteration:
+                    exhausted = True
+                    break
+                key, result = lookup(idx, table)
+                if result is not None:
+                    yield idx, result
+                    continue
+                future = executor.submit(
+                    _minimize, table, engine, exact, timeout, compact
+                )
+                pending[future] = (idx, table, key)
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx, table, key = pending.pop(future)
+                yield finish(idx, table, key, future.result)
+
+
+def _cache_key(cache, table, engine, exact):
+    if engine == "espresso":
+        exact = None
+    return cache.key(table, engine=engine, exact=exact)
+
+
+def _relabel(result, table):
+    return PLA(
+        result.input_lines,
+        result.output_lines,
+        name=table.name,
+        inputs=table.inputs,
+        outputs=table.outputs,
+        pla_type=result.pla_type,
+    )
+
+
+def _minimize(table, engine, exact, timeout=None, compact=False):
+    if compact and isinstance(table, PLA):
+        table = table.compact()
+    if engine == "native":
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return minimize_native(table, exact=exact, deadline=deadline)
+    return _run_espresso(table, timeout)
+
+
+@timed("espresso")
+def _run_espresso(table, timeout=None):
+    """Minimize a table with espresso, using pipes for its input and output."""
+    text = StringIO()
+    write_pla(table, text)
+    try:
+        with subprocess_timer():
+            proc = subprocess.run(
+                ["espresso"],
+                input=text.getvalue().encode("ascii"),
+                capture_output=True,
+                timeout=timeout,
+            )
+    except subprocess.TimeoutExpired as e:
+        raise TimeoutError(f"espresso did not finish within {timeout} seconds") from e
+    if proc.returncode != 0:
+        output = (proc.stdout + proc.stderr).decode(errors="replace")
+        raise ValueError(f"Calling espresso failed. Espresso output:\n\n{output}")
+    header, input_lines, output_lines = _read_pla_stream(BytesIO(proc.stdout))
+    return _pla_from_header(header, input_lines, output_lines)
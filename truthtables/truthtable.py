@@ -1,13 +1,39 @@
 """Classes for representing truth tables"""
-import ast
+import gzip
+import json
 import math
-from itertools import product
+import struct
 from typing import Optional
 from os import PathLike
+from pathlib import Path
+
+import numpy as np
+
+from truthtables.instrument import count, timed
+from truthtables._bits import (
+    WORD_BITS,
+    WORD_DTYPE,
+    bits_to_strs,
+    input_bits,
+    num_words,
+    pack_bits,
+    popcount,
+    row_bits,
+    tail_mask,
+    unpack_planes,
+)
+
+# Number of rows processed at a time when walking a table.
+CHUNK_ROWS = 2**16
 
 
 class TruthTable:
-    """Fully defined truth table as list of bit strings"""
+    """Fully defined truth table stored as packed bit-planes.
+
+    Each output is stored as a row of uint64 words with 64 truth table rows
+    per word (see `truthtables._bits`). Bit string rows are only built when
+    they are asked for.
+    """
 
     def __init__(
         self,
@@ -19,7 +45,22 @@ class TruthTable:
         num_inputs = math.log(len(rows), 2)
         if not num_inputs.is_integer():
             raise ValueError("Number of rows must be a power of 2")
-        num_inputs = int(num_inputs)
+        num_outputs = len(rows[0])
+        bits = np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8)
+        if len(bits) != len(rows) * num_outputs:
+            raise ValueError("Every row must have the same number of outputs")
+        bits = bits.reshape(len(rows), num_outputs) - ord("0")
+        if (bits > 1).any():
+            raise ValueError("Rows must only contain '0' and '1'")
+        self._setup(pack_bits(bits), int(num_inputs), inputs, outputs, name)
+
+    def _setup(self, planes, num_inputs, inputs, outputs, name):
+        self._set_names(num_inputs, planes.shape[0], inputs, outputs, name)
+        if planes.shape[1] != num_words(2**num_inputs):
+            raise ValueError("Number of words in planes does not match inputs")
+        self.planes = planes
+
+    def _set_names(self, num_inputs, num_outputs, inputs, outputs, name):
         if inputs:
             if num_inputs != len(inputs):
                 raise ValueError("Number of inputs must equal log2(number of rows)")
@@ -27,91 +68,323 @@ class TruthTable:
         else:
             self.inputs = [f"i{i}" for i in range(num_inputs)]
 
-        num_outputs = len(rows[0])
         if outputs:
             if num_outputs != len(outputs):
                 raise ValueError("Number of outputs must equal length of each row")
             self.outputs = outputs
         else:
             self.outputs = [f"o{i}" for i in range(num_outputs)]
-
-        self.rows = rows
         self.name = name
 
-    def __xor__(self, other):
-        """Bitwise xor two truth tables"""
+    @staticmethod
+    def from_planes(planes, num_inputs=None, inputs=None, outputs=None, name="ckt"):
+        """Create a TruthTable directly from packed bit-planes.
+
+        Parameters
+        ----------
+        planes: numpy.ndarray
+                Array of shape (outputs, words) and dtype uint64. Bits past
+                the last row must be zero.
+        num_inputs: int
+                The number of inputs. Can be omitted if `inputs` is given.
+        inputs: list of str
+        outputs: list of str
+        name: str
+
+        Returns
+        -------
+        TruthTable
+        """
+        if num_inputs is None:
+            if not inputs:
+                raise ValueError("One of num_inputs or inputs must be given")
+            num_inputs = len(inputs)
+        planes = np.asarray(planes)
+        if planes.dtype != WORD_DTYPE or planes.ndim != 2:
+            raise ValueError("planes must be a 2D array of uint64")
+        table = TruthTable.__new__(TruthTable)
+        table._setup(planes, num_inputs, inputs, outputs, name)
+        return table
+
+    @staticmethod
+    def from_function(
+        func,
+        num_inputs,
+        num_outputs=None,
+        inputs=None,
+        outputs=None,
+        name="ckt",
+        chunk_rows=CHUNK_ROWS,
+        cache=False,
+    ):
+        """Create a lazy TruthTable whose rows are computed by a function.
+
+        Rows are only computed, a chunk at a time, when they are needed, so
+        a table can be streamed to a file without ever being held in memory.
+        Accessing `planes` computes the whole table.
+
+        Parameters
+        ----------
+        func: callable
+                A vectorized function that takes a (rows, inputs) array of
+                0/1 values and returns a (rows, outputs) array of 0/1 or bool
+                values. A 1D result is taken as a single output.
+        num_inputs: int
+        num_outputs: int
+                Can be omitted if `outputs` is given. Otherwise `func` is
+                called on the first row to find it.
+        inputs: list of str
+        outputs: list of str
+        name: str
+        chunk_rows: int
+                The number of rows computed per call of `func`.
+        cache: bool
+                If True, computed chunks are kept so each row is only
+                computed once.
+
+        Returns
+        -------
+        LazyTruthTable
+        """
+        return LazyTruthTable(
+            func,
+            num_inputs,
+            num_outputs=num_outputs,
+            inputs=inputs,
+            outputs=outputs,
+            name=name,
+            chunk_rows=chunk_rows,
+            cache=cache,
+        )
+
+    @staticmethod
+    def load(path, mmap=True):
+        """Load a TruthTable from a binary table file.
+
+        Parameters
+        ----------
+        path: str or pathlib.Path
+                A file written with `truthtables.to_file` using the "binary"
+                fmt (or a ".ttb" extension).
+        mmap: bool
+                If True (default), memory map the file instead of reading it.
+                The mapping is read-only, so the file is never modified:
+                in-place operators such as `^=` replace the planes with a
+                copy in memory.
+
+        Returns
+        -------
+        TruthTable
+        """
+        table = read_binary(path, mmap=mmap)
+        if not isinstance(table, TruthTable):
+            raise ValueError(f"'{path}' does not contain a TruthTable")
+        return table
+
+    def _check_compatible(self, other):
+        if not isinstance(other, TruthTable):
+            raise TypeError("Can only combine a TruthTable with another TruthTable")
         if self.num_inputs != other.num_inputs:
             raise ValueError("TruthTables must have same number of inputs")
         if self.num_outputs != other.num_outputs:
             raise ValueError("TruthTables must have same number of outputs")
 
-        new_rows = []
-        for i in range(2**self.num_inputs):
-            val = int(self.rows[i], 2) ^ int(other.rows[i], 2)
-            new_rows.append(bin(val)[2:].zfill(self.num_outputs))
+    def _with_planes(self, planes):
+        return TruthTable.from_planes(
+            planes,
+            num_inputs=self.num_inputs,
+            inputs=self.inputs,
+            outputs=self.outputs,
+            name=self.name,
+        )
+
+    @timed("TruthTable.and")
+    def __and__(self, other):
+        """Bitwise and two truth tables"""
+        self._check_compatible(other)
+        count(rows=len(self))
+        return self._with_planes(self.planes & other.planes)
+
+    @timed("TruthTable.or")
+    def __or__(self, other):
+        """Bitwise or two truth tables"""
+        self._check_compatible(other)
+        count(rows=len(self))
+        return self._with_planes(self.planes | other.planes)
+
+    @timed("TruthTable.xor")
+    def __xor__(self, other):
+        """Bitwise xor two truth tables"""
+        self._check_compatible(other)
+        count(rows=len(self))
+        return self._with_planes(self.planes ^ other.planes)
+
+    @timed("TruthTable.invert")
+    def __invert__(self):
+        """Bitwise not of every output"""
+        count(rows=len(self))
+        planes = ~self.planes
+        planes[:, -1] &= tail_mask(len(self))
+        return self._with_planes(planes)
+
+    def _inplace(self, op, other):
+        """Apply a bitwise ufunc in place, copying read-only (mapped) planes."""
+        self._check_compatible(other)
+        planes = self.planes
+        out = planes if planes.flags.writeable else None
+        self.planes = op(planes, other.planes, out=out)
+        return self
+
+    def __iand__(self, other):
+        return self._inplace(np.bitwise_and, other)
+
+    def __ior__(self, other):
+        return self._inplace(np.bitwise_or, other)
 
-        return TruthTable(new_rows)
+    def __ixor__(self, other):
+        return self._inplace(np.bitwise_xor, other)
+
+    def __eq__(self, other):
+        """Two tables are equal if they have the same outputs at every row.
+
+        Input and output names are not compared.
+        """
+        if not isinstance(other, TruthTable):
+            return NotImplemented
+        return (
+            self.num_inputs == other.num_inputs
+            and self.num_outputs == other.num_outputs
+            and np.array_equal(self.planes, other.planes)
+        )
+
+    __hash__ = None
+
+    def select(self, outputs):
+        """Create a table with a subset of the outputs.
+
+        Parameters
+        ----------
+        outputs: list of str or int
+                The outputs to keep, either as names or as column indices.
+                Outputs can be repeated or reordered.
+
+        Returns
+        -------
+        TruthTable
+        """
+        idxs = _name_indices(outputs, self.outputs)
+        return TruthTable.from_planes(
+            self.planes[idxs],
+            inputs=self.inputs,
+            outputs=[self.outputs[i] for i in idxs],
+            name=self.name,
+        )
+
+    def concat(self, *others):
+        """Create a table with the outputs of this table followed by `others`.
+
+        Parameters
+        ----------
+        others: TruthTable
+                Tables with the same number of inputs as this table.
+
+        Returns
+        -------
+        TruthTable
+        """
+        tables = (self,) + others
+        outputs = []
+        for table in tables:
+            if table.num_inputs != self.num_inputs:
+                raise ValueError("TruthTables must have same number of inputs")
+            outputs += table.outputs
+        if len(set(outputs)) != len(outputs):
+            raise ValueError("Output names must be unique")
+        return TruthTable.from_planes(
+            np.concatenate([table.planes for table in tables]),
+            inputs=self.inputs,
+            outputs=outputs,
+            name=self.name,
+        )
 
     @staticmethod
-    def from_dicts_file(filename: PathLike, inputs=None, outputs=None):
+    def from_dicts_file(filename: PathLike, inputs=None, outputs=None, **kwargs):
+        """Create a TruthTable from a file with one dict literal per line.
 
-        with open(filename) as f:
-            rows_dict = [ast.literal_eval(i) for i in f if i.strip()]
+        Each line maps output names to 0 or 1, and the lines are the rows
+        in order. See `truthtables.ingest.load_records` for the other
+        arguments, which also read JSON-lines and CSV files and can place
+        rows by their input columns.
+        """
+        from truthtables.ingest import load_records
 
-        if not outputs:
-            outputs = sorted(rows_dict[0])
-        rows = ["".join(str(int(d[o])) for o in outputs) for d in rows_dict]
-        return TruthTable(rows, inputs=inputs, outputs=outputs)
+        kwargs.setdefault("fmt", "dicts")
+        return load_records(filename, outputs=outputs, inputs=inputs, **kwargs)
 
     @staticmethod
+    @timed("TruthTable.from_pla")
     def from_pla(table):
-        raise NotImplementedError
-        # FIXME: This is broken. Doesn't handle different PLA types or ~
-        # Expand DCs
-        expanded_input_rows = []
-        expanded_output_rows = []
-        for input_row, output_row in table:
-            # Replace DC outputs with 0
-            output_row = output_row.replace("~", "0")
-            # Expand DC inputs
-            if "-" in input_row:
-                dc_idxs = [i for i, val in enumerate(input_row) if val == "-"]
-                input_row = list(input_row)
-                for vs in product(["0", "1"], repeat=len(dc_idxs)):
-                    for idx, v in zip(dc_idxs, vs):
-                        input_row[idx] = v
-                    expanded_input_rows.append("".join(input_row))
-                    expanded_output_rows.append(output_row)
-            else:
-                expanded_input_rows.append(input_row)
-                expanded_output_rows.append(output_row)
+        """Create a TruthTable by expanding the cubes of a PLA.
 
-        # Set outputs to 0 for input rows that are not in expanded PLA
-        input_rows = [
-            bin(i)[2:].zfill(table.num_inputs) for i in range(2**table.num_inputs)
-        ]
-        output_rows = []
+        Rows in the onset of an output are 1. Rows that are in the offset or
+        that are don't cares for the PLA's type are 0.
+        """
+        count(rows=2**table.num_inputs, cubes=table.num_products)
+        onset, _ = _pla_planes(table)
+        return TruthTable.from_planes(
+            onset,
+            num_inputs=table.num_inputs,
+            inputs=table.inputs,
+            outputs=table.outputs,
+            name=table.name,
+        )
 
-        for input_row in input_rows:
-            if input_row in expanded_input_rows:
-                output_rows.append(
-                    expanded_output_rows[expanded_input_rows.index(input_row)]
-                )
-            else:
-                output_rows.append("0" * table.num_outputs)
+    @property
+    def rows(self):
+        """Every row as a bit string. Built on each access."""
+        return self._row_strs(0, len(self))
 
-        return TruthTable(
-            output_rows, inputs=table.inputs, outputs=table.outputs, name=table.name
-        )
+    def _words(self, start, stop):
+        """Plane words ``start..stop`` for every output."""
+        return self.planes[:, start:stop]
+
+    def _take_words(self, idxs):
+        """Plane words at an array of word indices for every output."""
+        return self.planes[:, idxs]
+
+    def _bits(self, start, stop):
+        """Output values for rows ``start..stop`` as a (rows, outputs) array."""
+        first = start // WORD_BITS
+        words = self._words(first, num_words(stop))
+        offset = start - first * WORD_BITS
+        return unpack_planes(words, offset + stop - start)[offset:]
+
+    def _row_strs(self, start, stop):
+        return bits_to_strs(self._bits(start, stop))
+
+    def _chunks(self, chunk_rows=CHUNK_ROWS):
+        """Yield ``(start, stop)`` row ranges covering the table."""
+        for start in range(0, len(self), chunk_rows):
+            yield start, min(start + chunk_rows, len(self))
 
     def __getitem__(self, key):
-        return self.rows[key]
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self._row_strs(start, max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("TruthTable index out of range")
+        return self._row_strs(key, key + 1)[0]
 
     def __iter__(self):
-        return iter(self.rows)
+        for start, stop in self._chunks():
+            yield from self._row_strs(start, stop)
 
     def __len__(self):
-        return len(self.rows)
+        return 2**self.num_inputs
 
     @property
     def num_inputs(self):
@@ -127,8 +400,450 @@ class TruthTable:
 
     def onset(self, output: str):
         """Get the indices for which an output is 1."""
-        output_idx = self.outputs.index(output)
-        return [i for i, line in enumerate(self) if line[output_idx] == "1"]
+        onset = []
+        for idxs in self._onset_chunks(self.outputs.index(output)):
+            onset.extend(idxs.tolist())
+        return onset
+
+    def _onset_chunks(self, output_idx, chunk_rows=CHUNK_ROWS):
+        """Yield arrays of the onset row indices of an output, chunk by chunk."""
+        chunk_words = num_words(chunk_rows)
+        for first in range(0, num_words(len(self)), chunk_words):
+            words = self._words(first, first + chunk_words)[output_idx : output_idx + 1]
+            bits = unpack_planes(words)[:, 0]
+            yield np.flatnonzero(bits) + first * WORD_BITS
+
+    def evaluate(self, inputs):
+        """Look up the outputs for many input vectors at once.
+
+        Parameters
+        ----------
+        inputs: numpy.ndarray
+                Either a 2D array with one 0/1 column per input, or a 1D
+                array of packed input vectors (row indices, with the first
+                input as the most significant bit).
+
+        Returns
+        -------
+        numpy.ndarray
+                Array of shape (vectors, outputs) and dtype uint8.
+        """
+        idxs = _as_row_indices(inputs, self.num_inputs)
+        result = np.empty((len(idxs), self.num_outputs), dtype=np.uint8)
+        for start in range(0, len(idxs), EVAL_CHUNK):
+            chunk = idxs[start : start + EVAL_CHUNK]
+            words = self._take_words((chunk >> np.uint64(6)).astype(np.intp))
+            bits = (words >> (chunk & np.uint64(63))) & np.uint64(1)
+            result[start : start + EVAL_CHUNK] = bits.T
+        return result
+
+    @property
+    def entropy(self):
+        """Entropy in bits of the output rows over all input rows."""
+        if self.num_outputs == 1:
+            return self.output_entropies[0]
+        return _entropy(self._joint_counts([], range(self.num_outputs)))
+
+    @property
+    def output_entropies(self):
+        """Entropy in bits of each output."""
+        ones = self._ones()
+        return [_entropy([len(self) - n, n]) for n in ones.tolist()]
+
+    def conditional_entropy(self, outputs, inputs):
+        """Entropy in bits of outputs when the values of inputs are known.
+
+        Parameters
+        ----------
+        outputs: str, int or list of str or int
+                The output(s), as names or column indices.
+        inputs: str, int or list of str or int
+                The input(s) that are known, as names or column indices.
+
+        Returns
+        -------
+        float
+        """
+        outs = _name_indices(outputs, self.outputs)
+        ins = sorted(set(_name_indices(inputs, self.inputs)))
+        if len(outs) == 1 and len(ins) == 1:
+            # Popcounts of the two cofactors of the output
+            half = len(self) // 2
+            total = int(self._ones()[outs[0]])
+            ones = int(self._ones(ins[0])[outs[0]])
+            return (
+                _entropy([half - ones, ones])
+                + _entropy([half - total + ones, total - ones])
+            ) / 2
+        # Inputs are uniform and independent, so H(inputs) = len(inputs)
+        return _entropy(self._joint_counts(ins, outs)) - len(ins)
+
+    def mutual_information(self, outputs, inputs):
+        """Mutual information in bits between outputs and inputs.
+
+        See `conditional_entropy` for the parameters.
+        """
+        outs = _name_indices(outputs, self.outputs)
+        if len(outs) == 1:
+            h = self.output_entropies[outs[0]]
+        else:
+            h = _entropy(self._joint_counts([], outs))
+        return h - self.conditional_entropy(outs, inputs)
+
+    def _ones(self, input_idx=None):
+        """Popcount of every output, only over rows where an input is 1."""
+        ones = np.zeros(self.num_outputs, dtype=np.int64)
+        if input_idx is not None:
+            bit = self.num_inputs - 1 - input_idx
+            if bit < 6:
+                mask = np.uint64(sum(1 << r for r in range(WORD_BITS) if r >> bit & 1))
+        chunk_words = num_words(CHUNK_ROWS)
+        for first in range(0, num_words(len(self)), chunk_words):
+            words = self._words(first, first + chunk_words)
+            if input_idx is not None:
+                if bit < 6:
+                    words = words & mask
+                else:
+                    idxs = np.arange(first, first + words.shape[1])
+                    words = words[:, (idxs >> (bit - 6)) & 1 == 1]
+            ones += popcount(words).sum(axis=1, dtype=np.int64)
+        return ones
+
+    def _joint_counts(self, input_idxs, output_idxs):
+        """Number of rows with each combination of input and output values."""
+        output_idxs = list(output_idxs)
+        width = len(input_idxs) + len(output_idxs)
+        if width <= _BINCOUNT_BITS:
+            # Pack the values of each row into a code and count every code
+            counts = np.zeros(2**width, dtype=np.int64)
+            for start, stop in self._chunks():
+                codes = np.zeros(stop - start, dtype=np.int64)
+                if input_idxs:
+                    rows = np.arange(start, stop, dtype=np.int64)
+                    for idx in input_idxs:
+                        codes <<= 1
+                        codes |= (rows >> (self.num_inputs - 1 - idx)) & 1
+                outputs = self._bits(start, stop)
+                for idx in output_idxs:
+                    codes <<= 1
+                    codes |= outputs[:, idx]
+                counts += np.bincount(codes, minlength=len(counts))
+            return counts[counts > 0]
+        counts = {}
+        for start, stop in self._chunks():
+            outputs = self._bits(start, stop)[:, output_idxs]
+            if input_idxs:
+                inputs = input_bits(start, stop, self.num_inputs)[:, input_idxs]
+                outputs = np.hstack((inputs, outputs))
+            keys, chunk_counts = _row_counts(outputs, 2)
+            for key, count in zip(keys, chunk_counts.tolist()):
+                counts[key] = counts.get(key, 0) + count
+        return list(counts.values())
+
+    def support(self, output=None):
+        """The inputs that an output actually depends on.
+
+        Parameters
+        ----------
+        output: str or int
+                The output, as a name or column index. If not given, the
+                inputs that any output depends on.
+
+        Returns
+        -------
+        list of str
+        """
+        outs = _name_indices(output, self.outputs) if output is not None else None
+        return [
+            name for idx, name in enumerate(self.inputs) if self._depends(idx, outs)
+        ]
+
+    def _depends(self, input_idx, outputs=None):
+        """Whether any of the outputs depends on an input."""
+        pairs = self._cofactor_pairs({input_idx: 0}, {input_idx: 1}, outputs)
+        return any((f0 != f1).any() for f0, f1 in pairs)
+
+    def unateness(self, output):
+        """How an output changes with each input.
+
+        Returns
+        -------
+        dict of str to str
+                For each input, "positive" if raising the input can only
+                raise the output, "negative" if it can only lower it,
+                "binate" if it can do both, or "independent" if the output
+                does not depend on the input.
+        """
+        outs = _name_indices(output, self.outputs)
+        result = {}
+        for idx, name in enumerate(self.inputs):
+            rises = falls = False
+            for f0, f1 in self._cofactor_pairs({idx: 0}, {idx: 1}, outs):
+                rises = rises or bool((f1 & ~f0).any())
+                falls = falls or bool((f0 & ~f1).any())
+                if rises and falls:
+                    break
+            result[name] = _UNATENESS[rises, falls]
+        return result
+
+    def symmetric(self, output, a, b):
+        """Whether swapping the values of two inputs never changes an output.
+
+        Parameters
+        ----------
+        output: str or int
+        a: str or int
+                The first input, as a name or column index.
+        b: str or int
+                The second input.
+
+        Returns
+        -------
+        bool
+        """
+        outs = _name_indices(output, self.outputs)
+        (a,) = _name_indices(a, self.inputs)
+        (b,) = _name_indices(b, self.inputs)
+        if a == b:
+            return True
+        pairs = self._cofactor_pairs({a: 0, b: 1}, {a: 1, b: 0}, outs)
+        return all(np.array_equal(f01, f10) for f01, f10 in pairs)
+
+    def symmetric_pairs(self, output):
+        """Every pair of inputs that an output is symmetric in.
+
+        Returns
+        -------
+        list of tuple of (str, str)
+        """
+        return [
+            (self.inputs[a], self.inputs[b])
+            for a in range(self.num_inputs)
+            for b in range(a + 1, self.num_inputs)
+            if self.symmetric(output, a, b)
+        ]
+
+    def _cofactor_pairs(self, assign_a, assign_b, outputs=None):
+        """Yield aligned words of two cofactors of the table.
+
+        `assign_a` and `assign_b` map the same input indices to values. For
+        inputs stored across words (row bits of 6 and above) the two
+        cofactors are a fixed number of words apart, and for inputs within
+        a word a fixed number of bits apart, so both are read as strided
+        slices of the planes. Positions that are not in the cofactors are
+        zero in both.
+
+        Yields
+        ------
+        tuple of numpy.ndarray
+                Two (outputs, words) arrays of the same shape.
+        """
+        word_offset = bit_shift = 0
+        word_bits = {}
+        positions = np.arange(WORD_BITS)
+        in_word = np.ones(WORD_BITS, dtype=bool)
+        for idx, value in assign_a.items():
+            bit = self.num_inputs - 1 - idx
+            step = assign_b[idx] - value
+            if bit >= 6:
+                word_bits[bit - 6] = value
+                word_offset += step << (bit - 6)
+            else:
+                in_word &= (positions >> bit & 1) == value
+                bit_shift += step << bit
+        if word_offset < 0 or (word_offset == 0 and bit_shift < 0):
+            # Read the cofactor at the lower position first
+            pairs = self._cofactor_pairs(assign_b, assign_a, outputs)
+            yield from ((words_a, words_b) for words_b, words_a in pairs)
+            return
+
+        mask = np.uint64(sum(1 << int(p) for p in positions[in_word]))
+        total = num_words(len(self)) - word_offset
+        chunk_words = num_words(CHUNK_ROWS)
+        for first in range(0, total, chunk_words):
+            stop = min(first + chunk_words, total)
+            words_a = self._words(first, stop)
+            words_b = self._words(first + word_offset, stop + word_offset)
+            if outputs is not None:
+                words_a, words_b = words_a[outputs], words_b[outputs]
+            if word_bits:
+                idxs = np.arange(first, stop)
+                keep = np.ones(len(idxs), dtype=bool)
+                for word_bit, value in word_bits.items():
+                    keep &= (idxs >> word_bit & 1) == value
+                words_a, words_b = words_a[:, keep], words_b[:, keep]
+            if bit_shift > 0:
+                words_b = words_b >> np.uint64(bit_shift)
+            elif bit_shift < 0:
+                words_b = words_b << np.uint64(-bit_shift)
+            yield words_a & mask, words_b & mask
+
+    def cofactor(self, input, value):
+        """The Shannon cofactor of the table with an input fixed to a value.
+
+        The input is removed, so the result has one input less. For the
+        leading inputs (those stored across plane words) the result is a
+        strided view of `planes`. Otherwise, rows are computed from this
+        table a chunk at a time when they are read.
+
+        Parameters
+        ----------
+        input: str or int
+                The input, as a name or column index.
+        value: int
+                0 or 1.
+
+        Returns
+        -------
+        TruthTable
+        """
+        (idx,) = _name_indices(input, self.inputs)
+        inputs = self.inputs[:idx] + self.inputs[idx + 1 :]
+        view = self._word_view([idx])
+        if view is not None:
+            return TruthTableView(
+                view[(slice(None),) * (idx + 1) + (value,)],
+                inputs,
+                outputs=self.outputs,
+                name=self.name,
+            )
+        if not self._is_lazy:
+            bit = self.num_inputs - 1 - idx
+            planes = _compress_words(self.planes, bit, value)
+            return TruthTable.from_planes(
+                planes,
+                num_inputs=len(inputs),
+                inputs=inputs,
+                outputs=self.outputs,
+                name=self.name,
+            )
+        return self._remapped(inputs, lambda bits: np.insert(bits, idx, value, axis=1))
+
+    def restrict(self, input, value):
+        """Fix an input to a value, keeping it as an unused input.
+
+        See `cofactor`.
+
+        Returns
+        -------
+        TruthTable
+        """
+        (idx,) = _name_indices(input, self.inputs)
+        view = self._word_view([idx])
+        if view is not None:
+            axis = idx + 1
+            half = view[(slice(None),) * axis + (slice(value, value + 1),)]
+            return TruthTableView(
+                np.broadcast_to(half, view.shape),
+                self.inputs,
+                outputs=self.outputs,
+                name=self.name,
+            )
+
+        if not self._is_lazy:
+            bit = self.num_inputs - 1 - idx
+            half = (self.planes >> np.uint64(value << bit)) & _SPREAD_MASKS[bit]
+            return self._with_planes(half | (half << np.uint64(1 << bit)))
+
+        def restricted(bits):
+            bits = bits.copy()
+            bits[:, idx] = value
+            return bits
+
+        return self._remapped(self.inputs, restricted)
+
+    def permute_inputs(self, order):
+        """Reorder the inputs.
+
+        Parameters
+        ----------
+        order: list of str or int
+                Every input, as names or column indices, in the new order.
+
+        Returns
+        -------
+        TruthTable
+                A table whose input ``k`` is input ``order[k]`` of this
+                table. If only leading inputs move, a strided view.
+        """
+        order = _name_indices(order, self.inputs)
+        if sorted(order) != list(range(self.num_inputs)):
+            raise ValueError("order must contain every input exactly once")
+        inputs = [self.inputs[i] for i in order]
+        moved = [k for k, i in enumerate(order) if k != i]
+        view = self._word_view(moved)
+        if view is not None:
+            num_high = view.ndim - 2
+            axes = [0] + [i + 1 for i in order[:num_high]] + [num_high + 1]
+            return TruthTableView(
+                view.transpose(axes), inputs, outputs=self.outputs, name=self.name
+            )
+        inverse = np.argsort(order)
+        return self._remapped(inputs, lambda bits: bits[:, inverse])
+
+    def drop_inputs(self, inputs=None):
+        """Remove inputs that no output depends on.
+
+        Parameters
+        ----------
+        inputs: list of str or int
+                The inputs to remove. Defaults to every input that is not in
+                the `support` of the table.
+
+        Returns
+        -------
+        TruthTable
+        """
+        if inputs is None:
+            support = self.support()
+            idxs = [i for i, name in enumerate(self.inputs) if name not in support]
+        else:
+            idxs = sorted(set(_name_indices(inputs, self.inputs)))
+            for idx in idxs:
+                if self._depends(idx):
+                    raise ValueError(f"Outputs depend on input '{self.inputs[idx]}'")
+        kept = [name for i, name in enumerate(self.inputs) if i not in idxs]
+        view = self._word_view(idxs)
+        if view is not None:
+            for idx in reversed(idxs):
+                view = view[(slice(None),) * (idx + 1) + (0,)]
+            return TruthTableView(view, kept, outputs=self.outputs, name=self.name)
+        positions = [idx - k for k, idx in enumerate(idxs)]
+        return self._remapped(kept, lambda bits: np.insert(bits, positions, 0, axis=1))
+
+    def _word_view(self, input_idxs):
+        """The planes with one axis per input stored across words.
+
+        Returns
+        -------
+        numpy.ndarray
+                A view of shape (outputs, 2, ..., 2, words per block) where
+                axis ``k + 1`` is input ``k``, or None if an input in
+                `input_idxs` is stored within words.
+        """
+        num_high = self.num_inputs - 6
+        if self._is_lazy or any(idx >= num_high for idx in input_idxs):
+            return None
+        planes = self._words(0, num_words(len(self)))
+        return planes.reshape((self.num_outputs,) + (2,) * num_high + (1,))
+
+    # Tables that compute their rows when read are not sliced into views
+    _is_lazy = False
+
+    def _remapped(self, inputs, to_inputs):
+        """A lazy table that looks its rows up in this table.
+
+        `to_inputs` converts an array of input bits of the new table to the
+        input bits of this table.
+        """
+        return LazyTruthTable(
+            lambda bits: self.evaluate(to_inputs(bits)),
+            len(inputs),
+            self.num_outputs,
+            inputs=inputs,
+            outputs=self.outputs,
+            name=self.name,
+        )
 
     def input_product(self, line_num: int):
         """Returns a string representing one line as a product of inputs"""
@@ -141,8 +856,208 @@ class TruthTable:
         return " & ".join(terms)
 
 
+class LazyTruthTable(TruthTable):
+    """A TruthTable whose rows are computed by a function when needed.
+
+    Create with `TruthTable.from_function`. Reading rows, onsets and writing
+    files work a chunk at a time. Operators, `select`, `concat` and `==`
+    work on `planes`, which computes the whole table.
+    """
+
+    def __init__(
+        self,
+        func,
+        num_inputs,
+        num_outputs=None,
+        inputs=None,
+        outputs=None,
+        name="ckt",
+        chunk_rows=CHUNK_ROWS,
+        cache=False,
+    ):
+        self.func = func
+        if num_outputs is None:
+            if outputs:
+                num_outputs = len(outputs)
+            else:
+                num_outputs = self._call_bits(input_bits(0, 1, num_inputs)).shape[1]
+        self._set_names(num_inputs, num_outputs, inputs, outputs, name)
+        self.chunk_rows = max(WORD_BITS, chunk_rows - chunk_rows % WORD_BITS)
+        self.cache = cache
+        self._cached = {}
+        self._planes = None
+
+    @property
+    def planes(self):
+        """Every plane of the table. Computed on first access."""
+        if self._planes is not None:
+            return self._planes
+        planes = self._words(0, num_words(len(self)))
+        if self.cache:
+            self._planes = planes
+        return planes
+
+    @planes.setter
+    def planes(self, planes):
+        self._planes = planes
+
+    def _call(self, start, stop):
+        """Compute the outputs of rows ``start..stop``."""
+        return self._call_bits(input_bits(start, stop, self.num_inputs))
+
+    def _call_bits(self, bits):
+        result = np.asarray(self.func(bits))
+        if result.ndim == 1:
+            result = result[:, None]
+        if result.ndim != 2 or result.shape[0] != len(bits):
+            raise ValueError("func must return one row of outputs per input row")
+        if hasattr(self, "outputs") and result.shape[1] != self.num_outputs:
+            raise ValueError(f"func must return {self.num_outputs} outputs")
+        return result.astype(np.uint8, copy=False)
+
+    def _chunk_words(self, chunk):
+        """The plane words of one chunk of rows."""
+        words = self._cached.get(chunk)
+        if words is None:
+            start = chunk * self.chunk_rows
+            stop = min(start + self.chunk_rows, len(self))
+            words = pack_bits(self._call(start, stop))
+            if self.cache:
+                self._cached[chunk] = words
+        return words
+
+    def _words(self, start, stop):
+        if self._planes is not None:
+            return self._planes[:, start:stop]
+        stop = min(stop, num_words(len(self)))
+        chunk_words = self.chunk_rows // WORD_BITS
+        parts = []
+        for chunk in range(start // chunk_words, -(-stop // chunk_words)):
+            first = chunk * chunk_words
+            words = self._chunk_words(chunk)
+            parts.append(words[:, max(start - first, 0) : stop - first])
+        if not parts:
+            return np.zeros((self.num_outputs, 0), dtype=WORD_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts, axis=1)
+
+    @property
+    def _is_lazy(self):
+        return self._planes is None
+
+    def evaluate(self, inputs):
+        """Compute the outputs for many input vectors by calling `func`.
+
+        See `TruthTable.evaluate`.
+        """
+        bits = _as_input_bits(inputs, self.num_inputs)
+        result = np.empty((len(bits), self.num_outputs), dtype=np.uint8)
+        for start in range(0, len(bits), self.chunk_rows):
+            chunk = bits[start : start + self.chunk_rows]
+            result[start : start + len(chunk)] = self._call_bits(chunk)
+        return result
+
+
+class TruthTableView(TruthTable):
+    """A TruthTable whose planes are a strided view of another table's planes.
+
+    Returned by `TruthTable.cofactor`, `restrict`, `permute_inputs` and
+    `drop_inputs`. Reading rows copies one chunk of words at a time, and
+    accessing `planes` copies the whole table, so changes to it do not
+    reach the table the view was taken from. Assigning `planes` replaces
+    the view with the new planes.
+
+    Parameters
+    ----------
+    view: numpy.ndarray
+            An array of shape (outputs, ...) whose trailing axes, flattened in
+            C order, are the plane words.
+    inputs: list of str
+    outputs: list of str
+    name: str
+    """
+
+    def __init__(self, view, inputs, outputs=None, name="ckt"):
+        self._set_names(len(inputs), view.shape[0], inputs, outputs, name)
+        if math.prod(view.shape[1:]) != num_words(len(self)):
+            raise ValueError("Number of words in view does not match inputs")
+        self.view = view
+        self._planes = None
+
+    @property
+    def planes(self):
+        """The planes of the table, copied from the view."""
+        if self._planes is not None:
+            return self._planes
+        return np.array(self.view.reshape(self.num_outputs, -1))
+
+    @planes.setter
+    def planes(self, planes):
+        self._planes = planes
+        self.view = planes
+
+    def _words(self, start, stop):
+        stop = min(stop, num_words(len(self)))
+        return _flat_words(self.view, start, max(start, stop))
+
+    def _take_words(self, idxs):
+        idxs = np.unravel_index(idxs, self.view.shape[1:])
+        return self.view[(slice(None),) + idxs]
+
+
+# Masks of the positions in a word whose bit k is 0, for k in 0..5
+_SPREAD_MASKS = [
+    np.uint64(sum(1 << p for p in range(WORD_BITS) if not p >> k & 1)) for k in range(6)
+]
+
+
+def _compress_words(planes, bit, value):
+    """Cofactor planes on an input stored within words.
+
+    The rows where row bit `bit` equals `value` are gathered into the low
+    half of every word by merging groups of ``2**bit`` bits in place, and
+    pairs of half words are then joined.
+    """
+    words = (planes >> np.uint64(value << bit)) & _SPREAD_MASKS[bit]
+    for k in range(bit, 5):
+        words = (words | (words >> np.uint64(1 << k))) & _SPREAD_MASKS[k + 1]
+    words &= np.uint64(0xFFFFFFFF)
+    if words.shape[1] == 1:
+        return words
+    return words[:, 0::2] | (words[:, 1::2] << np.uint64(32))
+
+
+def _flat_words(view, start, stop):
+    """Words ``start..stop`` of a view flattened after its first axis.
+
+    Only about ``stop - start`` words are copied, however the view is
+    strided.
+    """
+    if view.ndim == 2:
+        return view[:, start:stop]
+    block = math.prod(view.shape[2:])
+    first, last = start // block, -(-stop // block)
+    offset = first * block
+    if last - first == 1:
+        return _flat_words(view[:, first], start - offset, stop - offset)
+    if (last - first) * block <= 2 * (stop - start):
+        words = view[:, first:last].reshape(view.shape[0], -1)
+        return words[:, start - offset : stop - offset]
+    parts = [
+        _flat_words(
+            view[:, idx], max(start - idx * block, 0), min(stop - idx * block, block)
+        )
+        for idx in range(first, last)
+    ]
+    return np.concatenate(parts, axis=1)
+
+
 class PLA:
-    """Represent full featured PLA as numpy arrays."""
+    """Represent full featured PLA as numpy arrays.
+
+    The cubes are stored in two int8 matrices, `input_lines` and
+    `output_lines`, with one row per product. Inputs are encoded as 0, 1 or
+    `DC` (2) for "-". Outputs additionally use `NO_MEANING` (3) for "~".
+    """
 
     def __init__(
         self,
@@ -153,8 +1068,10 @@ class PLA:
         outputs=None,
         pla_type="fr",
     ):
-        self.input_rows = input_rows
-        self.output_rows = output_rows
+        self.input_lines = _to_lines(input_rows, inputs, "01-")
+        self.output_lines = _to_lines(output_rows, outputs, "01-~")
+        if len(self.input_lines) != len(self.output_lines):
+            raise ValueError("Number of input rows must equal number of output rows")
 
         self.name = name
 
@@ -172,116 +1089,937 @@ class PLA:
 
     @staticmethod
     def from_file(filename):
-        input_rows, output_rows, pla_type = read_pla(filename)
-        return PLA(input_rows, output_rows, pla_type=pla_type)
+        """Read a PLA from a PLA file or a binary table file."""
+        if is_binary_file(filename):
+            table = read_binary(filename)
+            if isinstance(table, TruthTable):
+                table = PLA.from_truth_table(table)
+            return table
+        header, input_lines, output_lines = _read_pla(filename)
+        return _pla_from_header(header, input_lines, output_lines)
 
     @staticmethod
+    @timed("PLA.from_truth_table")
     def from_truth_table(table):
         """Create a PLA from a TruthTable."""
+        count(rows=len(table))
         return PLA(
-            [bin(i)[2:].zfill(table.num_inputs) for i in range(2**table.num_inputs)],
-            table.rows,
+            input_bits(0, len(table), table.num_inputs).astype(np.int8),
+            table._bits(0, len(table)).astype(np.int8),
             inputs=table.inputs,
             outputs=table.outputs,
             name=table.name,
         )
 
+    @property
+    def input_lines(self):
+        return self._input_lines
+
+    @input_lines.setter
+    def input_lines(self, lines):
+        self._input_lines = lines
+        self._find_index = {}
+
+    @property
+    def output_lines(self):
+        return self._output_lines
+
+    @output_lines.setter
+    def output_lines(self, lines):
+        self._output_lines = lines
+        self._find_index = {}
+
+    @property
+    def input_rows(self):
+        """The input side of every product as a string. Built on each access."""
+        return _lines_to_strs(self.input_lines)
+
+    @property
+    def output_rows(self):
+        """The output side of every product as a string. Built on each access."""
+        return _lines_to_strs(self.output_lines)
+
+    def _with_lines(self, input_lines, output_lines):
+        return PLA(
+            input_lines,
+            output_lines,
+            name=self.name,
+            inputs=self.inputs,
+            outputs=self.outputs,
+            pla_type=self.pla_type,
+        )
+
     def __getitem__(self, key):
-        if isinstance(key, int):
-            return self.input_rows[key], self.output_rows[key]
-        return PLA(self.input_rows[key], self.output_rows[key])
+        if isinstance(key, (int, np.integer)):
+            return (
+                _lines_to_strs(self.input_lines[key : key + 1 or None])[0],
+                _lines_to_strs(self.output_lines[key : key + 1 or None])[0],
+            )
+        return self._with_lines(self.input_lines[key], self.output_lines[key])
 
     def __iter__(self):
-        return iter([self[i] for i in range(self.num_products)])
+        for start in range(0, self.num_products, CHUNK_ROWS):
+            stop = start + CHUNK_ROWS
+            yield from zip(
+                _lines_to_strs(self.input_lines[start:stop]),
+                _lines_to_strs(self.output_lines[start:stop]),
+            )
 
     def __str__(self):
-        return "\n".join(" ".join(line) for line in self)
+        return _cube_text(self.input_lines, self.output_lines).decode("ascii")[:-1]
 
     def __add__(self, other):
-        return PLA(
-            self.input_rows + other.input_rows,
-            self.output_rows + other.output_rows,
-            inputs=self.inputs,
-            outputs=self.outputs,
-            name=self.name,
+        if self.num_inputs != other.num_inputs:
+            raise ValueError("PLAs must have same number of inputs")
+        if self.num_outputs != other.num_outputs:
+            raise ValueError("PLAs must have same number of outputs")
+        if self.pla_type != other.pla_type:
+            raise ValueError("PLAs must have same type")
+        return self._with_lines(
+            np.concatenate((self.input_lines, other.input_lines)),
+            np.concatenate((self.output_lines, other.output_lines)),
         )
 
     def __len__(self):
-        return len(self.input_rows)
+        return len(self.input_lines)
 
     @property
     def num_inputs(self):
-        return len(self.input_rows[0])
+        return self.input_lines.shape[1]
 
     @property
     def num_outputs(self):
-        return len(self.output_rows[0])
+        return self.output_lines.shape[1]
 
     @property
     def num_products(self):
-        return len(self.input_rows)
+        return len(self.input_lines)
 
     @property
     def entropy(self):
-        return entropy([i.split()[-1] for i in str(self).split("\n")])
+        """Entropy in bits of the output parts of the cubes."""
+        return _entropy(_row_counts(self.output_lines, 4)[1])
 
     @property
     def output_entropies(self):
-        return [entropy(o) for o in list(map(list, zip(*self.output_rows)))]
+        """Entropy in bits of each output column of the cubes."""
+        return [
+            _entropy(np.bincount(col, minlength=4))
+            for col in self.output_lines.T.astype(np.intp)
+        ]
+
+    def conditional_entropy(self, outputs, inputs):
+        """Entropy in bits of output columns when input columns are known.
+
+        Each cube is one sample, and a "-" input is a value of its own.
+
+        Parameters
+        ----------
+        outputs: str, int or list of str or int
+                The output(s), as names or column indices.
+        inputs: str, int or list of str or int
+                The input(s) that are known, as names or column indices.
+
+        Returns
+        -------
+        float
+        """
+        outs = _name_indices(outputs, self.outputs)
+        ins = _name_indices(inputs, self.inputs)
+        lines = np.hstack((self.input_lines[:, ins], self.output_lines[:, outs]))
+        return _entropy(_row_counts(lines, 4)[1]) - _entropy(
+            _row_counts(self.input_lines[:, ins], 4)[1]
+        )
+
+    def mutual_information(self, outputs, inputs):
+        """Mutual information in bits between output and input columns.
+
+        See `conditional_entropy` for the parameters.
+        """
+        outs = _name_indices(outputs, self.outputs)
+        h = _entropy(_row_counts(self.output_lines[:, outs], 4)[1])
+        return h - self.conditional_entropy(outs, inputs)
+
+    def support(self, output=None):
+        """The inputs used by the cubes of an output.
+
+        This is the support of the cover, which contains the true support
+        of the function.
+
+        Parameters
+        ----------
+        output: str or int
+                The output, as a name or column index. If not given, the
+                inputs used by the cubes of any output.
+
+        Returns
+        -------
+        list of str
+        """
+        on, off, dc = _cube_covers(self)
+        used = on | off | dc
+        if output is not None:
+            used = used[:, _name_indices(output, self.outputs)]
+        lines = self.input_lines[used.any(axis=1)]
+        return [self.inputs[i] for i in np.flatnonzero((lines != DC).any(axis=0))]
+
+    def unateness(self, output):
+        """How an output changes with each input, from its cube literals.
+
+        An input is "positive" (or "negative") if it only appears
+        uncomplemented (or complemented) in the cubes covering the output,
+        which is sufficient but not necessary for the function to be
+        unate. See `TruthTable.unateness`.
+
+        Returns
+        -------
+        dict of str to str
+        """
+        on, off, _ = _cube_covers(self)
+        (out,) = _name_indices(output, self.outputs)
+        if "f" in self.pla_type:
+            lines = self.input_lines[on[:, out]]
+            rises, falls = (lines == 1).any(axis=0), (lines == 0).any(axis=0)
+        else:
+            # The cubes cover the offset, so literals have the opposite effect
+            lines = self.input_lines[off[:, out]]
+            rises, falls = (lines == 0).any(axis=0), (lines == 1).any(axis=0)
+        return {
+            name: _UNATENESS[bool(r), bool(f)]
+            for name, r, f in zip(self.inputs, rises, falls)
+        }
+
+    def symmetric(self, output, a, b):
+        """Whether swapping two inputs maps the cubes of an output onto themselves.
+
+        The two input columns of the cubes in each of the output's on, off
+        and dc covers are swapped, and the swapped covers are compared with
+        the originals as sets of cubes. This is sufficient but not necessary
+        for the function to be symmetric. See `TruthTable.symmetric`.
+
+        Parameters
+        ----------
+        output: str or int
+        a: str or int
+                The first input, as a name or column index.
+        b: str or int
+                The second input.
+
+        Returns
+        -------
+        bool
+        """
+        (out,) = _name_indices(output, self.outputs)
+        (a,) = _name_indices(a, self.inputs)
+        (b,) = _name_indices(b, self.inputs)
+        for cover in _cube_covers(self):
+            lines = self.input_lines[cover[:, out]]
+            # Cubes with the same literal for both inputs map onto themselves
+            lines = lines[lines[:, a] != lines[:, b]]
+            swapped = lines.copy()
+            swapped[:, [a, b]] = lines[:, [b, a]]
+            if not np.array_equal(
+                np.unique(_line_keys(lines)), np.unique(_line_keys(swapped))
+            ):
+                return False
+        return True
+
+    def symmetric_pairs(self, output):
+        """Every pair of inputs that the cubes of an output are symmetric in.
+
+        See `symmetric`.
+
+        Returns
+        -------
+        list of tuple of (str, str)
+        """
+        return [
+            (self.inputs[a], self.inputs[b])
+            for a in range(self.num_inputs)
+            for b in range(a + 1, self.num_inputs)
+            if self.symmetric(output, a, b)
+        ]
+
+    def cofactor(self, input, value):
+        """The Shannon cofactor with an input fixed to a value.
+
+        Only the cubes that contain the value are kept, and the input is
+        removed.
+
+        Parameters
+        ----------
+        input: str or int
+                The input, as a name or column index.
+        value: int
+                0 or 1.
+
+        Returns
+        -------
+        PLA
+        """
+        (idx,) = _name_indices(input, self.inputs)
+        col = self.input_lines[:, idx]
+        keep = (col == DC) | (col == value)
+        return PLA(
+            np.delete(self.input_lines[keep], idx, axis=1),
+            self.output_lines[keep],
+            name=self.name,
+            inputs=self.inputs[:idx] + self.inputs[idx + 1 :],
+            outputs=self.outputs,
+            pla_type=self.pla_type,
+        )
+
+    def restrict(self, input, value):
+        """Fix an input to a value, keeping it as an unused input.
+
+        See `cofactor`.
+
+        Returns
+        -------
+        PLA
+        """
+        (idx,) = _name_indices(input, self.inputs)
+        col = self.input_lines[:, idx]
+        keep = (col == DC) | (col == value)
+        input_lines = self.input_lines[keep]
+        input_lines[:, idx] = DC
+        return self._with_lines(input_lines, self.output_lines[keep])
+
+    def permute_inputs(self, order):
+        """Reorder the inputs.
+
+        Parameters
+        ----------
+        order: list of str or int
+                Every input, as names or column indices, in the new order.
+
+        Returns
+        -------
+        PLA
+        """
+        order = _name_indices(order, self.inputs)
+        if sorted(order) != list(range(self.num_inputs)):
+            raise ValueError("order must contain every input exactly once")
+        return PLA(
+            self.input_lines[:, order],
+            self.output_lines,
+            name=self.name,
+            inputs=[self.inputs[i] for i in order],
+            outputs=self.outputs,
+            pla_type=self.pla_type,
+        )
+
+    def drop_inputs(self, inputs=None):
+        """Remove inputs that are not used by any cube.
+
+        Parameters
+        ----------
+        inputs: list of str or int
+                The inputs to remove. Defaults to every input that is not in
+                the `support` of the PLA.
+
+        Returns
+        -------
+        PLA
+        """
+        support = self.support()
+        if inputs is None:
+            idxs = [i for i, name in enumerate(self.inputs) if name not in support]
+        else:
+            idxs = _name_indices(inputs, self.inputs)
+            for idx in idxs:
+                if self.inputs[idx] in support:
+                    raise ValueError(f"Cubes use input '{self.inputs[idx]}'")
+        return PLA(
+            np.delete(self.input_lines, idxs, axis=1),
+            self.output_lines,
+            name=self.name,
+            inputs=[name for i, name in enumerate(self.inputs) if i not in idxs],
+            outputs=self.outputs,
+            pla_type=self.pla_type,
+        )
+
+    def deduplicate(self):
+        """Remove repeated cubes, keeping the first copy of each.
+
+        Returns
+        -------
+        PLA
+        """
+        lines = np.hstack((self.input_lines, self.output_lines))
+        _, first = np.unique(_line_keys(lines), return_index=True)
+        keep = np.sort(first)
+        return self._with_lines(self.input_lines[keep], self.output_lines[keep])
+
+    def merge(self):
+        """Combine cubes with the same inputs into one cube.
+
+        The outputs of the combined cube are in the union of the on, off and
+        dc-sets of the cubes. Cubes whose outputs cannot be combined into
+        one cube, such as an output that is 1 in one cube and "-" in
+        another, are left as they are.
+
+        Returns
+        -------
+        PLA
+        """
+        keys = _line_keys(self.input_lines)
+        _, first, group = np.unique(keys, return_index=True, return_inverse=True)
+        group = group.ravel()
+        sets = np.stack(_cube_covers(self))
+        merged = np.zeros((3, len(first), self.num_outputs), dtype=bool)
+        np.logical_or.at(merged, (slice(None), group), sets)
+        # A group can only be one cube if each output is in at most one set
+        mergeable = (merged.sum(axis=0) <= 1).all(axis=1) & (np.bincount(group) > 1)
+        merged_lines = np.full(merged.shape[1:], _empty_output(self.pla_type), np.int8)
+        for value, in_set in zip((1, 0, DC), merged):
+            merged_lines[in_set] = value
+
+        # Keep the first cube of each merged group and every other cube
+        is_first = np.zeros(len(keys), dtype=bool)
+        is_first[first] = True
+        keep = np.flatnonzero(is_first | ~mergeable[group])
+        output_lines = self.output_lines[keep]
+        replace = mergeable[group[keep]]
+        output_lines[replace] = merged_lines[group[keep][replace]]
+        return self._with_lines(self.input_lines[keep], output_lines)
+
+    def remove_contained(self, block_size=None):
+        """Remove cubes that are contained in another single cube.
+
+        A cube is contained in another if every row of its inputs is in the
+        other's inputs and each of its outputs is in the same set (on, off
+        or dc) in the other. Of identical cubes, the first is kept.
+
+        Parameters
+        ----------
+        block_size: int
+                The number of cubes compared against all others at once.
+
+        Returns
+        -------
+        PLA
+        """
+        # A cube's literals and the sets its outputs are not in. Cube d
+        # contains cube c exactly when the bits of d are a subset of c's.
+        bits = np.hstack(
+            (
+                self.input_lines == 1,
+                self.input_lines == 0,
+                ~np.hstack(_cube_covers(self)),
+            )
+        )
+        words = pack_bits(bits.T)
+        sizes = popcount(words).sum(axis=1, dtype=np.int64)
+        # Containing cubes have fewer bits, so they sort first
+        order = np.argsort(sizes, kind="stable")
+        words = words[order]
+        num_cubes = len(words)
+        if block_size is None:
+            block_size = max(1, EVAL_CHUNK // max(1, num_cubes))
+        contained = np.zeros(num_cubes, dtype=bool)
+        columns = np.ascontiguousarray(words.T)
+        for start in range(0, num_cubes, block_size):
+            stop = min(start + block_size, num_cubes)
+            # Bits of each earlier cube that are not in the cubes of the block
+            extra = np.zeros((stop - start, stop), dtype=WORD_DTYPE)
+            for column in columns:
+                extra |= column[None, :stop] & ~column[start:stop, None]
+            earlier = np.arange(stop) < np.arange(start, stop)[:, None]
+            contained[start:stop] = ((extra == 0) & earlier).any(axis=1)
+        keep = np.sort(order[~contained])
+        return self._with_lines(self.input_lines[keep], self.output_lines[keep])
+
+    def compact(self):
+        """Merge cubes with the same inputs and remove contained cubes.
+
+        Returns
+        -------
+        PLA
+                A PLA with the same function and no more cubes.
+        """
+        return self.merge().remove_contained()
+
+    def find(self, cubes):
+        """Look up cubes with a sorted index of this PLA's cubes.
+
+        The index is built on the first lookup and kept until `input_lines`
+        or `output_lines` is replaced. Lines changed in place are not seen
+        by later lookups.
+
+        Parameters
+        ----------
+        cubes: PLA, list of str or numpy.ndarray
+                The cubes to find, either as a PLA or as input strings or
+                lines. With inputs only, outputs are not compared.
+
+        Returns
+        -------
+        numpy.ndarray
+                For each cube, the index of a matching cube, or -1.
+        """
+        with_outputs = isinstance(cubes, PLA)
+        if with_outputs:
+            query = np.hstack((cubes.input_lines, cubes.output_lines))
+        else:
+            query = _to_lines(cubes, self.inputs, "01-")
+        sorted_keys, order = self._sorted_keys(with_outputs)
+        query_keys = _line_keys(query)
+        if not len(sorted_keys):
+            return np.full(len(query_keys), -1)
+        pos = np.searchsorted(sorted_keys, query_keys)
+        pos = np.minimum(pos, len(sorted_keys) - 1)
+        return np.where(sorted_keys[pos] == query_keys, order[pos], -1)
+
+    def _sorted_keys(self, with_outputs):
+        """The sorted keys of the cubes and their indices, built once."""
+        if with_outputs not in self._find_index:
+            lines = self.input_lines
+            if with_outputs:
+                lines = np.hstack((lines, self.output_lines))
+            keys = _line_keys(lines)
+            order = np.argsort(keys, kind="stable")
+            self._find_index[with_outputs] = (keys[order], order)
+        return self._find_index[with_outputs]
+
+    def __contains__(self, cube):
+        """Whether the PLA has a cube.
+
+        `cube` is either an input string or a tuple of input and output
+        strings, as yielded when iterating over a PLA.
+        """
+        if isinstance(cube, str):
+            query = [cube]
+        else:
+            query = PLA([cube[0]], [cube[1]], inputs=self.inputs, outputs=self.outputs)
+        return bool(self.find(query)[0] >= 0)
 
     def onset(self, output):
         """Get the indices for which an output is 1."""
         output_idx = self.outputs.index(output)
-        return [i for i, line in enumerate(self.output_rows) if line[output_idx] == "1"]
+        return np.flatnonzero(self.output_lines[:, output_idx] == 1).tolist()
+
+    def evaluate(self, inputs):
+        """Compute the outputs for many input vectors at once.
+
+        Each input vector is matched against every cube using word-wide
+        mask/value comparisons. Outputs follow `TruthTable.from_pla`: rows in
+        the onset are 1, and rows in the offset or dc-set are 0.
+
+        Parameters
+        ----------
+        inputs: numpy.ndarray
+                Either a 2D array with one 0/1 column per input, or a 1D
+                array of packed input vectors (row indices, with the first
+                input as the most significant bit).
+
+        Returns
+        -------
+        numpy.ndarray
+                Array of shape (vectors, outputs) and dtype uint8.
+        """
+        onset, _ = self._evaluate_sets(inputs)
+        return onset.astype(np.uint8)
+
+    def _cube_words(self):
+        """Packed care and value masks of every cube's inputs."""
+        care = pack_bits((self.input_lines != DC).T)
+        value = pack_bits((self.input_lines == 1).T)
+        return care, value
+
+    def _evaluate_sets(self, inputs):
+        """Compute whether each input vector is in the onset and dc-set.
+
+        Returns
+        -------
+        tuple of numpy.ndarray:
+                Two boolean arrays of shape (vectors, outputs).
+        """
+        bits = _as_input_bits(inputs, self.num_inputs)
+        vectors = pack_bits(bits.T)
+        care, value = self._cube_words()
+        covers = [c.astype(np.float32) for c in _cube_covers(self)]
+        onset = np.empty((len(bits), self.num_outputs), dtype=bool)
+        dcset = np.empty((len(bits), self.num_outputs), dtype=bool)
+        step = max(1, EVAL_CHUNK // max(1, self.num_products))
+        for start in range(0, len(bits), step):
+            chunk = vectors[start : start + step, None, :]
+            match = ((chunk & care) == value).all(axis=2).astype(np.float32)
+            on, off, dc = ((match @ c) > 0 for c in covers)
+            if "f" not in self.pla_type:
+                on = ~(off | dc)
+            elif "r" in self.pla_type:
+                dc |= ~(on | off)
+            onset[start : start + step] = on
+            dcset[start : start + step] = dc
+        return onset, dcset
 
     def input_product(self, line_num):
         """Returns a string representing one line as a product of inputs"""
         terms = []
-        for i, val in enumerate(self.input_rows[line_num]):
-            if val == "0":
+        for i, val in enumerate(self.input_lines[line_num]):
+            if val == 0:
                 terms.append("~" + self.inputs[i])
-            elif val == "1":
+            elif val == 1:
                 terms.append(self.inputs[i])
         return " & ".join(terms)
 
 
+# Encodings of the characters that can appear in a PLA cube
+DC = 2
+NO_MEANING = 3
+_CUBE_CHARS = np.frombuffer(b"01-~", dtype=np.uint8)
+
+
+def _cube_codes(chars):
+    """Lookup table from ASCII code to cube encoding, -1 if not in `chars`."""
+    codes = np.full(256, -1, dtype=np.int8)
+    for code, char in enumerate(chars):
+        codes[ord(char)] = code
+    return codes
+
+
+_INPUT_CODES = _cube_codes("01-")
+_OUTPUT_CODES = _cube_codes("01-~")
+
+
+def _to_lines(rows, names, chars):
+    """Convert a list of cube strings (or a 2D array) into an int8 matrix."""
+    if isinstance(rows, np.ndarray):
+        if rows.ndim != 2:
+            raise ValueError("PLA lines must be a 2D array")
+        lines = rows.astype(np.int8, copy=False)
+        if ((lines < 0) | (lines >= len(chars))).any():
+            raise ValueError(f"PLA lines must be in the range [0, {len(chars)})")
+        return lines
+    if not rows:
+        return np.zeros((0, len(names) if names else 0), dtype=np.int8)
+    width = len(rows[0])
+    raw = np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8)
+    if len(raw) != len(rows) * width:
+        raise ValueError("Every PLA row must have the same length")
+    lines = (_INPUT_CODES if chars == "01-" else _OUTPUT_CODES)[raw]
+    if (lines < 0).any():
+        raise ValueError(f"PLA rows must only contain the characters '{chars}'")
+    return lines.reshape(len(rows), width)
+
+
+def _lines_to_strs(lines):
+    width = lines.shape[1]
+    s = _CUBE_CHARS[lines].tobytes().decode("ascii")
+    return [s[i : i + width] for i in range(0, len(s), width)]
+
+
+def _cube_text(input_lines, output_lines):
+    """Encode cubes as PLA body text, one newline terminated line per cube."""
+    num_inputs = input_lines.shape[1]
+    num_outputs = output_lines.shape[1]
+    text = np.empty((len(input_lines), num_inputs + num_outputs + 2), dtype=np.uint8)
+    text[:, :num_inputs] = _CUBE_CHARS[input_lines]
+    text[:, num_inputs] = ord(" ")
+    text[:, num_inputs + 1 : -1] = _CUBE_CHARS[output_lines]
+    text[:, -1] = ord("\n")
+    return text.tobytes()
+
+
+# Number of lookups (or cube comparisons) done at a time by `evaluate`
+EVAL_CHUNK = 2**20
+
+
+def _line_keys(lines):
+    """One sortable key per row of a 2D int8 array, equal for equal rows."""
+    lines = np.ascontiguousarray(lines, dtype=np.int8)
+    # Add a byte so that rows without columns still have a key
+    lines = np.hstack((lines, np.zeros((len(lines), 1), dtype=np.int8)))
+    return lines.view(np.dtype((np.void, lines.shape[1]))).ravel()
+
+
+def _empty_output(pla_type):
+    """The output character that puts a cube in none of the sets."""
+    if "r" not in pla_type:
+        return 0
+    if "f" not in pla_type:
+        return 1
+    return NO_MEANING
+
+
+def _as_row_indices(inputs, num_inputs):
+    """Convert input vectors to an array of row indices."""
+    inputs = np.asarray(inputs)
+    if inputs.ndim == 2:
+        if inputs.shape[1] != num_inputs:
+            raise ValueError(f"Expected {num_inputs} input columns")
+        weights = np.uint64(1) << np.arange(num_inputs - 1, -1, -1, dtype=np.uint64)
+        return (inputs.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+    if inputs.ndim != 1:
+        raise ValueError("inputs must be a 1D or 2D array")
+    idxs = inputs.astype(np.uint64)
+    if len(idxs) and (idxs >= np.uint64(2**num_inputs)).any():
+        raise ValueError("Input vector out of range")
+    return idxs
+
+
+def _as_input_bits(inputs, num_inputs):
+    """Convert input vectors to a (vectors, inputs) array of 0/1 values."""
+    inputs = np.asarray(inputs)
+    if inputs.ndim == 2:
+        if inputs.shape[1] != num_inputs:
+            raise ValueError(f"Expected {num_inputs} input columns")
+        return inputs.astype(np.uint8, copy=False)
+    return row_bits(_as_row_indices(inputs, num_inputs), num_inputs)
+
+
+def _cube_covers(pla):
+    """Which cubes put each output in the on, off and dc sets.
+
+    Returns
+    -------
+    tuple of numpy.ndarray:
+            Three (cubes, outputs) boolean arrays, following the meaning of
+            the output characters for `pla.pla_type`. "~" never has meaning.
+    """
+    lines = pla.output_lines
+    empty = np.zeros(lines.shape, dtype=bool)
+    on = lines == 1 if "f" in pla.pla_type else empty
+    off = lines == 0 if "r" in pla.pla_type else empty
+    dc = lines == DC if "d" in pla.pla_type else empty
+    return on, off, dc
+
+
+def _pla_planes(pla):
+    """Expand a PLA into onset and don't care bit-planes.
+
+    Returns
+    -------
+    tuple of numpy.ndarray:
+            The onset and dc-set planes. For types with an explicit offset,
+            rows that are in neither the onset nor the offset are added to
+            the dc-set, and for types without an explicit onset the onset is
+            everything not in the offset or dc-set.
+    """
+    on, off, dc = _cube_covers(pla)
+    mask = tail_mask(2**pla.num_inputs)
+    dc_planes = _cover_planes(pla.input_lines, dc, pla.num_inputs)
+    if "r" in pla.pla_type:
+        off_planes = _cover_planes(pla.input_lines, off, pla.num_inputs)
+    if "f" not in pla.pla_type:
+        on_planes = ~(off_planes | dc_planes)
+        on_planes[:, -1] &= mask
+        return on_planes, dc_planes
+    on_planes = _cover_planes(pla.input_lines, on, pla.num_inputs)
+    if "r" in pla.pla_type:
+        dc_planes |= ~(on_planes | off_planes)
+        dc_planes[:, -1] &= mask
+    return on_planes, dc_planes
+
+
+# Maximum number of words set at once when expanding cubes
+_SCATTER_WORDS = 2**22
+
+# Cubes with at least this many don't cares in the word inputs are or'ed
+# into a strided view of the planes instead of listing their words
+_VIEW_FREE_INPUTS = 12
+
+
+def _cover_planes(input_lines, covers, num_inputs):
+    """Bit-planes of the rows covered by cubes.
+
+    Each cube is split into a pattern over the last (up to) six inputs,
+    which becomes a mask within a word, and a pattern over the remaining
+    inputs, which selects the words the mask is or'ed into. Cubes that
+    select many words are or'ed into a view of the planes with one axis
+    per input, so their word indices are never materialized.
+
+    Parameters
+    ----------
+    input_lines: numpy.ndarray
+            (cubes, inputs) array of 0, 1 or 2 (DC).
+    covers: numpy.ndarray
+            (cubes, outputs) boolean array of which outputs each cube covers.
+    num_inputs: int
+
+    Returns
+    -------
+    numpy.ndarray
+            Array of shape (outputs, words) and dtype uint64.
+    """
+    num_outputs = covers.shape[1]
+    planes = np.zeros((num_outputs, num_words(2**num_inputs)), dtype=WORD_DTYPE)
+    used = covers.any(axis=1)
+    input_lines = input_lines[used]
+    covers = covers[used]
+    if not len(input_lines):
+        return planes
+
+    # Masks within a word from the least significant inputs
+    num_low = min(num_inputs, 6)
+    num_high = num_inputs - num_low
+    low_lines = input_lines[:, num_high:]
+    positions = row_bits(np.arange(2**num_low), num_low).astype(np.int8)
+    masks = np.empty(len(input_lines), dtype=WORD_DTYPE)
+    for start in range(0, len(input_lines), 2**12):
+        chunk = low_lines[start : start + 2**12, None, :]
+        match = ((chunk == DC) | (chunk == positions)).all(axis=2)
+        masks[start : start + 2**12] = pack_bits(match.T)[:, 0]
+
+    # Word indices from the most significant inputs
+    high_lines = input_lines[:, :num_high]
+    weights = np.int64(1) << np.arange(num_high - 1, -1, -1, dtype=np.int64)
+    base = (high_lines == 1).astype(np.int64) @ weights
+    free_weights = np.where(high_lines == DC, weights, 0)
+    num_free = (high_lines == DC).sum(axis=1)
+    for k in np.unique(num_free):
+        (group,) = np.nonzero(num_free == k)
+        if k >= _VIEW_FREE_INPUTS:
+            shape = (2,) * num_high
+            for cube in group.tolist():
+                idx = tuple(
+                    slice(None) if v == DC else int(v) for v in high_lines[cube]
+                )
+                for output in np.flatnonzero(covers[cube]).tolist():
+                    words = planes[output].reshape(shape)[idx]
+                    np.bitwise_or(words, masks[cube], out=words)
+            continue
+        subsets = row_bits(np.arange(2**k), k).astype(np.int64)
+        group_weights = -np.sort(-free_weights[group], axis=1)[:, :k]
+        step = max(1, _SCATTER_WORDS >> k)
+        for start in range(0, len(group), step):
+            cubes = group[start : start + step]
+            idxs = base[cubes, None] + group_weights[start : start + step] @ subsets.T
+            for output in range(num_outputs):
+                sel = covers[cubes, output]
+                if sel.any():
+                    np.bitwise_or.at(
+                        planes[output],
+                        idxs[sel].ravel(),
+                        np.repeat(masks[cubes[sel]], 2**k),
+                    )
+    return planes
+
+
 def entropy(vals):
-    return sum(
-        -vals.count(i) / len(vals) * math.log2(vals.count(i) / len(vals))
-        for i in set(vals)
-    )
+    """Entropy in bits of the distribution of values in a sequence."""
+    if not len(vals):
+        return 0
+    _, counts = np.unique(np.asarray(vals), return_counts=True, axis=0)
+    return _entropy(counts)
+
+
+def _entropy(counts):
+    """Entropy in bits of a distribution given by counts."""
+    counts = np.asarray(counts, dtype=np.float64)
+    p = counts[counts > 0] / counts.sum()
+    return float(-(p * np.log2(p)).sum()) + 0.0
+
+
+# Joint values of up to this many columns are counted with a bincount
+_BINCOUNT_BITS = 20
+
+
+def _row_counts(lines, base):
+    """Count the distinct rows of a 2D array of values less than `base`.
+
+    Returns
+    -------
+    tuple of (list, numpy.ndarray)
+            A hashable key for each distinct row and its count.
+    """
+    lines = np.asarray(lines)
+    if lines.shape[1] * (base - 1).bit_length() <= 62:
+        codes = np.zeros(len(lines), dtype=np.int64)
+        for col in lines.T:
+            codes = codes * base + col
+        keys, counts = np.unique(codes, return_counts=True)
+        return keys.tolist(), counts
+    keys, counts = np.unique(lines, return_counts=True, axis=0)
+    return [key.tobytes() for key in keys], counts
+
+
+_UNATENESS = {
+    (False, False): "independent",
+    (True, False): "positive",
+    (False, True): "negative",
+    (True, True): "binate",
+}
+
+
+def _name_indices(keys, names):
+    """Convert a name or index, or a list of them, to a list of indices."""
+    if isinstance(keys, (str, int, np.integer)):
+        keys = [keys]
+    return [k if isinstance(k, (int, np.integer)) else names.index(k) for k in keys]
 
 
 class PLAParsingError(Exception):
     pass
 
 
+# Number of bytes of cube text parsed at a time when reading a PLA
+CHUNK_BYTES = 2**24
+
+
 def read_pla(path):
-    """Read a PLA from a file."""
-    num_inputs, num_outputs, num_products, pla_type = read_pla_info(path)
-
-    inputs = []
-    outputs = []
-    with open(path) as f:
-        for idx, line in enumerate(f):
-            line = line.strip()
-            # Check if this line specifices a line in the truth table
-            if line and line[0] in "10-":
-                sections = line.split()
-                if len(sections) != 2:
-                    raise PLAParsingError(f"Malformatted line at line {idx}")
-                i, o = sections
-                if len(i) != num_inputs:
-                    raise PLAParsingError(f"Incorrect number of inputs at line {idx}")
-                if len(o) != num_outputs:
-                    raise PLAParsingError(f"Incorrect number of outputs at line {idx}")
-                inputs.append(i)
-                outputs.append(o)
-
-    if num_products and len(inputs) != num_products:
-        raise PLAParsingError("PLA file header mismatches actual number of products")
+    """Read a PLA from a file.
+
+    Parameters
+    ----------
+    path: str or pathlib.Path
+            The path to the file.
+
+    Returns
+    -------
+    tuple of (numpy.ndarray, numpy.ndarray, str):
+            The input lines, the output lines, and the PLA type.
+    """
+    header, input_lines, output_lines = _read_pla(path)
+    return input_lines, output_lines, header["pla_type"]
+
+
+def iter_pla(path, batch_size=2**20):
+    """Read a PLA from a file in batches of cubes.
+
+    Only one batch is held in memory at a time, so this can be used on files
+    that are larger than the available memory.
 
-    return inputs, outputs, pla_type
+    Parameters
+    ----------
+    path: str or pathlib.Path
+            The path to the file.
+    batch_size: int
+            The number of cubes in each batch. The last batch may be smaller.
+
+    Yields
+    ------
+    PLA
+            The cubes of the next batch, with the names and type from the
+            file header.
+    """
+    with _open_binary(path) as f:
+        header, line_num, first = _read_pla_header(f)
+        pending_inputs = []
+        pending_outputs = []
+        num_pending = 0
+        chunks = _iter_cube_chunks(f, header, line_num, first)
+        for input_lines, output_lines in chunks:
+            pending_inputs.append(input_lines)
+            pending_outputs.append(output_lines)
+            num_pending += len(input_lines)
+            if num_pending < batch_size:
+                continue
+            input_lines = np.concatenate(pending_inputs)
+            output_lines = np.concatenate(pending_outputs)
+            for start in range(0, num_pending - batch_size + 1, batch_size):
+                stop = start + batch_size
+                yield _pla_from_header(
+                    header, input_lines[start:stop], output_lines[start:stop]
+                )
+            pending_inputs = [input_lines[stop:]]
+            pending_outputs = [output_lines[stop:]]
+            num_pending -= stop
+        if num_pending:
+            yield _pla_from_header(
+                header, np.concatenate(pending_inputs), np.concatenate(pending_outputs)
+            )
 
 
 def read_pla_info(path):
@@ -298,24 +2036,326 @@ def read_pla_info(path):
             The number of inputs, the number of outputs, and the number of
             products.
     """
-    num_inputs = None
-    num_outputs = None
-    num_products = None
-    pla_type = "fd"
-    with open(path) as f:
-        for line in f:
-            if line.strip() and line.strip()[0:3] == ".i ":
-                num_inputs = int(line.strip().split()[-1])
-            elif line.strip() and line.strip()[0:3] == ".o ":
-                num_outputs = int(line.strip().split()[-1])
-            elif line.strip() and line.strip()[0:3] == ".p ":
-                num_products = int(line.strip().split()[-1])
-            elif line.strip() and line.strip()[0:6] == ".type ":
-                pla_type = line.strip().split()[-1].strip()
-
-    if not num_inputs:
+    with _open_binary(path) as f:
+        header, _, _ = _read_pla_header(f)
+    return (
+        header["num_inputs"],
+        header["num_outputs"],
+        header["num_products"],
+        header["pla_type"],
+    )
+
+
+@timed("read_pla")
+def _read_pla(path):
+    with _open_binary(path) as f:
+        header, input_lines, output_lines = _read_pla_stream(f)
+        count(bytes_read=f.tell(), cubes=len(input_lines))
+    return header, input_lines, output_lines
+
+
+def _open_binary(path):
+    """Open a file for reading bytes, decompressing it if it ends in ".gz"."""
+    if Path(path).suffix == ".gz":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _read_pla_stream(f):
+    """Read the header and every cube from a binary file object."""
+    header, line_num, first = _read_pla_header(f)
+    input_chunks = [np.zeros((0, header["num_inputs"]), dtype=np.int8)]
+    output_chunks = [np.zeros((0, header["num_outputs"]), dtype=np.int8)]
+    chunks = _iter_cube_chunks(f, header, line_num, first)
+    for input_lines, output_lines in chunks:
+        input_chunks.append(input_lines)
+        output_chunks.append(output_lines)
+    if len(input_chunks) == 2:
+        return header, input_chunks[1], output_chunks[1]
+    return header, np.concatenate(input_chunks), np.concatenate(output_chunks)
+
+
+def _pla_from_header(header, input_lines, output_lines):
+    return PLA(
+        input_lines,
+        output_lines,
+        inputs=header["inputs"],
+        outputs=header["outputs"],
+        pla_type=header["pla_type"],
+    )
+
+
+def _read_pla_header(f):
+    """Read header lines up to the first cube.
+
+    Returns
+    -------
+    tuple of (dict, int, bytes):
+            The header fields, the number of lines read, and the first cube
+            line (which has already been consumed from `f`).
+    """
+    header = {
+        "num_inputs": None,
+        "num_outputs": None,
+        "num_products": None,
+        "pla_type": "fd",
+        "inputs": None,
+        "outputs": None,
+    }
+    line_num = 0
+    first = b""
+    for raw in iter(f.readline, b""):
+        # Only cubes have to be ASCII, so comments may hold any bytes
+        line = raw.decode("utf-8", errors="replace").strip()
+        if line and line[0] in "10-":
+            first = raw
+            break
+        line_num += 1
+        if line[0:3] == ".i ":
+            header["num_inputs"] = int(line.split()[-1])
+        elif line[0:3] == ".o ":
+            header["num_outputs"] = int(line.split()[-1])
+        elif line[0:3] == ".p ":
+            header["num_products"] = int(line.split()[-1])
+        elif line[0:6] == ".type ":
+            header["pla_type"] = line.split()[-1].strip()
+        elif line[0:5] == ".ilb ":
+            header["inputs"] = line.split()[1:]
+        elif line[0:4] == ".ob ":
+            header["outputs"] = line.split()[1:]
+
+    if not header["num_inputs"]:
         raise PLAParsingError("PLA file does not specify the number of inputs.")
-    if not num_outputs:
+    if not header["num_outputs"]:
         raise PLAParsingError("PLA file does not specify the number of outputs.")
+    if header["inputs"] and len(header["inputs"]) != header["num_inputs"]:
+        raise PLAParsingError("Number of input labels does not match .i")
+    if header["outputs"] and len(header["outputs"]) != header["num_outputs"]:
+        raise PLAParsingError("Number of output labels does not match .o")
+
+    return header, line_num, first
+
+
+def _iter_cube_chunks(f, header, line_num=0, leftover=b""):
+    """Parse the cube section of a PLA in large chunks.
+
+    Yields
+    ------
+    tuple of (numpy.ndarray, numpy.ndarray):
+            The input and output lines of the cubes in each chunk.
+    """
+    num_products = 0
+    while True:
+        data = f.read(CHUNK_BYTES)
+        if data:
+            data = leftover + data
+            end = data.rfind(b"\n") + 1
+            if not end:
+                leftover = data
+                continue
+            data, leftover = data[:end], data[end:]
+        else:
+            data, leftover = leftover, b""
+            if not data:
+                break
+        input_lines, output_lines = _parse_cubes(data, header, line_num)
+        line_num += data.count(b"\n")
+        num_products += len(input_lines)
+        yield input_lines, output_lines
+
+    if header["num_products"] and num_products != header["num_products"]:
+        raise PLAParsingError("PLA file header mismatches actual number of products")
+
+
+def _parse_cubes(data, header, line_num):
+    """Parse a block of complete lines into input and output lines."""
+    marks = [pos for pos in (data.find(b"."), data.find(b"#")) if pos >= 0]
+    if not marks:
+        return _parse_cube_lines(data, data, header, line_num)
+
+    # Parse everything before the first directive or comment in bulk and only
+    # filter the remaining lines one at a time.
+    start = data.rfind(b"\n", 0, min(marks)) + 1
+    head, tail = data[:start], data[start:]
+    cube_lines = [line for line in tail.splitlines() if line.strip()[:1] in _CUBE_START]
+    head_cubes = _parse_cube_lines(head, head, header, line_num)
+    tail_cubes = _parse_cube_lines(
+        b"".join(line + b"\n" for line in cube_lines),
+        tail,
+        header,
+        line_num + head.count(b"\n"),
+    )
+    return (
+        np.concatenate((head_cubes[0], tail_cubes[0])),
+        np.concatenate((head_cubes[1], tail_cubes[1])),
+    )
+
+
+_CUBE_START = (b"1", b"0", b"-")
+
+
+def _parse_cube_lines(cube_data, data, header, line_num):
+    """Parse text containing only cube lines.
+
+    `data` is the original text, which is used to report errors.
+    """
+    num_inputs = header["num_inputs"]
+    num_outputs = header["num_outputs"]
+
+    # Fast path for cubes written as "<inputs> <outputs>\n"
+    width = num_inputs + num_outputs + 2
+    raw = np.frombuffer(cube_data, dtype=np.uint8)
+    if len(raw) % width == 0:
+        raw = raw.reshape(-1, width)
+        if (raw[:, num_inputs] == ord(" ")).all() and (raw[:, -1] == ord("\n")).all():
+            input_lines = _INPUT_CODES[raw[:, :num_inputs]]
+            output_lines = _OUTPUT_CODES[raw[:, num_inputs + 1 : -1]]
+            if (input_lines < 0).any() or (output_lines < 0).any():
+                _raise_cube_error(data, num_inputs, num_outputs, line_num)
+            return input_lines, output_lines
+
+    tokens = cube_data.split()
+    ins = tokens[0::2]
+    outs = tokens[1::2]
+    if (
+        len(ins) != len(outs)
+        or any(len(i) != num_inputs for i in ins)
+        or any(len(o) != num_outputs for o in outs)
+    ):
+        _raise_cube_error(data, num_inputs, num_outputs, line_num)
+    input_lines = _INPUT_CODES[np.frombuffer(b"".join(ins), dtype=np.uint8)]
+    output_lines = _OUTPUT_CODES[np.frombuffer(b"".join(outs), dtype=np.uint8)]
+    if (input_lines < 0).any() or (output_lines < 0).any():
+        _raise_cube_error(data, num_inputs, num_outputs, line_num)
+    return (
+        input_lines.reshape(len(ins), num_inputs),
+        output_lines.reshape(len(outs), num_outputs),
+    )
+
+
+def _raise_cube_error(data, num_inputs, num_outputs, line_num):
+    """Find the first malformed cube line in `data` and raise an error for it."""
+    for idx, line in enumerate(
+        data.decode("ascii", errors="replace").splitlines(), line_num
+    ):
+        line = line.strip()
+        if not line or line[0] not in "10-":
+            continue
+        sections = line.split()
+        if len(sections) != 2:
+            raise PLAParsingError(f"Malformatted line at line {idx}")
+        i, o = sections
+        if len(i) != num_inputs:
+            raise PLAParsingError(f"Incorrect number of inputs at line {idx}")
+        if len(o) != num_outputs:
+            raise PLAParsingError(f"Incorrect number of outputs at line {idx}")
+        if set(i) - set("01-") or set(o) - set("01-~"):
+            raise PLAParsingError(f"Invalid character at line {idx}")
+    raise PLAParsingError(f"Malformatted cubes after line {line_num}")
+
+
+# Binary table files start with this magic string, a little endian uint32
+# format version and a uint32 header length, followed by a JSON header.
+# The data starts at the next multiple of BINARY_ALIGNMENT bytes.
+BINARY_MAGIC = b"TTBL"
+BINARY_VERSION = 1
+BINARY_ALIGNMENT = 64
+
+
+def is_binary_file(path):
+    """Check whether a file is in the binary table format."""
+    with open(path, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def pack_binary_header(header):
+    """Encode a binary table header, padded so that the data is aligned.
 
-    return num_inputs, num_outputs, num_products, pla_type
+    Parameters
+    ----------
+    header: dict
+            JSON serializable header fields.
+
+    Returns
+    -------
+    bytes
+    """
+    body = json.dumps(header).encode("utf-8")
+    prefix_len = len(BINARY_MAGIC) + 8
+    padding = -(prefix_len + len(body)) % BINARY_ALIGNMENT
+    body += b" " * padding
+    prefix = BINARY_MAGIC + struct.pack("<II", BINARY_VERSION, len(body))
+    return prefix + body
+
+
+def read_binary_header(path):
+    """Read the header of a binary table file.
+
+    Returns
+    -------
+    tuple of (dict, int):
+            The header fields and the offset of the data in the file.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(len(BINARY_MAGIC) + 8)
+        if prefix[: len(BINARY_MAGIC)] != BINARY_MAGIC:
+            raise ValueError(f"'{path}' is not a binary table file")
+        version, header_len = struct.unpack("<II", prefix[len(BINARY_MAGIC) :])
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported binary table version: {version}")
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    return header, len(prefix) + header_len
+
+
+@timed("read_binary")
+def read_binary(path, mmap=True):
+    """Read a TruthTable or PLA from a binary table file.
+
+    Parameters
+    ----------
+    path: str or pathlib.Path
+            The path to the file.
+    mmap: bool
+            If True (default), the data is memory mapped read-only instead of
+            being loaded, so only the parts of the table that are used are
+            read from disk and the pages are shared between processes.
+
+    Returns
+    -------
+    TruthTable or PLA
+    """
+    header, offset = read_binary_header(path)
+    count(bytes_read=Path(path).stat().st_size)
+
+    def load(dtype, shape, offset):
+        if mmap and np.prod(shape):
+            return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+        size = int(np.prod(shape))
+        data = np.fromfile(path, dtype=dtype, count=size, offset=offset)
+        return data.reshape(shape)
+
+    num_inputs = header["num_inputs"]
+    num_outputs = header["num_outputs"]
+    if header["kind"] == "truthtable":
+        shape = (num_outputs, num_words(2**num_inputs))
+        return TruthTable.from_planes(
+            load("<u8", shape, offset).view(WORD_DTYPE),
+            num_inputs=num_inputs,
+            inputs=header["inputs"],
+            outputs=header["outputs"],
+            name=header["name"],
+        )
+    if header["kind"] == "pla":
+        num_products = header["num_products"]
+        input_lines = load(np.int8, (num_products, num_inputs), offset)
+        offset += num_products * num_inputs
+        output_lines = load(np.int8, (num_products, num_outputs), offset)
+        return PLA(
+            input_lines,
+            output_lines,
+            name=header["name"],
+            inputs=header["inputs"],
+            outputs=header["outputs"],
+            pla_type=header["pla_type"],
+        )
+    raise ValueError(f"Unknown binary table kind: '{header['kind']}'")
@@ -0,0 +1,114 @@
+"""Equivalence checking between truth tables"""
+
+import numpy as np
+
+from truthtables.instrument import count, timed
+from truthtables.truthtable import DC, PLA, TruthTable, _pla_planes
+from truthtables._bits import WORD_BITS, num_words, pack_bits
+
+# Number of rows compared at a time. Must be a power of 2.
+CHUNK_ROWS = 2**16
+
+
+@timed("equivalent")
+def equivalent(a, b, return_counterexample=False, chunk_rows=CHUNK_ROWS):
+    """Check whether two tables define the same function.
+
+    Outputs are compared by position, and a row only has to match where
+    neither table has a don't care. The input space is compared a chunk at
+    a time, stopping at the first row that differs. A PLA is expanded one
+    chunk at a time from only the cubes that intersect the chunk.
+
+    Parameters
+    ----------
+    a: TruthTable, PLA or BDDTable
+    b: TruthTable, PLA or BDDTable
+    return_counterexample: bool
+            If True, also return where the tables differ.
+    chunk_rows: int
+            The number of rows compared at a time. Must be a power of 2,
+            and is at least one word.
+
+    Returns
+    -------
+    bool or tuple of (bool, tuple of (int, str))
+            Whether the tables are equivalent. With `return_counterexample`,
+            also the row index and the name of the output (of `a`) of the
+            first difference, or None if they are equivalent.
+    """
+    if a.num_inputs != b.num_inputs:
+        raise ValueError("Tables must have same number of inputs")
+    if a.num_outputs != b.num_outputs:
+        raise ValueError("Tables must have same number of outputs")
+    if chunk_rows & (chunk_rows - 1):
+        raise ValueError("chunk_rows must be a power of 2")
+
+    num_rows = 2**a.num_inputs
+    chunk_rows = min(max(chunk_rows, WORD_BITS), num_rows)
+    counterexample = None
+    for start in range(0, num_rows, chunk_rows):
+        on_a, dc_a = _chunk_sets(a, start, chunk_rows)
+        on_b, dc_b = _chunk_sets(b, start, chunk_rows)
+        count(rows=chunk_rows)
+        diff = on_a ^ on_b
+        if dc_a is not None:
+            diff &= ~dc_a
+        if dc_b is not None:
+            diff &= ~dc_b
+        if diff.any():
+            row, output = _first_difference(diff)
+            counterexample = (start + row, a.outputs[output])
+            break
+
+    if return_counterexample:
+        return counterexample is None, counterexample
+    return counterexample is None
+
+
+def _chunk_sets(table, start, chunk_rows):
+    """The onset and dc-set planes of an aligned chunk of rows.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+            Arrays of shape (outputs, words). The dc-set is None for tables
+            without don't cares.
+    """
+    if isinstance(table, TruthTable):
+        first = start // WORD_BITS
+        return table._words(first, first + num_words(chunk_rows)), None
+    if isinstance(table, PLA):
+        return _pla_chunk_planes(table, start, chunk_rows)
+    return pack_bits(table.evaluate(np.arange(start, start + chunk_rows))), None
+
+
+def _pla_chunk_planes(pla, start, chunk_rows):
+    """Expand the cubes of a PLA that intersect an aligned chunk of rows.
+
+    Inside the chunk the leading inputs are constant, so cubes that do not
+    match them are dropped and the rest are expanded over the trailing
+    inputs only.
+    """
+    num_low = chunk_rows.bit_length() - 1
+    num_high = pla.num_inputs - num_low
+    high = pla.input_lines[:, :num_high]
+    prefix = (start >> num_low) >> np.arange(num_high - 1, -1, -1) & 1
+    match = ((high == prefix) | (high == DC)).all(axis=1)
+    chunk = PLA(
+        pla.input_lines[match, num_high:],
+        pla.output_lines[match],
+        pla_type=pla.pla_type,
+    )
+    return _pla_planes(chunk)
+
+
+def _first_difference(diff):
+    """The first (row, output) set in (outputs, words) planes."""
+    word = np.flatnonzero(diff.any(axis=0))[0]
+    best = None
+    for output in np.flatnonzero(diff[:, word]).tolist():
+        bits = int(diff[output, word])
+        row = int(word) * WORD_BITS + (bits & -bits).bit_length() - 1
+        if best is None or row < best[0]:
+            best = (row, output)
+    return best